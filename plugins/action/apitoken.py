@@ -0,0 +1,5 @@
+from ansible_collections.community.stackrox.plugins.modules import apitoken
+from ansible_collections.community.stackrox.plugins.plugin_utils.action import StackroxActionBase
+
+class ActionModule(StackroxActionBase):
+    MODULE = apitoken
@@ -0,0 +1,6 @@
+from ansible_collections.community.stackrox.plugins.modules import gc
+from ansible_collections.community.stackrox.plugins.plugin_utils.action import StackroxActionBase
+
+class ActionModule(StackroxActionBase):
+    MODULE = gc
+    _supports_check_mode = True
@@ -0,0 +1,86 @@
+DOCUMENTATION = r'''
+name: api_metrics
+type: aggregate
+short_description: Summarize Stackrox API requests made during a play
+description:
+  - Collects the C(api_metrics) returned by tasks run with I(api_metrics=true) and, at the end
+    of the playbook, prints call counts, errors, retries, bytes transferred and latency percentiles
+    per Stackrox API endpoint.
+  - Bytes are counted as transferred, so compressed request and response bodies count at their
+    compressed size.
+  - Use it to find slow endpoints and redundant calls.
+requirements:
+  - enable in configuration, e.g. C(callbacks_enabled = community.stackrox.api_metrics) in C(ansible.cfg)
+options:
+  output:
+    description:
+      - Also write the summary, and every recorded request, to this JSON file.
+    type: path
+    env:
+      - name: STACKROX_API_METRICS_OUTPUT
+    ini:
+      - section: callback_stackrox_api_metrics
+        key: output
+'''
+
+import json
+
+from ansible.plugins.callback import CallbackBase
+
+from ansible_collections.community.stackrox.plugins.module_utils.metrics import summarize
+
+class CallbackModule(CallbackBase):
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'aggregate'
+    CALLBACK_NAME = 'community.stackrox.api_metrics'
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.records = []
+
+    def _collect(self, result):
+        task = result._task.get_name()
+        host = result._host.get_name()
+
+        # looped tasks carry the metrics of every item in `results`
+        for item_result in [result._result] + list(result._result.get('results') or []):
+            if not isinstance(item_result, dict):
+                continue
+
+            for record in item_result.get('api_metrics') or []:
+                self.records.append(dict(record, task=task, host=host))
+
+            # and tasks run against several Centrals those of each under `centrals`
+            for central, central_result in (item_result.get('centrals') or {}).items():
+                if isinstance(central_result, dict):
+                    for record in central_result.get('api_metrics') or []:
+                        self.records.append(dict(record, task=task, host=host, central=central))
+
+    def v2_runner_on_ok(self, result):
+        self._collect(result)
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._collect(result)
+
+    def v2_playbook_on_stats(self, stats):
+        if not self.records:
+            return
+
+        summary = summarize(self.records)
+
+        self._display.banner("STACKROX API METRICS")
+        self._display.display(f"{'endpoint':<52} {'calls':>6} {'errors':>6} {'retries':>7} "
+                              f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'total s':>8} {'KiB in':>8}")
+
+        for endpoint, s in sorted(summary.items(), key=lambda item: -item[1]['latency']['total']):
+            latency = s['latency']
+            self._display.display(f"{endpoint:<52} {s['calls']:>6} {s['errors']:>6} {s['retries']:>7} "
+                                  f"{latency['p50'] * 1000:>8.1f} {latency['p90'] * 1000:>8.1f} "
+                                  f"{latency['p99'] * 1000:>8.1f} {latency['total']:>8.2f} "
+                                  f"{s['bytes_in'] / 1024:>8.1f}")
+
+        output = self.get_option('output')
+        if output:
+            with open(output, 'w') as f:
+                json.dump(dict(endpoints=summary, requests=self.records), f, indent=2)
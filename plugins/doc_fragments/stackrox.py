@@ -0,0 +1,94 @@
+class ModuleDocFragment(object):
+
+    # Connection options shared by the controller-side plugins.
+    DOCUMENTATION = r'''
+options:
+  central:
+    description:
+      - URL of Stackrox Central, e.g. C(https://central.example.com).
+    type: str
+    required: true
+    env:
+      - name: STACKROX_CENTRAL
+  token:
+    description:
+      - API token to authenticate with. Preferred over I(username)/I(password).
+    type: str
+    env:
+      - name: STACKROX_TOKEN
+  username:
+    description:
+      - Username for basic authentication.
+    type: str
+    env:
+      - name: STACKROX_USERNAME
+  password:
+    description:
+      - Password for basic authentication.
+    type: str
+    env:
+      - name: STACKROX_PASSWORD
+  validate_certs:
+    description:
+      - Whether to verify Central's TLS certificate.
+    type: bool
+    default: true
+    env:
+      - name: STACKROX_VALIDATE_CERTS
+  session_token:
+    description:
+      - Exchange I(username)/I(password) for a short-lived Central session token once and send that
+        instead of basic auth. The token is shared with other runs through a file under the user's cache directory.
+      - Falls back to basic auth when Central does not allow the exchange.
+    type: bool
+    default: false
+    env:
+      - name: STACKROX_SESSION_TOKEN
+  connect_timeout:
+    description:
+      - Seconds to wait for a connection to Central to be established.
+    type: float
+    default: 10
+    env:
+      - name: STACKROX_CONNECT_TIMEOUT
+  read_timeout:
+    description:
+      - Seconds to wait for Central to answer once connected.
+    type: float
+    default: 60
+    env:
+      - name: STACKROX_READ_TIMEOUT
+'''
+
+    # Result caching through an Ansible cache plugin.
+    CACHE = r'''
+options:
+  cache_plugin:
+    description:
+      - Name of an Ansible cache plugin (for example C(jsonfile)) used to keep results between lookups,
+        including lookups made from other forks.
+      - Results are not cached when unset.
+    type: str
+    env:
+      - name: STACKROX_LOOKUP_CACHE_PLUGIN
+  cache_timeout:
+    description:
+      - Seconds a cached result stays valid.
+    type: int
+    default: 60
+    env:
+      - name: STACKROX_LOOKUP_CACHE_TIMEOUT
+  cache_connection:
+    description:
+      - Connection string for the cache plugin, e.g. the directory used by C(jsonfile).
+    type: str
+    env:
+      - name: STACKROX_LOOKUP_CACHE_CONNECTION
+  cache_prefix:
+    description:
+      - Prefix for cache keys.
+    type: str
+    default: stackrox_
+    env:
+      - name: STACKROX_LOOKUP_CACHE_PREFIX
+'''
@@ -0,0 +1,62 @@
+DOCUMENTATION = r'''
+name: initbundles
+short_description: Read Stackrox cluster init bundles from the controller
+description:
+  - Returns cluster init bundle metadata from Stackrox Central without running a module.
+  - The bundle list is fetched once per lookup, or served from a cache plugin when I(cache_plugin) is set,
+    and filtered locally.
+options:
+  _terms:
+    description:
+      - Bundle names to return. All bundles are returned when no names or IDs are given.
+    type: list
+    elements: str
+  id:
+    description:
+      - Bundle IDs to return, in addition to any names given.
+    type: list
+    elements: str
+    default: []
+extends_documentation_fragment:
+  - community.stackrox.stackrox
+  - community.stackrox.stackrox.cache
+'''
+
+EXAMPLES = r'''
+- name: Clusters still using a bundle
+  ansible.builtin.debug:
+    msg: "{{ lookup('community.stackrox.initbundles', 'prod-eu-1', central='https://central.example.com').impactedClusters }}"
+'''
+
+RETURN = r'''
+_list:
+  description: Matching init bundles, as returned by the API.
+  type: list
+  elements: dict
+'''
+
+from ansible_collections.community.stackrox.plugins.module_utils.services.clusterinit import Service
+from ansible_collections.community.stackrox.plugins.module_utils.records import project
+from ansible_collections.community.stackrox.plugins.plugin_utils.lookup import StackroxLookupBase
+
+class LookupModule(StackroxLookupBase):
+
+    def run(self, terms, variables=None, **kwargs):
+        self.set_options(var_options=variables, direct=kwargs)
+
+        names = set(terms or [])
+        ids = set(self.get_option('id') or [])
+
+        def fetch():
+            service = Service(**self._service_kwargs())
+            try:
+                return project(service.list_initbundles())
+            finally:
+                service.close()
+
+        bundles = self._cached("cluster-init/init-bundles", fetch)
+
+        if not names and not ids:
+            return bundles
+
+        return [b for b in bundles if b['name'] in names or b['id'] in ids]
@@ -0,0 +1,72 @@
+DOCUMENTATION = r'''
+name: tokens
+short_description: Read Stackrox API tokens from the controller
+description:
+  - Returns API tokens from Stackrox Central without running a module.
+  - The token list is fetched once per lookup, or served from a cache plugin when I(cache_plugin) is set,
+    and filtered locally.
+options:
+  _terms:
+    description:
+      - Token names to return. All tokens are returned when no names or IDs are given.
+    type: list
+    elements: str
+  id:
+    description:
+      - Token IDs to return, in addition to any names given.
+    type: list
+    elements: str
+    default: []
+  include_revoked:
+    description:
+      - Include revoked tokens.
+    type: bool
+    default: false
+extends_documentation_fragment:
+  - community.stackrox.stackrox
+  - community.stackrox.stackrox.cache
+'''
+
+EXAMPLES = r'''
+- name: Every CI token
+  ansible.builtin.debug:
+    msg: "{{ query('community.stackrox.tokens', 'ci-pipeline', central='https://central.example.com') }}"
+
+- name: Look up tokens by ID, caching results for other hosts
+  ansible.builtin.debug:
+    msg: "{{ query('community.stackrox.tokens', id=token_ids, cache_plugin='jsonfile', cache_connection='/tmp/stackrox') }}"
+'''
+
+RETURN = r'''
+_list:
+  description: Matching tokens, as returned by the API.
+  type: list
+  elements: dict
+'''
+
+from ansible_collections.community.stackrox.plugins.module_utils.services.apitoken import Service
+from ansible_collections.community.stackrox.plugins.module_utils.records import project
+from ansible_collections.community.stackrox.plugins.plugin_utils.lookup import StackroxLookupBase
+
+class LookupModule(StackroxLookupBase):
+
+    def run(self, terms, variables=None, **kwargs):
+        self.set_options(var_options=variables, direct=kwargs)
+
+        include_revoked = self.get_option('include_revoked')
+        names = set(terms or [])
+        ids = set(self.get_option('id') or [])
+
+        def fetch():
+            service = Service(**self._service_kwargs())
+            try:
+                return project(service.list(include_revoked=include_revoked))
+            finally:
+                service.close()
+
+        tokens = self._cached(f"apitokens?revoked={str(include_revoked).lower()}", fetch)
+
+        if not names and not ids:
+            return tokens
+
+        return [t for t in tokens if t['name'] in names or t['id'] in ids]
@@ -0,0 +1,379 @@
+import asyncio
+import os
+import ssl
+from email.parser import Parser
+from http.client import HTTPMessage
+from urllib.parse import urlsplit
+
+from ansible_collections.community.stackrox.plugins.module_utils.basic import build_headers, check_status
+from ansible_collections.community.stackrox.plugins.module_utils.transport import Response
+from ansible_collections.community.stackrox.plugins.module_utils.ratelimit import retry_delay, IDEMPOTENT_METHODS
+from ansible_collections.community.stackrox.plugins.module_utils.compression import content_encoding, decode
+from ansible_collections.community.stackrox.plugins.module_utils.codec import get_codec
+from ansible_collections.community.stackrox.plugins.module_utils.breaker import CircuitBreaker, FAILURE_STATUSES
+
+# StackroxService options the async services don't implement, rejected when set
+UNSUPPORTED_OPTIONS = ('session_token', 'cache_ttl', 'revalidate', 'rate_limit', 'api_metrics')
+
+# errors that mean a kept-alive connection was closed by the server before it
+# answered. Idempotent requests are retried once on a fresh connection; anything
+# else might already have been carried out.
+STALE_CONNECTION_ERRORS = (asyncio.IncompleteReadError, ConnectionResetError, BrokenPipeError)
+
+class _Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        self.writer.close()
+
+class AsyncConnectionPool:
+    """
+    asyncio counterpart of `ConnectionPool`: a minimal HTTP/1.1 client on top of
+    `asyncio.open_connection`, keeping keep-alive connections per Central host.
+
+    Standard library only. gzip and deflate encoded response bodies are decompressed.
+    Proxies are not supported: a request to a host the environment sends through a
+    proxy fails with `ValueError` rather than going around it.
+
+    `ca_path` is a CA certificate file or directory trusted in addition to the system ones.
+    `connect_timeout` bounds opening a connection, TLS handshake included, and `read_timeout`
+    each exchange of request and response after that, in seconds. None waits forever.
+    """
+
+    def __init__(self, validate_certs=True, ca_path=None, connect_timeout=None, read_timeout=None, maxsize=100):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.maxsize = maxsize
+        self._idle = {}
+
+        self._context = ssl.create_default_context()
+        if not validate_certs:
+            self._context.check_hostname = False
+            self._context.verify_mode = ssl.CERT_NONE
+        elif ca_path:
+            if os.path.isdir(ca_path):
+                self._context.load_verify_locations(capath=ca_path)
+            else:
+                self._context.load_verify_locations(cafile=ca_path)
+
+    @staticmethod
+    def _check_proxy(scheme, host):
+        from urllib.request import getproxies, proxy_bypass
+
+        if getproxies().get(scheme) and not proxy_bypass(host):
+            raise ValueError(f"A proxy is configured for {host}, which the async services don't support; "
+                             f"add it to no_proxy to connect directly")
+
+    async def _checkout(self, key):
+        idle = self._idle.get(key)
+        if idle:
+            return idle.pop(), True
+
+        scheme, host, port = key
+        self._check_proxy(scheme, host)
+
+        opening = asyncio.open_connection(host, port, ssl=self._context if scheme == 'https' else None)
+        reader, writer = await asyncio.wait_for(opening, self.connect_timeout)
+        return _Connection(reader, writer), False
+
+    def _checkin(self, key, conn):
+        idle = self._idle.setdefault(key, [])
+        if len(idle) < self.maxsize:
+            idle.append(conn)
+        else:
+            conn.close()
+
+    @staticmethod
+    async def _read_body(reader, method, status, headers):
+        # returns (body, reusable)
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            return b'', True
+
+        if headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';')[0].strip(), 16)
+                if size == 0:
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+
+            # skip trailers
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+
+            return b''.join(chunks), True
+
+        if headers.get('Content-Length') is not None:
+            return await reader.readexactly(int(headers['Content-Length'])), True
+
+        # no framing; the body runs until the server closes the connection
+        return await reader.read(), False
+
+    async def _exchange(self, conn, method, target, host_header, headers, body):
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {host_header}"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        lines.append(f"Content-Length: {len(body) if body else 0}")
+
+        conn.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + (body or b''))
+        await conn.writer.drain()
+
+        status_line = await conn.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed before a response was received")
+
+        status = int(status_line.split(None, 2)[1])
+
+        header_lines = []
+        while True:
+            line = await conn.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            header_lines.append(line)
+
+        response_headers = Parser(_class=HTTPMessage).parsestr(b''.join(header_lines).decode('iso-8859-1'))
+
+        data, reusable = await self._read_body(conn.reader, method, status, response_headers)
+        reusable = reusable and response_headers.get('Connection', '').lower() != 'close'
+
+        return Response(status, response_headers, decode(data, content_encoding(response_headers))), reusable
+
+    async def request(self, method, url, headers=None, body=None):
+        """
+        Send a request and return a fully read `Response`.
+        """
+
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        default_port = 443 if scheme == 'https' else 80
+        key = (scheme, parts.hostname, parts.port or default_port)
+
+        target = parts.path or '/'
+        if parts.query:
+            target = f"{target}?{parts.query}"
+
+        host_header = parts.netloc.rsplit('@', 1)[-1]
+
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+
+        while True:
+            conn, reused = await self._checkout(key)
+
+            try:
+                exchange = self._exchange(conn, method, target, host_header, headers, body)
+                resp, reusable = await asyncio.wait_for(exchange, self.read_timeout)
+
+            except STALE_CONNECTION_ERRORS:
+                conn.close()
+                if reused and method in IDEMPOTENT_METHODS:
+                    continue
+                raise
+
+            except BaseException:
+                conn.close()
+                raise
+
+            if reusable:
+                self._checkin(key, conn)
+            else:
+                conn.close()
+
+            return resp
+
+    async def close(self):
+        idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+class AsyncStackroxService:
+    """
+    asyncio counterpart of `StackroxService`.
+
+    At most `max_in_flight` requests are outstanding at once, however many coroutines
+    call into the service, so thousands of calls can be gathered from a single thread.
+    Throttled and failed requests are retried the same way as in `StackroxService`, and
+    `ca_path`, the timeouts and the circuit breaker options work the same too. Setting any
+    of the options in `UNSUPPORTED_OPTIONS` raises `ValueError`.
+    """
+
+    def __init__(self, api_base, token, username, password, central, validate_certs=True, transport=None,
+                 ca_path=None, connect_timeout=None, read_timeout=None,
+                 circuit_breaker=False, circuit_breaker_threshold=5, circuit_breaker_reset=30, cache_dir=None,
+                 max_in_flight=64, max_retries=3, json_codec='auto', **kwargs):
+        unsupported = [option for option in UNSUPPORTED_OPTIONS if kwargs.get(option)]
+        if unsupported:
+            raise ValueError(f"The async services don't support {', '.join(unsupported)}")
+
+        self.token = token
+        self.username = username
+        self.password = password
+        self.central = central
+        self.validate_certs = validate_certs
+        self.api_url = f"{central}/v1/{api_base}"
+        self.headers = build_headers(token, username, password)
+        self.max_retries = max_retries
+        self.codec = get_codec(json_codec)
+
+        self._owns_transport = transport is None
+        self.transport = transport if transport is not None else \
+                         AsyncConnectionPool(validate_certs=validate_certs is not False, ca_path=ca_path,
+                                             connect_timeout=connect_timeout, read_timeout=read_timeout)
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+
+        self.breaker = None
+        if circuit_breaker:
+            self.breaker = CircuitBreaker(central, circuit_breaker_threshold, circuit_breaker_reset, cache_dir)
+
+    async def close(self):
+        if self._owns_transport:
+            await self.transport.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _request(self,
+                       url_suffix='',
+                       query_string='',
+                       expect_code=200,
+                       method='GET',
+                       data=None):
+        """
+        Make a request to the Stackrox API. Arguments are as for `StackroxService._request`.
+        """
+
+        url = f"{self.api_url}/{url_suffix}" if url_suffix else self.api_url
+        if query_string:
+            url = f"{url}?{query_string}"
+
+        data_str = self.codec.dumps(data) if data else None
+
+        attempt = 0
+        while True:
+            if self.breaker is not None:
+                self.breaker.before()
+
+            try:
+                async with self._semaphore:
+                    resp = await self.transport.request(method, url, headers=self.headers, body=data_str)
+            except (OSError, asyncio.TimeoutError):
+                if self.breaker is not None:
+                    self.breaker.failure()
+
+                decision = retry_delay(method, attempt, self.max_retries)
+                if decision is None:
+                    raise
+            else:
+                if self.breaker is not None:
+                    if resp.status in FAILURE_STATUSES:
+                        self.breaker.failure()
+                    else:
+                        self.breaker.success()
+
+                decision = retry_delay(method, attempt, self.max_retries, status=resp.status, headers=resp.headers)
+                if decision is None:
+                    break
+
+            await asyncio.sleep(decision[0])
+            attempt += 1
+
+        check_status(resp, expect_code)
+
+        return self.codec.loads(resp.read())
+
+class AsyncResourceService(AsyncStackroxService):
+    """
+    asyncio counterpart of `ResourceService`, for the resource declared by `ENDPOINT`.
+
+    Responses are read whole, so `find` answers from the `index` for its field rather
+    than scanning a list of its own. An index is built from a single list, shared by every
+    coroutine that asks for it meanwhile, and dropped by any change made through the service.
+    """
+
+    ENDPOINT = None
+
+    def __init__(self, **kwargs):
+        kwargs['api_base'] = self.ENDPOINT.api_base
+        super().__init__(**kwargs)
+        self._indexes = {}
+
+    def _query(self, query_string):
+        return self.ENDPOINT.list_query if query_string is None else query_string
+
+    def _unique(self, field):
+        endpoint = self.ENDPOINT
+        return field == endpoint.id_field or (endpoint.unique and field in endpoint.identity)
+
+    async def list(self, query_string=None):
+        endpoint = self.ENDPOINT
+        res = await self._request(url_suffix=endpoint.suffix(), query_string=self._query(query_string))
+        return [endpoint.record(item) for item in res[endpoint.list_key]]
+
+    async def _build_index(self, field, query_string):
+        index = {}
+        if self._unique(field):
+            for record in await self.list(query_string):
+                index[record.get(field)] = record
+        else:
+            for record in await self.list(query_string):
+                index.setdefault(record.get(field), []).append(record)
+
+        return index
+
+    async def _index(self, field, query_string):
+        key = (field, query_string)
+
+        pending = self._indexes.get(key)
+        if pending is None:
+            pending = self._indexes[key] = asyncio.ensure_future(self._build_index(*key))
+
+        try:
+            # one caller being cancelled mustn't cancel the list the others wait for
+            return await asyncio.shield(pending)
+        except Exception:
+            if self._indexes.get(key) is pending:
+                del self._indexes[key]
+            raise
+
+    async def index(self, field=None, query_string=None):
+        return await self._index(field or self.ENDPOINT.identity[0], self._query(query_string))
+
+    async def find(self, value, field=None, query_string=None):
+        field = field or self.ENDPOINT.identity[0]
+        index = await self._index(field, self._query(query_string))
+
+        return index.get(value) if self._unique(field) else list(index.get(value, []))
+
+    async def get(self, id):
+        endpoint = self.ENDPOINT
+        res = await self._request(url_suffix=endpoint.suffix('{id}', id))
+        return endpoint.record(res[endpoint.item_key] if endpoint.item_key else res)
+
+    async def mutate(self, action, id=None, data=None):
+        endpoint = self.ENDPOINT
+        if action not in endpoint.verbs:
+            raise ValueError(f"{endpoint.name} does not support {action}")
+
+        method, template = endpoint.verbs[action]
+        if id is None and data:
+            id = data.get(endpoint.id_field)
+
+        try:
+            return await self._request(url_suffix=endpoint.suffix(template, id), method=method, data=data)
+        finally:
+            self._indexes.clear()
+
+    async def create(self, data):
+        return await self.mutate('create', data=data)
+
+    async def update(self, id, data):
+        return await self.mutate('update', id=id, data=data)
+
+    async def delete(self, id):
+        return await self.mutate('delete', id=id)
@@ -1,54 +1,267 @@
-from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.urls import open_url
+from ansible.module_utils.basic import AnsibleModule, env_fallback, missing_required_lib
+from ansible_collections.community.stackrox.plugins.module_utils.transport import ConnectionPool
+from ansible_collections.community.stackrox.plugins.module_utils.cache import ResponseCache, ValidatorStore, fingerprint
+from ansible_collections.community.stackrox.plugins.module_utils.jsonstream import iter_array_items, read_object
+from ansible_collections.community.stackrox.plugins.module_utils.ratelimit import RateController, THROTTLE_STATUSES, retry_delay
+from ansible_collections.community.stackrox.plugins.module_utils.session import SessionTokenStore
+from ansible_collections.community.stackrox.plugins.module_utils.breaker import CircuitBreaker, FAILURE_STATUSES
+from ansible_collections.community.stackrox.plugins.module_utils.metrics import RequestMetrics
+from ansible_collections.community.stackrox.plugins.module_utils.compression import ACCEPT_ENCODING, DecodingResponse, compress
+from ansible_collections.community.stackrox.plugins.module_utils.codec import HAS_ORJSON, get_codec
+from ansible_collections.community.stackrox.plugins.module_utils import profiling
+from ansible_collections.community.stackrox.plugins.module_utils import exceptions
+from contextlib import ExitStack
 from http.client import HTTPException
-import json
+import base64
+import time
+import os
+import sys
+
+def build_headers(token, username, password, compression=True):
+    #
+    # Default request headers, including authentication.
+    #
+    headers = {
+        "Accept": "application/json",
+        "Content-Type": "application/json"
+    }
+
+    if compression:
+        headers['Accept-Encoding'] = ACCEPT_ENCODING
+
+    # token auth by preference.
+    # username/password forces basic auth
+    if token:
+        headers['Authorization'] = f"Bearer {token}"
+    elif username:
+        credentials = base64.b64encode(f"{username}:{password}".encode('utf-8')).decode('ascii')
+        headers['Authorization'] = f"Basic {credentials}"
+
+    return headers
+
+def check_status(resp, expect_code):
+    #
+    # Raise the appropriate exception for an unexpected response status.
+    #
+    if resp.status == 401:
+        raise exceptions.UnauthorizedException("Stackrox API rejected the supplied credentials")
+
+    if resp.status != expect_code:
+        raise exceptions.UnexpectedStatusException(expect_code, resp.status)
+
+# options shared by every module, on top of their own argument_spec
+STACKROX_ARGS = dict(
+    token=dict(type='str', required=False, no_log=True),
+    username=dict(type='str', required=False),
+    password=dict(type='str', required=False, no_log=True),
+    central=dict(type='str', required=False),
+    centrals=dict(type='list', elements='dict', required=False, options=dict(
+        name=dict(type='str', required=False),
+        central=dict(type='str', required=True),
+        token=dict(type='str', required=False, no_log=True),
+        username=dict(type='str', required=False),
+        password=dict(type='str', required=False, no_log=True),
+        validate_certs=dict(type='bool', required=False)
+    ), required_together=[ ('username', 'password') ]),
+    central_parallelism=dict(type='int', required=False, default=8),
+    validate_certs=dict(type='bool', required=False),
+    connect_timeout=dict(type='float', required=False, default=10),
+    read_timeout=dict(type='float', required=False, default=60),
+    circuit_breaker=dict(type='bool', required=False, default=False),
+    circuit_breaker_threshold=dict(type='int', required=False, default=5),
+    circuit_breaker_reset=dict(type='float', required=False, default=30),
+    cache_ttl=dict(type='int', required=False, default=0),
+    cache_dir=dict(type='path', required=False),
+    revalidate=dict(type='bool', required=False, default=False),
+    max_retries=dict(type='int', required=False, default=3),
+    rate_limit=dict(type='float', required=False, default=0),
+    max_concurrency=dict(type='int', required=False, default=16),
+    session_token=dict(type='bool', required=False, default=False),
+    api_metrics=dict(type='bool', required=False, default=False),
+    compression=dict(type='bool', required=False, default=True),
+    compress_min_size=dict(type='int', required=False, default=0),
+    json_codec=dict(type='str', choices=['auto', 'json', 'orjson'], default='auto'),
+    profile=dict(type='path', required=False, fallback=(env_fallback, ['STACKROX_PROFILE'])),
+    profile_format=dict(type='str', choices=['pstats', 'collapsed'], default='pstats',
+                        fallback=(env_fallback, ['STACKROX_PROFILE_FORMAT']))
+)
+
+STACKROX_REQUIRED_TOGETHER = [ ('username', 'password') ]
+
+# a task runs against either one Central or a list of them
+STACKROX_MUTUALLY_EXCLUSIVE = [ ('central', 'centrals') ]
+STACKROX_REQUIRED_ONE_OF = [ ('central', 'centrals') ]
+
+def stackrox_options(options):
+    #
+    # Merge a module's own validation options (MODULE_OPTIONS) with those shared by every module.
+    #
+    return {
+        **options,
+        'required_together': options.get('required_together', []) + STACKROX_REQUIRED_TOGETHER,
+        'mutually_exclusive': options.get('mutually_exclusive', []) + STACKROX_MUTUALLY_EXCLUSIVE,
+        'required_one_of': options.get('required_one_of', []) + STACKROX_REQUIRED_ONE_OF
+    }
+
+def api_metrics(params, service):
+    #
+    # The api_metrics result key, if the module was asked for it.
+    #
+    if not params.get('api_metrics'):
+        return {}
+
+    return dict(api_metrics=service.metrics.records)
+
+def create_service(module, service_class, params):
+    #
+    # Create the module's service, failing the module with the reason when
+    # it can't be set up, e.g. because cache_dir is not safe to use.
+    #
+    try:
+        return service_class(**params)
+    except OSError as e:
+        module.fail_json(msg=f"Unable to set up the Stackrox service: {e}")
+
+def profile_result():
+    #
+    # The profile result key, if the module run was being profiled.
+    #
+    summary = profiling.stop()
+    return dict(profile=summary) if summary else {}
 
 class StackroxModule(AnsibleModule):
+    """
+    `AnsibleModule` with the options shared by every Stackrox module.
+
+    When `profile` (or `STACKROX_PROFILE`) is set, the rest of the run is profiled from
+    argument parsing to exit, and the profile is written there when the module exits.
+    """
+
     def __init__(self, **kwargs):
-        module_args = dict(
-            token=dict(type='str', required=False, no_log=True),
-            username=dict(type='str', required=False),
-            password=dict(type='str', required=False, no_log=True),
-            central=dict(type='str', required=True),
-            validate_certs=dict(type='bool', required=False)
-        )
+        start = time.perf_counter()
+
+        kwargs['argument_spec'] = {**STACKROX_ARGS, **(kwargs.get('argument_spec', {})) }
+        super().__init__(**stackrox_options(kwargs))
+
+        if self.params['profile']:
+            # Ansible passes the module name; run by hand it is left as basic.py
+            name = self._name if self._name != 'basic.py' else os.path.basename(sys.argv[0])
+            profiler = profiling.start(self.params['profile'], self.params['profile_format'],
+                                       name=os.path.splitext(name)[0].rsplit('.', 1)[-1])
+            # argument parsing happened before profiling could start
+            profiler.spans.record('module.args', time.perf_counter() - start)
 
-        required_together = [ ('username', 'password') ]
+        if self.params['json_codec'] == 'orjson' and not HAS_ORJSON:
+            self.fail_json(msg=missing_required_lib('orjson'))
 
-        kwargs['argument_spec'] = {**module_args, **(kwargs.get('argument_spec', {})) }
-        kwargs['required_together'] = kwargs.get('required_together', []) + required_together
+    def exit_json(self, **kwargs):
+        super().exit_json(**kwargs, **profile_result())
 
-        super().__init__(**kwargs)
+    def fail_json(self, msg, **kwargs):
+        super().fail_json(msg=msg, **kwargs, **profile_result())
 
 class StackroxService:
     """
     Base class for Stackrox API services. Handles authentication and provides the _request method
     for easily making requests to the API.
+
+    Requests go through a keep-alive `ConnectionPool`. Pass `transport` to share one pool
+    between several services; otherwise each service creates its own, which is closed by `close()`.
+
+    When `cache_ttl` is greater than zero, list responses are kept in a `ResponseCache` on disk
+    for that many seconds and shared with every other module run using the same Central and
+    credentials. Any other request through the service invalidates it.
+
+    When `revalidate` is set, the last body and its `ETag`/`Last-Modified` validators are kept on
+    disk per URL. GET requests become conditional and a 304 response is answered from that store.
+
+    Every request passes through a `RateController` (`rate_limit` requests per second, at most
+    `max_concurrency` in flight) that adapts to how Central responds. Throttled (429) requests,
+    and idempotent requests that hit a 5xx or a connection error, are retried up to `max_retries`
+    times with jittered backoff, honouring `Retry-After`. Pass `rate_controller` to share one
+    controller between services.
+
+    When `session_token` is set and a username and password are given, they are exchanged once
+    for a Central session token (see `SessionTokenStore`) that is sent instead of basic auth.
+    If the exchange isn't possible, requests fall back to basic auth.
+
+    `connect_timeout` and `read_timeout` bound, in seconds, connecting to Central and each
+    wait for it to answer; a timed out request is retried like any other connection error.
+
+    When `circuit_breaker` is set, requests go through a `CircuitBreaker` shared with every
+    other module run against the same Central: after `circuit_breaker_threshold` requests in a
+    row fail, the rest fail fast with `CircuitOpenException` until, `circuit_breaker_reset`
+    seconds later, a single request finds Central healthy again.
+
+    When `api_metrics` is set, every request sent is recorded in `metrics`, a `RequestMetrics`.
+
+    Responses are requested gzip or deflate compressed unless `compression` is False. Request
+    bodies of at least `compress_min_size` bytes are sent gzipped; 0 (the default) never does.
+
+    Bodies are encoded and parsed by the `json_codec` codec (see `codec.get_codec`); the
+    default uses orjson when it is installed.
     """
 
-    def __init__(self, api_base, token, username, password, central, validate_certs=True, **kwargs):
+    def __init__(self, api_base, token, username, password, central, validate_certs=True, transport=None,
+                 connect_timeout=None, read_timeout=None,
+                 circuit_breaker=False, circuit_breaker_threshold=5, circuit_breaker_reset=30,
+                 cache_ttl=0, cache_dir=None, revalidate=False,
+                 max_retries=3, rate_limit=0, max_concurrency=16, rate_controller=None,
+                 session_token=False, api_metrics=False, compression=True, compress_min_size=0,
+                 json_codec='auto', **kwargs):
         self.token = token
         self.username = username
         self.password = password
         self.central = central
         self.validate_certs = validate_certs
         self.api_url = f"{central}/v1/{api_base}"
-        self.headers = {
-            "Accept": "application/json",
-            "Content-Type": "application/json"
-        }
+        self.headers = build_headers(token, username, password, compression)
+        self.compress_min_size = compress_min_size
+        self.codec = get_codec(json_codec)
+
+        # validate_certs is None when the module option is omitted; verify by default.
+        self._owns_transport = transport is None
+        self.transport = transport if transport is not None else \
+                         ConnectionPool(validate_certs=validate_certs is not False,
+                                        connect_timeout=connect_timeout, read_timeout=read_timeout)
+
+        namespace = fingerprint(self.api_url, self.headers.get('Authorization'))
+
+        self.cache = None
+        if cache_ttl and cache_ttl > 0:
+            self.cache = ResponseCache(namespace, cache_ttl, cache_dir)
 
-        # only if using a token.
-        # username/password forces basic auth
-        if token:
-            self.headers['Authorization'] = f"Bearer {token}"
+        self.validators = ValidatorStore(namespace, cache_dir) if revalidate else None
+
+        self.max_retries = max_retries
+        self.rate_controller = rate_controller if rate_controller is not None else \
+                                RateController(rate=rate_limit, max_concurrency=max_concurrency)
+
+        self.session = None
+        if session_token and username and not token:
+            self.session = SessionTokenStore(central, username, password, self.transport, cache_dir)
+
+        self.breaker = None
+        if circuit_breaker:
+            self.breaker = CircuitBreaker(central, circuit_breaker_threshold, circuit_breaker_reset, cache_dir)
+
+        self.metrics = RequestMetrics() if api_metrics else None
+
+    def close(self):
+        """
+        Release pooled connections. A transport passed in by the caller is left open.
+        """
+        if self._owns_transport:
+            self.transport.close()
 
     def _request(self, 
                   url_suffix='',
                   query_string='',
                   expect_code=200,
                   method='GET',
-                  data=None):
+                  data=None,
+                  cache=False,
+                  mutating=None):
         """
         Make a request to the Stackrox API. 
 
@@ -60,8 +273,134 @@ class StackroxService:
 
         `data` is expected to be a dict and will be dumped to a JSON string, then included 
         in the body of the request.
+
+        `cache` marks a GET whose response may be served from the shared cache, if enabled.
+
+        `mutating` tells whether the request may change what the list endpoints return, which
+        invalidates the shared cache. By default anything but a GET is taken to do so.
+        """
+
+        url = self._url(url_suffix, query_string)
+
+        if self.cache and cache and method == 'GET':
+            body = self.cache.get_or_fetch(url, lambda: self._send(url, method, data, expect_code))
+            with profiling.span('json.decode'):
+                return self.codec.loads(body)
+
+        if mutating is None:
+            mutating = method != 'GET'
+
+        try:
+            body = self._send(url, method, data, expect_code)
+        finally:
+            # anything but a read may have changed what the list endpoints return
+            if self.cache and mutating:
+                self.cache.invalidate()
+
+        with profiling.span('json.decode'):
+            return self.codec.loads(body)
+
+    def _request_items(self,
+                       list_key,
+                       url_suffix='',
+                       query_string='',
+                       expect_code=200):
+        """
+        Streaming counterpart of `_request` for list endpoints.
+
+        Makes a GET request and yields the elements of the `list_key` array in the response
+        one at a time, decoding them while the body is still being read. Memory use stays flat
+        however long the list is, and callers may stop iterating as soon as they have what
+        they need.
+
+        When the shared cache or revalidation is enabled the full response is used instead.
+        """
+
+        if self.cache or self.validators:
+            yield from self._request(url_suffix=url_suffix,
+                                     query_string=query_string,
+                                     expect_code=expect_code,
+                                     cache=True)[list_key]
+            return
+
+        url = self._url(url_suffix, query_string)
+
+        start = time.monotonic()
+        status, retries, bytes_in = None, 0, 0
+
+        def read(size):
+            nonlocal bytes_in
+            chunk = resp.read(size)
+            # compressed bodies are counted as received, like request bodies
+            bytes_in = resp.wire_size if isinstance(resp, DecodingResponse) else bytes_in + len(chunk)
+            return chunk
+
+        with ExitStack() as stack:
+            def send(headers):
+                # drop the throttled response of a previous attempt, if any
+                stack.close()
+                return stack.enter_context(self.transport.stream(method='GET', url=url, headers=headers))
+
+            try:
+                with profiling.span('api.request'):
+                    resp, retries = self._with_retries('GET', send)
+                status = resp.status
+                self._check_status(resp, expect_code)
+                yield from iter_array_items(read, list_key)
+            finally:
+                if self.metrics is not None:
+                    self.metrics.record('GET', url, status, time.monotonic() - start,
+                                        bytes_in=bytes_in, retries=retries)
+
+    def _request_streamed(self,
+                          sinks,
+                          url_suffix='',
+                          method='GET',
+                          data=None,
+                          expect_code=200):
         """
+        Counterpart of `_request` for responses carrying large string values.
+
+        The string values under the top-level keys in `sinks` are passed to `sinks[key](text)`
+        piece by piece while the body is still being read, and left out of the returned object,
+        so they are never held in memory whole. The shared cache and revalidation are not used.
+        """
+
+        url = self._url(url_suffix, '')
+        data_str, extra_headers = self._encode_body(data)
+
+        start = time.monotonic()
+        status, retries, bytes_in = None, 0, 0
+
+        def read(size):
+            nonlocal bytes_in
+            chunk = resp.read(size)
+            # compressed bodies are counted as received, like request bodies
+            bytes_in = resp.wire_size if isinstance(resp, DecodingResponse) else bytes_in + len(chunk)
+            return chunk
+
+        with ExitStack() as stack:
+            def send(headers):
+                stack.close()
+                return stack.enter_context(self.transport.stream(method=method, url=url, headers=headers, body=data_str))
 
+            try:
+                with profiling.span('api.request'):
+                    resp, retries = self._with_retries(method, send, extra_headers=extra_headers)
+                status = resp.status
+                self._check_status(resp, expect_code)
+
+                with profiling.span('json.stream'):
+                    return read_object(read, sinks)
+            finally:
+                if self.cache and method != 'GET':
+                    self.cache.invalidate()
+
+                if self.metrics is not None:
+                    self.metrics.record(method, url, status, time.monotonic() - start,
+                                        bytes_in=bytes_in, bytes_out=len(data_str or ''), retries=retries)
+
+    def _url(self, url_suffix, query_string):
         if url_suffix:
             url = f"{self.api_url}/{url_suffix}"
         else:
@@ -70,21 +409,136 @@ class StackroxService:
         if query_string:
             url = f"{url}?{query_string}"
 
-        extra_args = {}
-        if not self.token:
-            extra_args = { "url_username": self.username, "url_password": self.password, "force_basic_auth": True }
+        return url
+
+    def _check_status(self, resp, expect_code):
+        check_status(resp, expect_code)
+
+    def _retry_delay(self, method, attempt, resp=None):
+        #
+        # Return how long to wait before retrying a request, or None
+        # if it should not be retried. `resp` is None after a connection error.
+        #
+        decision = retry_delay(method, attempt, self.max_retries,
+                               status=resp.status if resp is not None else None,
+                               headers=resp.headers if resp is not None else None)
+        if decision is None:
+            return None
+
+        delay, retry_after = decision
+        if retry_after is not None:
+            # hold back the other threads too
+            self.rate_controller.pause(retry_after)
+
+        return delay
+
+    def _request_headers(self):
+        #
+        # Headers for the next request, with the session token
+        # in place of basic auth when there is one.
+        #
+        token = self.session.token() if self.session else None
+        if token is None:
+            return self.headers
+
+        return {**self.headers, "Authorization": f"Bearer {token}"}
+
+    def _with_retries(self, method, send, extra_headers=None):
+        #
+        # Call send(headers) through the rate controller until it returns a response
+        # that shouldn't be retried, then return that response and the number of retries.
+        #
+        # A session token Central rejects is exchanged again once, without
+        # counting as an attempt.
+        #
+        # Every attempt is checked against and recorded in the circuit breaker, if any,
+        # so retries stop as soon as the circuit opens.
+        #
+        attempt = 0
+        session_retried = False
+        while True:
+            if self.breaker is not None:
+                self.breaker.before()
+
+            try:
+                with self.rate_controller.slot() as outcome:
+                    headers = self._request_headers()
+                    resp = send({**headers, **extra_headers} if extra_headers else headers)
+                    outcome.throttled = resp.status in THROTTLE_STATUSES
+            except (OSError, HTTPException):
+                if self.breaker is not None:
+                    self.breaker.failure()
+
+                delay = self._retry_delay(method, attempt)
+                if delay is None:
+                    raise
+            else:
+                if self.breaker is not None:
+                    if resp.status in FAILURE_STATUSES:
+                        self.breaker.failure()
+                    else:
+                        self.breaker.success()
+
+                if resp.status == 401 and headers is not self.headers and not session_retried:
+                    self.session.invalidate()
+                    session_retried = True
+                    continue
+
+                delay = self._retry_delay(method, attempt, resp)
+                if delay is None:
+                    return resp, attempt
+
+            time.sleep(delay)
+            attempt += 1
+
+    def _encode_body(self, data):
+        #
+        # Return the request body for data and any extra headers it needs.
+        #
+        data_str = self.codec.dumps(data) if data else None
+
+        if data_str and self.compress_min_size and len(data_str) >= self.compress_min_size:
+            return compress(data_str), {"Content-Encoding": "gzip"}
+
+        return data_str, None
+
+    def _send(self, url, method, data, expect_code):
+        #
+        # Send a single request and return the raw response body.
+        #
+        data_str, extra_headers = self._encode_body(data)
+
+        conditional = self.validators is not None and method == 'GET'
+        if conditional:
+            conditional_headers, stored_body = self.validators.get(url)
+            if conditional_headers:
+                extra_headers = {**(extra_headers or {}), **conditional_headers}
+
+        start = time.monotonic()
+        status, retries, bytes_in = None, 0, 0
+
+        try:
+            with profiling.span('api.request'):
+                resp, retries = self._with_retries(method,
+                                                   lambda headers: self.transport.request(method=method,
+                                                                                          url=url,
+                                                                                          headers=headers,
+                                                                                          body=data_str),
+                                                   extra_headers=extra_headers)
+            status = resp.status
 
-        data_str = json.dumps(data) if data else None
+            if conditional and resp.status == 304 and stored_body is not None:
+                return stored_body
 
-        resp = open_url(url=url,
-                        headers=self.headers,
-                        validate_certs=self.validate_certs,
-                        method=method,
-                        data=data_str,
-                        **extra_args)
+            self._check_status(resp, expect_code)
 
-        if resp.status != expect_code:
-            raise Exception(f"Unexpected status code from Stackrox API. Expected = {expect_code}, received = {resp.status}")
+            body = resp.read()
+            bytes_in = resp.wire_size
+            if conditional:
+                self.validators.put(url, resp.headers, body)
 
-        body = resp.read()
-        return json.loads(body)
+            return body
+        finally:
+            if self.metrics is not None:
+                self.metrics.record(method, url, status, time.monotonic() - start,
+                                    bytes_in=bytes_in, bytes_out=len(data_str or ''), retries=retries)
@@ -0,0 +1,109 @@
+import json
+import os
+import time
+
+from ansible_collections.community.stackrox.plugins.module_utils.cache import private_dir, fingerprint, file_lock, atomic_write
+from ansible_collections.community.stackrox.plugins.module_utils import exceptions
+
+# statuses that mean Central itself (or the proxy in front of it) is unhealthy.
+# 429 is left out: a throttling Central is up and answering.
+FAILURE_STATUSES = (502, 503, 504)
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one Central, shared by every module run on the same machine.
+
+    Each request that fails to connect, times out or gets a 502/503/504 counts as a failure;
+    any other response resets the count. After `threshold` consecutive failures, from any
+    fork, the circuit opens and `before()` raises `CircuitOpenException` at once instead of
+    letting the request wait out its own timeout. Once `reset_timeout` seconds have passed,
+    the circuit is half-open: a single request is let through as a probe, which closes the
+    circuit if it succeeds and opens it again if it fails. The other requests keep failing
+    fast while the probe is out, until the probe itself has had `reset_timeout` seconds.
+
+    The state lives in a small file keyed by the Central URL, which only exists while there
+    are failures on record, so a healthy Central costs one failed `open` per request.
+    """
+
+    def __init__(self, central, threshold=5, reset_timeout=30, cache_dir=None):
+        self.central = central
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+
+        directory = private_dir(cache_dir, 'circuits')
+
+        self.directory = directory
+        self.path = os.path.join(directory, fingerprint(central) + '.json')
+
+    def _locked(self):
+        return file_lock(os.path.join(self.directory, '.lock'))
+
+    def _read(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            return {}
+
+    def _write(self, state):
+        atomic_write(self.directory, self.path, json.dumps(state).encode('utf-8'))
+
+    def before(self):
+        """
+        Call before sending a request. Raises `CircuitOpenException` while the circuit is
+        open, and marks the caller as the probe when it is half-open.
+        """
+
+        state = self._read()
+        if not state or not state.get('opened'):
+            return
+
+        with self._locked():
+            state = self._read()
+            if not state or not state.get('opened'):
+                return
+
+            now = time.time()
+            retry_at = state['opened'] + self.reset_timeout
+            if state.get('probe'):
+                retry_at = max(retry_at, state['probe'] + self.reset_timeout)
+
+            if now < retry_at:
+                raise exceptions.CircuitOpenException(
+                    f"Central {self.central} is unavailable: {state['failures']} consecutive requests failed. "
+                    f"Failing fast for another {retry_at - now:.0f}s before probing it again")
+
+            state['probe'] = now
+            self._write(state)
+
+    def success(self):
+        """
+        Record that Central answered, closing the circuit.
+        """
+
+        if not os.path.exists(self.path):
+            return
+
+        with self._locked():
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+    def failure(self):
+        """
+        Record a failed request, opening the circuit after `threshold` in a row
+        or when it was the half-open probe.
+        """
+
+        with self._locked():
+            state = self._read() or {}
+            state['failures'] = state.get('failures', 0) + 1
+
+            if state.get('opened') or state['failures'] >= self.threshold:
+                state['opened'] = time.time()
+                state['probe'] = None
+
+            self._write(state)
@@ -0,0 +1,177 @@
+import fcntl
+import hashlib
+import json
+import os
+import stat
+import tempfile
+import time
+from contextlib import contextmanager
+
+def default_cache_dir():
+    # the user's own cache directory: a fixed name in a shared /tmp could be
+    # created first by someone else, who would then read and plant entries
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'stackrox')
+
+def private_dir(cache_dir, *parts):
+    """
+    Return the directory `parts` below `cache_dir` (by default `default_cache_dir()`),
+    creating it if needed. Refuses, with `PermissionError`, a cache directory that isn't
+    a real directory owned by the current user and closed to everyone else.
+    """
+
+    root = cache_dir or default_cache_dir()
+    os.makedirs(root, mode=0o700, exist_ok=True)
+
+    st = os.lstat(root)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise PermissionError(f"Refusing to use cache directory {root}: it must be a directory owned by "
+                              f"the current user with mode 0700")
+
+    path = os.path.join(root, *parts)
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    return path
+
+def fingerprint(*parts):
+    return hashlib.sha256('\0'.join(str(p) for p in parts).encode('utf-8')).hexdigest()
+
+def atomic_write(directory, path, data):
+    # write and rename so readers never see a partial file
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+@contextmanager
+def file_lock(path):
+    """
+    Hold an exclusive lock on `path` (created if missing), shared across processes.
+    """
+
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+class ResponseCache:
+    """
+    On-disk cache of raw API response bodies, shared by every module run on the same machine.
+
+    Entries live in a directory per `namespace` (a fingerprint of Central URL, credentials
+    and API base) with one file per request URL. All work on a namespace is serialised by a
+    file lock, so when many forks miss at once only the first one fetches; the rest wait
+    on the lock and then read what it wrote.
+    """
+
+    def __init__(self, namespace, ttl, cache_dir=None):
+        self.ttl = ttl
+        self.path = private_dir(cache_dir, namespace)
+
+    def _entry(self, url):
+        return os.path.join(self.path, fingerprint(url) + '.json')
+
+    def _locked(self):
+        return file_lock(os.path.join(self.path, '.lock'))
+
+    def _read_fresh(self, entry):
+        try:
+            if time.time() - os.stat(entry).st_mtime >= self.ttl:
+                return None
+
+            with open(entry, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def get_or_fetch(self, url, fetch):
+        """
+        Return the cached body for `url`, calling `fetch()` to get it when missing or expired.
+        """
+
+        entry = self._entry(url)
+
+        body = self._read_fresh(entry)
+        if body is not None:
+            return body
+
+        with self._locked():
+            # another fork may have fetched while we waited on the lock
+            body = self._read_fresh(entry)
+            if body is None:
+                body = fetch()
+                atomic_write(self.path, entry, body)
+
+        return body
+
+    def invalidate(self):
+        """
+        Drop every entry in this namespace.
+        """
+
+        with self._locked():
+            for name in os.listdir(self.path):
+                if name.endswith('.json'):
+                    os.unlink(os.path.join(self.path, name))
+
+class ValidatorStore:
+    """
+    On-disk store of the last response body per URL together with its `ETag` and
+    `Last-Modified` validators, used to make conditional GET requests.
+
+    Unlike `ResponseCache` nothing here expires or needs invalidating: the stored body is
+    only used when Central answers 304 Not Modified.
+    """
+
+    def __init__(self, namespace, cache_dir=None):
+        self.path = private_dir(cache_dir, namespace)
+
+    def _entry(self, url):
+        return os.path.join(self.path, fingerprint(url) + '.validated')
+
+    def get(self, url):
+        """
+        Return `(request_headers, body)` for a conditional request to `url`,
+        or `(None, None)` if nothing is stored.
+        """
+
+        try:
+            with open(self._entry(url), 'rb') as f:
+                validators = json.loads(f.readline())
+                body = f.read()
+        except (FileNotFoundError, ValueError):
+            return None, None
+
+        request_headers = {}
+        if validators.get('etag'):
+            request_headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            request_headers['If-Modified-Since'] = validators['last_modified']
+
+        return request_headers, body
+
+    def put(self, url, response_headers, body):
+        """
+        Store `body` if the response carried any validators; otherwise forget `url`.
+        """
+
+        validators = {
+            'etag': response_headers.get('ETag'),
+            'last_modified': response_headers.get('Last-Modified')
+        }
+
+        entry = self._entry(url)
+
+        if not any(validators.values()):
+            try:
+                os.unlink(entry)
+            except FileNotFoundError:
+                pass
+            return
+
+        atomic_write(self.path, entry, json.dumps(validators).encode('utf-8') + b'\n' + body)
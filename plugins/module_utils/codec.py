@@ -0,0 +1,83 @@
+import importlib.util
+import json
+
+# importing orjson costs a module about 5ms (it pulls in uuid and zoneinfo), so
+# only look for it here and import it the first time it's used
+HAS_ORJSON = importlib.util.find_spec('orjson') is not None
+
+def _orjson():
+    import orjson
+    return orjson
+
+class JsonCodec:
+    """
+    JSON codec on top of the standard library `json` module.
+
+    Every codec's `loads` takes `bytes` or `str`, and `dumps` returns compact UTF-8 `bytes`,
+    so response bodies are parsed without decoding them to text first.
+    """
+
+    name = 'json'
+
+    @staticmethod
+    def loads(data):
+        return json.loads(data)
+
+    @staticmethod
+    def dumps(value):
+        return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+class OrjsonCodec:
+    """
+    JSON codec on top of `orjson`.
+    """
+
+    name = 'orjson'
+
+    @staticmethod
+    def loads(data):
+        return _orjson().loads(data)
+
+    @staticmethod
+    def dumps(value):
+        return _orjson().dumps(value)
+
+class AutoCodec:
+    """
+    Parses bodies of at least `THRESHOLD` bytes with orjson and everything else, and
+    every request body, with the standard library.
+
+    orjson parses token lists about 1.5 times as fast, but below about 1MiB that saves
+    less than importing it costs (see tests/benchmarks/bench_codecs.py).
+    """
+
+    name = 'auto'
+    THRESHOLD = 2**20
+
+    @staticmethod
+    def loads(data):
+        if len(data) >= AutoCodec.THRESHOLD:
+            return OrjsonCodec.loads(data)
+
+        return JsonCodec.loads(data)
+
+    dumps = JsonCodec.dumps
+
+CODECS = {
+    'json': JsonCodec,
+    'orjson': OrjsonCodec
+}
+
+def get_codec(name='auto'):
+    """
+    Return the codec called `name`. 'auto' uses orjson for large bodies when it is
+    installed and the standard library otherwise.
+    """
+
+    if name in (None, 'auto'):
+        return AutoCodec if HAS_ORJSON else JsonCodec
+
+    if name == 'orjson' and not HAS_ORJSON:
+        raise ValueError("The orjson JSON codec was requested but orjson is not installed")
+
+    return CODECS[name]
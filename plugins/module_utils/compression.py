@@ -0,0 +1,116 @@
+import gzip
+import zlib
+
+# what we ask Central to compress responses with
+ACCEPT_ENCODING = "gzip, deflate"
+
+# zlib wbits for each content coding; deflate is zlib wrapped, as RFC 9110 says,
+# though some servers send it raw (see _Decoder)
+WBITS = {
+    'gzip': 16 + zlib.MAX_WBITS,
+    'x-gzip': 16 + zlib.MAX_WBITS,
+    'deflate': zlib.MAX_WBITS
+}
+
+class _Decoder:
+    #
+    # Incrementally decompress one content coding.
+    #
+    def __init__(self, encoding):
+        self.encoding = encoding
+        self._zlib = zlib.decompressobj(WBITS[encoding])
+        self._started = False
+
+    def decompress(self, data, max_length=0):
+        try:
+            out = self._zlib.decompress(data, max_length)
+        except zlib.error:
+            if self.encoding != 'deflate' or self._started:
+                raise
+
+            # raw deflate stream without the zlib header
+            self._zlib = zlib.decompressobj(-zlib.MAX_WBITS)
+            out = self._zlib.decompress(data, max_length)
+
+        self._started = True
+        return out
+
+    def flush(self):
+        return self._zlib.flush()
+
+    @property
+    def unconsumed_tail(self):
+        return self._zlib.unconsumed_tail
+
+    @property
+    def eof(self):
+        return self._zlib.eof
+
+def content_encoding(headers):
+    """
+    Return the response's content coding if it is one we decode, else None.
+    """
+
+    encoding = (headers.get('Content-Encoding') or '').strip().lower()
+    return encoding if encoding in WBITS else None
+
+def decode(body, encoding):
+    """
+    Decompress a complete body.
+    """
+
+    if not encoding:
+        return body
+
+    decoder = _Decoder(encoding)
+    return decoder.decompress(body) + decoder.flush()
+
+class DecodingResponse:
+    """
+    Wraps an unread `http.client.HTTPResponse` with a compressed body so that `read()`
+    returns decompressed data, decompressing a chunk at a time as it is read.
+
+    `wire_size` counts the compressed bytes read so far.
+    """
+
+    def __init__(self, resp, encoding, chunk_size=65536):
+        self.raw = resp
+        self.status = resp.status
+        self.headers = resp.headers
+        self.chunk_size = chunk_size
+        self._decoder = _Decoder(encoding)
+        self.wire_size = 0
+
+    def _read_raw(self, size=None):
+        data = self.raw.read(size)
+        self.wire_size += len(data)
+        return data
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            data = self._decoder.unconsumed_tail + self._read_raw()
+            return self._decoder.decompress(data) + self._decoder.flush()
+
+        while True:
+            if self._decoder.unconsumed_tail:
+                data = self._decoder.unconsumed_tail
+            elif self._decoder.eof:
+                # read past the end of the compressed data, so the
+                # connection is left clean and can go back to the pool
+                self._read_raw()
+                return b''
+            else:
+                data = self._read_raw(self.chunk_size)
+                if not data:
+                    return self._decoder.flush()
+
+            out = self._decoder.decompress(data, size)
+            if out:
+                return out
+
+def compress(body):
+    """
+    gzip a request body.
+    """
+
+    return gzip.compress(body, compresslevel=6)
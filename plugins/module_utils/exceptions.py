@@ -2,9 +2,39 @@ class StackroxApiException(Exception):
     pass
 
 class BundleRevokeFailedException(StackroxApiException):
-    def __init__(self, api_error_list):
+    def __init__(self, api_error_list, revoked_ids=None):
         super().__init__(self, "Failed to revoke one or more init bundles")
         self.failed_bundles = api_error_list
+        self.revoked_ids = revoked_ids or []
 
 class UnauthorizedException(StackroxApiException):
     pass
+
+class UnexpectedStatusException(StackroxApiException):
+    def __init__(self, expected, received):
+        super().__init__(f"Unexpected status code from Stackrox API. Expected = {expected}, received = {received}")
+        self.expected = expected
+        self.status = received
+
+class ModuleFailedException(Exception):
+    #
+    # Raised by a module's execute() to fail the task with `msg`,
+    # returning `result` alongside it.
+    #
+    def __init__(self, msg, **result):
+        super().__init__(msg)
+        self.msg = msg
+        self.result = result
+
+class JournalMismatchException(ModuleFailedException):
+    #
+    # Raised when a journal to resume from was written for a different request.
+    #
+    pass
+
+class CircuitOpenException(ModuleFailedException):
+    #
+    # Raised instead of sending a request while the circuit breaker
+    # for an unhealthy Central is open.
+    #
+    pass
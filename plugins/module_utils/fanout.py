@@ -0,0 +1,116 @@
+from ansible_collections.community.stackrox.plugins.module_utils.basic import api_metrics
+from ansible_collections.community.stackrox.plugins.module_utils.parallel import run_parallel
+from ansible_collections.community.stackrox.plugins.module_utils import exceptions
+
+from collections import Counter
+import os
+import re
+
+# options of each `centrals` entry that stand in for the task's own
+CREDENTIALS = ('token', 'username', 'password')
+
+# directories modules write to, which get a subdirectory per Central
+OUTPUT_DIRS = ('dest_dir', 'dest')
+
+def endpoint_label(endpoint):
+    #
+    # The entry's name (or URL) made safe for use in a file name.
+    #
+    return re.sub(r'[^A-Za-z0-9._-]+', '-', endpoint.get('name') or endpoint['central']).strip('-.')
+
+def endpoint_params(params, endpoint):
+    """
+    Return the module params for running against a single `centrals` entry.
+
+    Credentials given on the entry replace all of the task's credentials, so a
+    token set for the task doesn't win over a username and password set for one Central.
+
+    A `journal` is kept per Central, in a file named after the journal with the entry's
+    name (or URL) appended, and files are written to a subdirectory named after it, so
+    runs against different Centrals never share or overwrite each other's files.
+    """
+
+    overrides = dict(central=endpoint['central'], centrals=None)
+
+    if params.get('journal'):
+        overrides['journal'] = f"{params['journal']}.{endpoint_label(endpoint)}"
+
+    for key in OUTPUT_DIRS:
+        if params.get(key):
+            overrides[key] = os.path.join(params[key], endpoint_label(endpoint))
+
+    if endpoint.get('validate_certs') is not None:
+        overrides['validate_certs'] = endpoint['validate_certs']
+
+    if any(endpoint.get(key) for key in CREDENTIALS):
+        overrides.update({key: endpoint.get(key) for key in CREDENTIALS})
+
+    return {**params, **overrides}
+
+def execute_all(params, execute, create_service):
+    """
+    Run `execute(params, service)` against every Central in `params['centrals']` at once,
+    at most `central_parallelism` at a time, and return the results keyed by Central name
+    (the entry's `name`, or its URL).
+
+    `create_service(params)` returns the service for one Central's params. A failure on one
+    Central doesn't stop the others; if any failed, `ModuleFailedException` is raised with
+    every Central's result.
+    """
+
+    endpoints = params['centrals']
+    names = [endpoint.get('name') or endpoint['central'] for endpoint in endpoints]
+
+    duplicates = sorted(name for name, count in Counter(names).items() if count > 1)
+    if duplicates:
+        raise exceptions.ModuleFailedException(f"Central names must be unique within centrals: {', '.join(duplicates)}")
+
+    # names that only differ in punctuation would share the files kept per Central
+    labels = Counter(endpoint_label(endpoint) for endpoint in endpoints)
+    clashes = sorted(label for label, count in labels.items() if count > 1)
+    if clashes:
+        raise exceptions.ModuleFailedException(f"Central names must differ in more than punctuation within centrals: {', '.join(clashes)}")
+
+    def run(endpoint):
+        endpoint_args = endpoint_params(params, endpoint)
+        service = create_service(endpoint_args)
+
+        try:
+            result = execute(endpoint_args, service)
+        except exceptions.ModuleFailedException as e:
+            result = dict(e.result, failed=True, msg=e.msg)
+        except Exception as e:
+            result = dict(failed=True, msg=str(e))
+        finally:
+            service.close()
+
+        result.update(api_metrics(endpoint_args, service))
+        return result
+
+    outcomes = run_parallel(run, endpoints, max_workers=params['central_parallelism'])
+
+    results = {}
+    for name, (result, error) in zip(names, outcomes):
+        results[name] = result if error is None else dict(failed=True, msg=str(error))
+        results[name].setdefault('changed', False)
+
+    aggregate = dict(changed=any(r['changed'] for r in results.values()), centrals=results)
+
+    failed = [name for name, result in results.items() if result.get('failed')]
+    if failed:
+        raise exceptions.ModuleFailedException(f"Failed on {len(failed)} of {len(results)} Centrals: {', '.join(failed)}",
+                                               **aggregate)
+
+    return aggregate
+
+def run_all(module, params, execute, service_class):
+    """
+    Module entry point for a task with `centrals`: runs `execute_all` and exits the module.
+    """
+
+    try:
+        result = execute_all(params, execute, lambda params: service_class(**params))
+    except exceptions.ModuleFailedException as e:
+        module.fail_json(msg=e.msg, **e.result)
+
+    module.exit_json(**result)
@@ -0,0 +1,42 @@
+import base64
+import os
+import tempfile
+
+class Base64File:
+    """
+    Decodes base64 text, written in pieces of any size, into the file at `path`.
+
+    The data goes to a temporary file next to `path`, created readable by the owner only,
+    which `commit()` renames into place. Until then `path` is untouched, and `discard()`
+    removes the temporary file, so a failed download never leaves a partial file behind.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._pending = ''
+
+        fd, self._tmp = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix='.tmp-')
+        self._file = os.fdopen(fd, 'wb')
+
+    def write(self, text):
+        # decode whole 4 character groups, keeping any remainder for the next write
+        text = self._pending + text.replace('\n', '').replace('\r', '')
+        usable = len(text) - len(text) % 4
+        self._pending = text[usable:]
+
+        if usable:
+            self._file.write(base64.b64decode(text[:usable], validate=True))
+
+    def commit(self):
+        if self._pending:
+            raise ValueError(f"Truncated base64 data for {self.path}")
+
+        self._file.close()
+        os.replace(self._tmp, self.path)
+        self._tmp = None
+
+    def discard(self):
+        self._file.close()
+        if self._tmp is not None:
+            os.unlink(self._tmp)
+            self._tmp = None
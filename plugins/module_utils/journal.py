@@ -0,0 +1,139 @@
+import json
+import os
+import threading
+
+from ansible_collections.community.stackrox.plugins.module_utils.cache import fingerprint
+from ansible_collections.community.stackrox.plugins.module_utils.parallel import run_parallel
+from ansible_collections.community.stackrox.plugins.module_utils import exceptions
+
+class Journal:
+    """
+    Append-only, on-disk record of the operations a bulk run planned and of those that
+    completed, so that a run which dies halfway can be resumed by running it again.
+
+    The file holds one JSON object per line: first the plan, then one entry per completed
+    operation, in the order they finished:
+
+        {"plan": "<request fingerprint>", "operations": [{"key": ..., ...}, ...]}
+        {"done": "<operation key>", "result": ...}
+
+    Every line is flushed to disk before the call writing it returns, so the journal holds
+    every operation Central acknowledged. A line torn by a crash is dropped when the journal
+    is opened again.
+
+    `request` identifies what was asked for; a journal written for a different request
+    raises `JournalMismatchException` rather than being resumed. The file is readable by
+    the owner only, since results may carry newly created tokens and bundles.
+    """
+
+    def __init__(self, path, request):
+        self.path = path
+        self.fingerprint = fingerprint(json.dumps(request, sort_keys=True))
+        self.operations = None
+        self.results = {}
+        self._lock = threading.Lock()
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._file = os.fdopen(fd, 'r+b')
+
+        try:
+            self._load()
+        except BaseException:
+            self._file.close()
+            raise
+
+    def _load(self):
+        # read back the plan and completed operations, then cut off
+        # anything after the last complete line
+        end = 0
+        for line in self._file:
+            if not line.endswith(b'\n'):
+                break
+
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+
+            if 'plan' in entry:
+                if entry['plan'] != self.fingerprint:
+                    raise exceptions.JournalMismatchException(
+                        f"Journal {self.path} was written for a different request; remove it to start over")
+                self.operations = entry['operations']
+            elif 'done' in entry:
+                self.results[entry['done']] = entry['result']
+
+            end += len(line)
+
+        self._file.seek(end)
+        self._file.truncate()
+
+    @property
+    def resumed(self):
+        """
+        Whether the journal already held a plan when it was opened.
+        """
+        return self.operations is not None
+
+    def _append(self, entry):
+        with self._lock:
+            # records and other mappings are written as plain objects
+            self._file.write(json.dumps(entry, separators=(',', ':'), default=dict).encode('utf-8') + b'\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def plan(self, operations):
+        """
+        Record the operations of a new run. Each must be a JSON serializable dict
+        with a unique `key`.
+        """
+        self._append({"plan": self.fingerprint, "operations": operations})
+        self.operations = operations
+
+    def complete(self, key, result):
+        """
+        Record that the operation `key` succeeded with `result`.
+        """
+        self._append({"done": key, "result": result})
+        self.results[key] = result
+
+    def close(self, finished=False):
+        """
+        Close the journal. A `finished` run has nothing left to resume, so its journal is removed.
+        """
+        self._file.close()
+        if finished:
+            os.unlink(self.path)
+
+def journal_request(params, request):
+    """
+    Identify `request` together with the Central and credentials in `params`, for use as
+    a `Journal`'s `request`, so that a journal is never resumed against another Central
+    or as another user. Credentials only go in as a fingerprint.
+    """
+
+    return dict(central=params['central'],
+                credentials=fingerprint(params.get('token'), params.get('username'), params.get('password')),
+                request=request)
+
+def run_journaled(operations, run, max_workers=8, journal=None):
+    """
+    `run_parallel` for planned operations: call `run(operation)` for each and return
+    `(result, exception)` tuples in the same order.
+
+    With a `journal`, operations it has already completed are not run again and their
+    recorded result is returned; every other operation is recorded as soon as it succeeds.
+    """
+
+    if journal is None:
+        return run_parallel(run, operations, max_workers=max_workers)
+
+    def call(operation):
+        if operation['key'] in journal.results:
+            return journal.results[operation['key']]
+
+        result = run(operation)
+        journal.complete(operation['key'], result)
+        return result
+
+    return run_parallel(call, operations, max_workers=max_workers)
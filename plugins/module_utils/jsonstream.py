@@ -0,0 +1,199 @@
+import codecs
+import json
+
+WHITESPACE = ' \t\n\r'
+DELIMITERS = WHITESPACE + ',]}'
+
+_decoder = json.JSONDecoder()
+
+class _Reader:
+    """
+    Incrementally decoded text buffer over a binary `read(n)` function.
+
+    Consumed text is dropped every time more is read, so the buffer only ever
+    holds the value being decoded plus one chunk.
+    """
+
+    def __init__(self, read, chunk_size):
+        self._read = read
+        self._chunk_size = chunk_size
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        # read another chunk. Returns False once the input is exhausted.
+        if self.eof:
+            return False
+
+        chunk = self._read(self._chunk_size)
+        if chunk:
+            text = self._utf8.decode(chunk)
+        else:
+            self.eof = True
+            text = self._utf8.decode(b'', final=True)
+
+        self.buf = self.buf[self.pos:] + text
+        self.pos = 0
+        return True
+
+    def peek(self):
+        # skip whitespace and return the next character without consuming it
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+
+            if not self.fill():
+                raise ValueError("Unexpected end of JSON document")
+
+    def next(self):
+        c = self.peek()
+        self.pos += 1
+        return c
+
+    def expect(self, expected):
+        c = self.next()
+        if c != expected:
+            raise ValueError(f"Malformed JSON document: expected '{expected}', found '{c}'")
+
+    def value(self):
+        self.peek()
+
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # most likely the value runs past the end of the buffer
+                if not self.fill():
+                    raise
+                continue
+
+            # a number or literal is only complete once a delimiter follows it;
+            # "-1." or "12" at the end of a chunk may continue in the next one
+            if not isinstance(value, (dict, list, str)):
+                complete = end < len(self.buf) and self.buf[end] in DELIMITERS
+                if not complete and self.fill():
+                    continue
+
+            self.pos = end
+            return value
+
+def iter_array_items(read, key, chunk_size=65536):
+    """
+    Yield the elements of the array stored under `key` in a top-level JSON object,
+    one at a time, while reading the document from `read(n)`.
+
+    Other top-level keys are decoded and discarded. Nothing is yielded if `key` is absent.
+    The input is read to the end unless the caller stops iterating early.
+    """
+
+    reader = _Reader(read, chunk_size)
+
+    reader.expect('{')
+    if reader.peek() == '}':
+        reader.next()
+    else:
+        while True:
+            name = reader.value()
+            reader.expect(':')
+
+            if name == key and reader.peek() == '[':
+                reader.next()
+                if reader.peek() == ']':
+                    reader.next()
+                else:
+                    while True:
+                        yield reader.value()
+
+                        c = reader.next()
+                        if c == ']':
+                            break
+                        if c != ',':
+                            raise ValueError(f"Malformed JSON document: expected ',' or ']', found '{c}'")
+            else:
+                reader.value()
+
+            c = reader.next()
+            if c == '}':
+                break
+            if c != ',':
+                raise ValueError(f"Malformed JSON document: expected ',' or '}}', found '{c}'")
+
+    # drain whatever trails the document so the connection can be reused
+    while reader.fill():
+        pass
+
+def _stream_string(reader, sink):
+    # pass the contents of the string starting at reader.pos (just after
+    # its opening quote) to sink in pieces, unescaped
+    while True:
+        buf, pos = reader.buf, reader.pos
+        quote = buf.find('"', pos)
+        backslash = buf.find('\\', pos, quote if quote != -1 else len(buf))
+
+        if backslash != -1:
+            if backslash > pos:
+                sink(buf[pos:backslash])
+
+            # \uXXXX is the longest escape
+            length = 6 if buf[backslash + 1:backslash + 2] == 'u' else 2
+            if backslash + length > len(buf):
+                reader.pos = backslash
+                if not reader.fill():
+                    raise ValueError("Unexpected end of JSON document")
+                continue
+
+            sink(json.loads(f'"{buf[backslash:backslash + length]}"'))
+            reader.pos = backslash + length
+        elif quote != -1:
+            if quote > pos:
+                sink(buf[pos:quote])
+            reader.pos = quote + 1
+            return
+        else:
+            if len(buf) > pos:
+                sink(buf[pos:])
+            reader.pos = len(buf)
+            if not reader.fill():
+                raise ValueError("Unexpected end of JSON document")
+
+def read_object(read, sinks, chunk_size=65536):
+    """
+    Decode a top-level JSON object from `read(n)`, passing the string values of the keys
+    in `sinks` to `sinks[key](text)` piece by piece instead of decoding them whole.
+
+    Returns the object without those keys. Memory use stays flat however large the
+    streamed strings are.
+    """
+
+    reader = _Reader(read, chunk_size)
+    result = {}
+
+    reader.expect('{')
+    if reader.peek() == '}':
+        reader.next()
+    else:
+        while True:
+            name = reader.value()
+            reader.expect(':')
+
+            if name in sinks and reader.peek() == '"':
+                reader.next()
+                _stream_string(reader, sinks[name])
+            else:
+                result[name] = reader.value()
+
+            c = reader.next()
+            if c == '}':
+                break
+            if c != ',':
+                raise ValueError(f"Malformed JSON document: expected ',' or '}}', found '{c}'")
+
+    while reader.fill():
+        pass
+
+    return result
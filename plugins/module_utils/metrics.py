@@ -0,0 +1,74 @@
+import math
+import re
+import threading
+from urllib.parse import urlsplit
+
+# path segments that identify a single object rather than an endpoint
+ID_SEGMENT = re.compile(r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|\d+')
+
+def endpoint_template(url):
+    """
+    Return the path of `url` with object IDs replaced by `{id}` and the query dropped,
+    so requests to the same endpoint are grouped together.
+    """
+
+    return '/'.join('{id}' if ID_SEGMENT.fullmatch(segment) else segment
+                    for segment in urlsplit(url).path.split('/'))
+
+class RequestMetrics:
+    """
+    Collects one record per API request made by a service.
+
+    Each record has the `method`, `endpoint` template, `status` (None if no response
+    was received), `latency` in seconds until the body was read, `bytes_in`, `bytes_out`
+    (body sizes as transferred, i.e. compressed if they were) and the number of
+    `retries` it took.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.records = []
+
+    def record(self, method, url, status, latency, bytes_in=0, bytes_out=0, retries=0):
+        with self._lock:
+            self.records.append(dict(method=method,
+                                     endpoint=endpoint_template(url),
+                                     status=status,
+                                     latency=round(latency, 6),
+                                     bytes_in=bytes_in,
+                                     bytes_out=bytes_out,
+                                     retries=retries))
+
+def percentile(ordered, fraction):
+    #
+    # Nearest-rank percentile of an already sorted list.
+    #
+    rank = max(1, math.ceil(len(ordered) * fraction))
+    return ordered[rank - 1]
+
+def summarize(records):
+    """
+    Aggregate request records into per-endpoint statistics, keyed by `"METHOD endpoint"`.
+    """
+
+    by_endpoint = {}
+    for r in records:
+        by_endpoint.setdefault(f"{r['method']} {r['endpoint']}", []).append(r)
+
+    summary = {}
+    for key, group in sorted(by_endpoint.items()):
+        latencies = sorted(r['latency'] for r in group)
+        summary[key] = dict(
+            calls=len(group),
+            errors=sum(1 for r in group if r['status'] is None or r['status'] >= 400),
+            retries=sum(r['retries'] for r in group),
+            bytes_in=sum(r['bytes_in'] for r in group),
+            bytes_out=sum(r['bytes_out'] for r in group),
+            latency=dict(p50=percentile(latencies, 0.5),
+                         p90=percentile(latencies, 0.9),
+                         p99=percentile(latencies, 0.99),
+                         max=latencies[-1],
+                         total=round(sum(latencies), 6))
+        )
+
+    return summary
@@ -0,0 +1,27 @@
+def run_parallel(func, items, max_workers=8):
+    """
+    Call `func(item)` for every item in `items` using a bounded thread pool.
+
+    Returns a list of `(result, exception)` tuples in the same order as `items`.
+    Exactly one of the pair is set; a failing item does not stop the others.
+    """
+
+    items = list(items)
+    if not items:
+        return []
+
+    def call(item):
+        try:
+            return (func(item), None)
+        except Exception as e:
+            return (None, e)
+
+    # no point spinning up threads for a single call
+    if len(items) == 1 or max_workers <= 1:
+        return [call(item) for item in items]
+
+    # only paid for when there is something to run concurrently
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(call, items))
@@ -0,0 +1,184 @@
+import os
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from functools import wraps
+
+# file extension for each output format
+EXTENSIONS = {
+    'pstats': 'prof',
+    'collapsed': 'folded'
+}
+
+_NULL_SPAN = nullcontext()
+
+# the profiler of the module run in progress, if profiling was asked for
+_active = None
+
+class Spans:
+    """
+    Number of calls and wall-clock time of named spans, recorded from any thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spans = {}
+
+    def record(self, name, seconds):
+        with self._lock:
+            count, total, longest = self._spans.get(name, (0, 0.0, 0.0))
+            self._spans[name] = (count + 1, total + seconds, max(longest, seconds))
+
+    def summary(self):
+        with self._lock:
+            return { name: dict(count=count, total=round(total, 6), max=round(longest, 6))
+                     for name, (count, total, longest) in sorted(self._spans.items()) }
+
+class _Span:
+    __slots__ = ('_spans', '_name', '_start')
+
+    def __init__(self, spans, name):
+        self._spans = spans
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self._spans.record(self._name, time.perf_counter() - self._start)
+
+class SamplingProfiler:
+    """
+    Samples the stack of every other thread each `interval` seconds and counts how often
+    each stack was seen, for flame graphs in the collapsed stack format.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.counts = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        me = threading.get_ident()
+        names = { t.ident: t.name for t in threading.enumerate() }
+
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+
+            stack.append(names.get(ident, 'thread'))
+            key = ';'.join(reversed(stack))
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def enable(self):
+        self._thread = threading.Thread(target=self._run, name='stackrox-profiler', daemon=True)
+        self._thread.start()
+
+    def disable(self):
+        self._stop.set()
+        self._thread.join()
+
+    def dump_stats(self, path):
+        with open(path, 'w') as f:
+            for stack, count in sorted(self.counts.items()):
+                f.write(f"{stack} {count}\n")
+
+class Profiler:
+    """
+    Profiles one module run and times named spans within it.
+
+    The `pstats` format runs the deterministic `cProfile` profiler on the calling thread;
+    the `collapsed` format samples every thread, worker pools included, and writes collapsed
+    stacks for flame graph tools. If `path` is a directory, a file named after the module,
+    time and process is created in it.
+    """
+
+    def __init__(self, path, output_format='pstats', name='stackrox'):
+        self.path = path
+        self.output_format = output_format
+        self.name = name
+        self.spans = Spans()
+
+    def start(self):
+        if self.output_format == 'collapsed':
+            self._profiler = SamplingProfiler()
+        else:
+            # only paid for when profiling
+            import cProfile
+            self._profiler = cProfile.Profile()
+
+        self._start = time.perf_counter()
+        self._profiler.enable()
+
+    def stop(self):
+        """
+        Stop profiling, write the profile and return a summary of the run.
+        """
+
+        self._profiler.disable()
+        seconds = time.perf_counter() - self._start
+
+        path = self.path
+        if os.path.isdir(path):
+            path = os.path.join(path, f"{self.name}-{int(time.time() * 1000)}-{os.getpid()}.{EXTENSIONS[self.output_format]}")
+
+        self._profiler.dump_stats(path)
+
+        return dict(path=path, format=self.output_format, seconds=round(seconds, 6), spans=self.spans.summary())
+
+def start(path, output_format='pstats', name='stackrox'):
+    """
+    Start profiling the module run, which makes `span` record.
+    """
+
+    global _active
+    _active = Profiler(path, output_format, name)
+    _active.start()
+    return _active
+
+def stop():
+    """
+    Stop profiling and return the summary from `Profiler.stop`, or None if not profiling.
+    """
+
+    global _active
+    profiler, _active = _active, None
+    return profiler.stop() if profiler is not None else None
+
+def span(name):
+    """
+    Context manager timing the enclosed block as the span `name` while profiling.
+    Costs next to nothing otherwise.
+    """
+
+    if _active is None:
+        return _NULL_SPAN
+
+    return _Span(_active.spans, name)
+
+def timed(name):
+    """
+    Decorator timing every call of the function as the span `name` while profiling.
+    """
+
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
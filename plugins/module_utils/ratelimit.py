@@ -0,0 +1,189 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+
+# statuses that mean Central is overloaded rather than that the request was wrong
+THROTTLE_STATUSES = (429, 502, 503, 504)
+
+# methods that are safe to send again after a 5xx or a dropped connection.
+# PATCH is included as the only PATCH calls are revocations, which are idempotent.
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PATCH', 'DELETE')
+
+# a response this many times slower than the fastest seen counts as congestion,
+# as long as it is also at least LATENCY_FLOOR seconds slower
+LATENCY_TOLERANCE = 3.0
+LATENCY_FLOOR = 0.05
+
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+
+def parse_retry_after(headers):
+    """
+    Return the number of seconds asked for by a `Retry-After` header, or None.
+
+    Both the delay-seconds and the HTTP-date forms are accepted.
+    """
+
+    value = headers.get('Retry-After') if headers else None
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def backoff(attempt):
+    # exponential backoff with full jitter, so retrying clients spread out
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+def retry_delay(method, attempt, max_retries, status=None, headers=None):
+    """
+    Decide whether a request should be sent again.
+
+    Returns `(delay, retry_after)` - the seconds to wait and the `Retry-After` Central asked
+    for, if any - or None when it should not be retried. `status` is None after a connection error.
+    """
+
+    if attempt >= max_retries:
+        return None
+
+    if status is None:
+        retryable = method in IDEMPOTENT_METHODS
+    elif status == 429:
+        # throttled requests were never processed, so any method may be resent
+        retryable = True
+    else:
+        retryable = status in THROTTLE_STATUSES and method in IDEMPOTENT_METHODS
+
+    if not retryable:
+        return None
+
+    retry_after = parse_retry_after(headers) if status is not None else None
+    delay = backoff(attempt)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+
+    return delay, retry_after
+
+class Outcome:
+    def __init__(self):
+        self.throttled = False
+
+class RateController:
+    """
+    Adaptive client-side limit on request rate and concurrency, shared by every
+    thread making requests to the same Central.
+
+    Requests take a slot (bounded by the concurrency limit) and a token from a token
+    bucket refilled at the current rate. Both limits follow AIMD: they grow additively
+    while requests succeed quickly and halve when Central throttles or errors. A marked
+    rise in latency shrinks the concurrency limit more gently. A `Retry-After` from
+    Central pauses every caller until it has passed.
+
+    A `rate` of 0 means no rate limit, only the concurrency limit.
+    """
+
+    def __init__(self, rate=0, max_concurrency=16, min_concurrency=1):
+        self.max_rate = float(rate or 0)
+        self.rate = self.max_rate
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.limit = float(self.max_concurrency)
+
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._tokens = max(1.0, self.max_rate)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._baseline = None
+
+    def pause(self, seconds):
+        """
+        Hold back every new request for `seconds`.
+        """
+
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _wait_time(self):
+        # seconds until a request may start, taking a bucket token if it can start now.
+        now = time.monotonic()
+
+        if now < self._paused_until:
+            return self._paused_until - now
+
+        if not self.rate:
+            return 0
+
+        self._tokens = min(max(1.0, self.rate), self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0
+
+        return (1 - self._tokens) / self.rate
+
+    def _acquire(self):
+        with self._cond:
+            while self._in_flight >= int(self.limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+        while True:
+            with self._cond:
+                wait = self._wait_time()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def _release(self, latency, throttled):
+        with self._cond:
+            self._in_flight -= 1
+
+            slow = False
+            if not throttled:
+                # let the baseline creep up so one lucky response doesn't pin it forever
+                self._baseline = latency if self._baseline is None else min(latency, self._baseline * 1.05)
+                slow = latency > max(self._baseline * LATENCY_TOLERANCE, self._baseline + LATENCY_FLOOR)
+
+            if throttled:
+                self.limit = max(self.min_concurrency, self.limit / 2)
+                if self.max_rate:
+                    self.rate = max(self.max_rate / 100, self.rate / 2)
+            elif slow:
+                # latency is a noisier signal than an error; back off gently
+                self.limit = max(self.min_concurrency, self.limit * 0.9)
+            else:
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+                if self.max_rate:
+                    self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """
+        Wait for permission to send a request. Set `throttled` on the yielded
+        outcome if Central pushed back, so the limits can adapt.
+        """
+
+        self._acquire()
+        outcome = Outcome()
+        start = time.monotonic()
+
+        try:
+            yield outcome
+        except BaseException:
+            outcome.throttled = True
+            raise
+        finally:
+            self._release(time.monotonic() - start, outcome.throttled)
@@ -0,0 +1,148 @@
+from collections.abc import Mapping
+
+from ansible_collections.community.stackrox.plugins.module_utils.codec import get_codec
+
+_MISSING = object()
+_codec = get_codec()
+
+class Record(Mapping):
+    """
+    Compact, read-only view of an object returned by the Stackrox API.
+
+    The scalar fields listed in `FIELDS` are kept in slots. Everything else, such as
+    nested `createdBy` or `impactedClusters` structures, is kept as encoded JSON until
+    first accessed and then decoded once, so holding thousands of records that are only
+    looked up by their scalar fields costs a fraction of the memory of the dicts they
+    came from.
+
+    Records behave as read-only mappings, so `record['name']` and `record.get('id')`
+    work as on the original dict and records compare equal to it. Use `project` to turn
+    them back into plain dicts for module results.
+    """
+
+    FIELDS = ()
+    __slots__ = ('_rest', '_decoded')
+
+    def __init__(self, data):
+        fields = self.FIELDS
+        for key in fields:
+            value = data.get(key, _MISSING)
+            setattr(self, key, _MISSING if isinstance(value, (dict, list)) else value)
+
+        rest = {key: value for key, value in data.items() if key not in fields or isinstance(value, (dict, list))}
+
+        self._rest = _codec.dumps(rest) if rest else None
+        self._decoded = None
+
+    def _nested(self):
+        if self._decoded is None:
+            self._decoded = _codec.loads(self._rest) if self._rest else {}
+            # the decoded values replace the encoded ones
+            self._rest = None
+
+        return self._decoded
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            if value is not _MISSING:
+                return value
+
+        return self._nested()[key]
+
+    def __iter__(self):
+        for key in self.FIELDS:
+            if getattr(self, key) is not _MISSING:
+                yield key
+
+        yield from self._nested()
+
+    def __len__(self):
+        return sum(1 for key in self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def to_dict(self, fields=None):
+        """
+        Return the record as a dict. With `fields`, only those keys are included;
+        `a.b` selects key `b` of the nested object under `a`.
+        """
+
+        data = {key: getattr(self, key) for key in self.FIELDS if getattr(self, key) is not _MISSING}
+        data.update(self._nested())
+
+        if not fields:
+            return data
+
+        return select(data, fields)
+
+def select(data, fields):
+    #
+    # Copy only the listed (possibly dotted) fields of data.
+    # Fields that don't exist are left out.
+    #
+    selected = {}
+    nested = {}
+    for field in fields:
+        head, _, tail = field.partition('.')
+        if head not in data:
+            continue
+
+        if tail:
+            nested.setdefault(head, []).append(tail)
+        else:
+            selected[head] = data[head]
+
+    for head, tails in nested.items():
+        value = data[head]
+        if head in selected:
+            # the whole value was asked for as well
+            continue
+        elif isinstance(value, dict):
+            selected[head] = select(value, tails)
+        elif isinstance(value, list):
+            selected[head] = [select(item, tails) if isinstance(item, dict) else item for item in value]
+
+    return selected
+
+def project(value, fields=None):
+    """
+    Convert every record found in `value` (a record, or a dict or list containing them)
+    to a plain dict, keeping only `fields` if given.
+    """
+
+    if isinstance(value, Record):
+        return value.to_dict(fields)
+
+    if isinstance(value, dict):
+        return {key: project(item, fields) for key, item in value.items()}
+
+    if isinstance(value, list):
+        return [project(item, fields) for item in value]
+
+    return value
+
+class Token(Record):
+    FIELDS = ('id', 'name', 'role', 'issuedAt', 'expiration', 'revoked')
+    __slots__ = FIELDS
+
+class InitBundle(Record):
+    FIELDS = ('id', 'name', 'createdAt', 'expiresAt')
+    __slots__ = FIELDS
+
+class Cluster(Record):
+    FIELDS = ('id', 'name', 'type', 'mainImage', 'centralApiEndpoint')
+    __slots__ = FIELDS
+
+class Role(Record):
+    FIELDS = ('name', 'description', 'permissionSetId', 'accessScopeId')
+    __slots__ = FIELDS
+
+class Notifier(Record):
+    FIELDS = ('id', 'name', 'type', 'uiEndpoint', 'labelKey', 'labelDefault')
+    __slots__ = FIELDS
+
+class Policy(Record):
+    FIELDS = ('id', 'name', 'description', 'severity', 'disabled', 'isDefault', 'lastUpdated')
+    __slots__ = FIELDS
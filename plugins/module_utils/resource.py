@@ -0,0 +1,301 @@
+from contextlib import closing
+from urllib.parse import quote
+
+from ansible_collections.community.stackrox.plugins.module_utils.basic import StackroxService
+from ansible_collections.community.stackrox.plugins.module_utils.records import Record, Token, InitBundle, Cluster, Role, Notifier, Policy
+from ansible_collections.community.stackrox.plugins.module_utils.journal import run_journaled
+from ansible_collections.community.stackrox.plugins.module_utils import profiling
+
+class Endpoint:
+    """
+    Declaration of a Central API resource, from which `ResourceService` derives its requests.
+
+    The collection lives at `/v1/<api_base>/<path>` and a list response holds its objects in
+    the `list_key` array, each wrapped in `record`. An object's own URL is built from its
+    `id_field`; a get response holds it under `item_key`, or is the object itself if None.
+
+    `identity` are the fields objects are looked up by, which Central enforces `unique`
+    or not. `list_query` is the query string sent with every list request by default.
+
+    `verbs` maps each mutation to its HTTP method and URL suffix below the collection,
+    in which `{id}` is replaced by the object's ID. `queries` does the same for requests
+    that only read, even though they are not GETs, such as a POST carrying a search.
+    """
+
+    def __init__(self, name, api_base, list_key, record=Record, path='', id_field='id', item_key=None,
+                 identity=('name',), unique=True, list_query='', verbs=None, queries=None):
+        self.name = name
+        self.api_base = api_base
+        self.list_key = list_key
+        self.record = record
+        self.path = path
+        self.id_field = id_field
+        self.item_key = item_key
+        self.identity = identity
+        self.unique = unique
+        self.list_query = list_query
+        self.verbs = verbs or {}
+        self.queries = queries or {}
+
+    def suffix(self, template='', id=None):
+        #
+        # URL suffix below the API base for a verb's suffix template.
+        #
+        if '{id}' in template:
+            if id is None:
+                raise ValueError(f"An ID is needed to address a single object of {self.name}")
+            template = template.format(id=quote(str(id), safe=''))
+
+        return '/'.join(part for part in (self.path, template) if part)
+
+# every resource the collection talks to
+ENDPOINTS = {
+    'apitokens': Endpoint('apitokens', api_base='apitokens', list_key='tokens', record=Token,
+                          unique=False, list_query='revoked=false',
+                          verbs={'create': ('POST', 'generate'),
+                                 'revoke': ('PATCH', 'revoke/{id}')}),
+    'initbundles': Endpoint('initbundles', api_base='cluster-init', path='init-bundles', list_key='items',
+                            record=InitBundle,
+                            verbs={'create': ('POST', ''),
+                                   'revoke': ('PATCH', 'revoke')}),
+    'clusters': Endpoint('clusters', api_base='clusters', list_key='clusters', item_key='cluster',
+                         record=Cluster,
+                         verbs={'create': ('POST', ''),
+                                'update': ('PUT', '{id}'),
+                                'delete': ('DELETE', '{id}')}),
+    'roles': Endpoint('roles', api_base='roles', list_key='roles', id_field='name', record=Role,
+                      verbs={'create': ('POST', '{id}'),
+                             'update': ('PUT', '{id}'),
+                             'delete': ('DELETE', '{id}')}),
+    'notifiers': Endpoint('notifiers', api_base='notifiers', list_key='notifiers', record=Notifier,
+                          verbs={'create': ('POST', ''),
+                                 'update': ('PUT', '{id}'),
+                                 'delete': ('DELETE', '{id}')}),
+    'policies': Endpoint('policies', api_base='policies', list_key='policies', record=Policy,
+                         verbs={'import': ('POST', 'import'),
+                                'update': ('PUT', '{id}'),
+                                'delete': ('DELETE', '{id}')},
+                         queries={'export': ('POST', 'export')})
+}
+
+class ResourceService(StackroxService):
+    """
+    Service for the resource declared by `ENDPOINT`, giving every resource the same
+    lookups and bulk operations on top of `StackroxService`.
+
+    `list` streams the response, or serves it from the shared response cache when enabled.
+    `index` builds a table from a single list, keyed by an identity field; it is kept for
+    the life of the service and dropped by any change made through it. `find` answers from
+    that table when it has been built and otherwise streams the list, stopping at the first
+    match when the field is unique.
+    Use `index` when looking up many objects, `find` for one or two.
+
+    Changes go through `mutate` with one of the endpoint's verbs, and `apply` carries out
+    many of them concurrently. The endpoint's other requests go through `query`, which
+    leaves the lookup tables and the shared cache alone.
+    """
+
+    ENDPOINT = None
+
+    def __init__(self, **kwargs):
+        kwargs['api_base'] = self.ENDPOINT.api_base
+        super().__init__(**kwargs)
+        self._indexes = {}
+
+    def _span(self, operation):
+        return profiling.span(f"{self.ENDPOINT.name}.{operation}")
+
+    def _query(self, query_string):
+        return self.ENDPOINT.list_query if query_string is None else query_string
+
+    def _unique(self, field):
+        endpoint = self.ENDPOINT
+        return field == endpoint.id_field or (endpoint.unique and field in endpoint.identity)
+
+    def _list(self, query_string):
+        endpoint = self.ENDPOINT
+
+        # each item becomes a record as it is decoded, so the whole list is never held as dicts
+        with self._span('list'), closing(self._request_items(endpoint.list_key,
+                                                             url_suffix=endpoint.suffix(),
+                                                             query_string=query_string)) as items:
+            return [endpoint.record(item) for item in items]
+
+    def list(self, query_string=None):
+        """
+        Return every object, as records. `query_string` replaces the endpoint's `list_query`.
+        """
+        return self._list(self._query(query_string))
+
+    def index(self, field=None, query_string=None):
+        """
+        Return a dict of `field` value (by default the first identity field) to the record
+        with that value, or to the list of records with it when the field isn't unique.
+        """
+
+        field = field or self.ENDPOINT.identity[0]
+        query_string = self._query(query_string)
+
+        index = self._indexes.get((field, query_string))
+        if index is not None:
+            return index
+
+        with self._span('index'):
+            index = {}
+            if self._unique(field):
+                for record in self._list(query_string):
+                    index[record.get(field)] = record
+            else:
+                for record in self._list(query_string):
+                    index.setdefault(record.get(field), []).append(record)
+
+        self._indexes[(field, query_string)] = index
+        return index
+
+    def find(self, value, field=None, query_string=None):
+        """
+        Return the record whose `field` (by default the first identity field) is `value`,
+        or None. When the field isn't unique, return the list of matching records instead.
+        """
+
+        endpoint = self.ENDPOINT
+        field = field or endpoint.identity[0]
+        query_string = self._query(query_string)
+        unique = self._unique(field)
+
+        index = self._indexes.get((field, query_string))
+        if index is not None:
+            return index.get(value) if unique else list(index.get(value, []))
+
+        with self._span('find'), closing(self._request_items(endpoint.list_key,
+                                                             url_suffix=endpoint.suffix(),
+                                                             query_string=query_string)) as items:
+            if not unique:
+                return [endpoint.record(item) for item in items if item.get(field) == value]
+
+            for item in items:
+                if item.get(field) == value:
+                    return endpoint.record(item)
+
+        return None
+
+    def get(self, id):
+        """
+        Return the object with the given ID as a record.
+        """
+
+        endpoint = self.ENDPOINT
+
+        with self._span('get'):
+            res = self._request(url_suffix=endpoint.suffix('{id}', id))
+
+        return endpoint.record(res[endpoint.item_key] if endpoint.item_key else res)
+
+    def mutate(self, action, id=None, data=None):
+        """
+        Send the endpoint's `action` verb for the object `id`, or for the one described by
+        `data` when its URL needs an ID and none is given, and return the response.
+        """
+
+        endpoint = self.ENDPOINT
+        if action not in endpoint.verbs:
+            raise ValueError(f"{endpoint.name} does not support {action}")
+
+        method, template = endpoint.verbs[action]
+        if id is None and data:
+            id = data.get(endpoint.id_field)
+
+        try:
+            with self._span(action):
+                return self._request(url_suffix=endpoint.suffix(template, id),
+                                     method=method,
+                                     data=data)
+        finally:
+            # whatever happened, the lookup tables may no longer be right
+            self._indexes.clear()
+
+    def query(self, action, id=None, data=None):
+        """
+        Send the endpoint's read-only `action` request, for the object `id` if its URL needs
+        one, and return the response.
+        """
+
+        endpoint = self.ENDPOINT
+        if action not in endpoint.queries:
+            raise ValueError(f"{endpoint.name} does not support {action}")
+
+        method, template = endpoint.queries[action]
+
+        with self._span(action):
+            return self._request(url_suffix=endpoint.suffix(template, id),
+                                 method=method,
+                                 data=data,
+                                 mutating=False)
+
+    def create(self, data):
+        return self.mutate('create', data=data)
+
+    def update(self, id, data):
+        return self.mutate('update', id=id, data=data)
+
+    def delete(self, id):
+        return self.mutate('delete', id=id)
+
+    def apply(self, operations, parallelism=8, journal=None):
+        """
+        Carry out planned operations concurrently, at most `parallelism` at a time, and
+        return a `(result, exception)` tuple for each, in order.
+
+        Each operation is a dict with a unique `key`, an `action` (one of the endpoint's
+        verbs) and optionally `id` and `data`, passed on to `mutate`. With a `Journal`,
+        operations it records as completed are not sent again.
+        """
+
+        with self._span('apply'):
+            return apply_operations(operations,
+                                    lambda operation: self.mutate(operation['action'],
+                                                                  id=operation.get('id'),
+                                                                  data=operation.get('data')),
+                                    parallelism=parallelism,
+                                    journal=journal)
+
+def apply_operations(operations, run, parallelism=8, journal=None, batched=(), run_batch=None, batch_size=None):
+    """
+    Carry out planned operations, each a dict with a unique `key` and an `action`, and
+    return a `(result, exception)` tuple for each, in order.
+
+    Operations whose action is in `batched` go first, `batch_size` of the same action at a
+    time (all at once by default), through `run_batch(operations)`, which returns an outcome
+    per operation; one with a falsy result was left undone. The rest are passed to
+    `run(operation)`, at most `parallelism` at a time.
+
+    With a `Journal`, operations it records as completed are not carried out again, and
+    every other one is recorded as soon as it succeeds.
+    """
+
+    outcomes = {}
+    batches = {}
+    for operation in operations:
+        if operation['action'] not in batched:
+            continue
+
+        if journal is not None and operation['key'] in journal.results:
+            outcomes[operation['key']] = (journal.results[operation['key']], None)
+        else:
+            batches.setdefault(operation['action'], []).append(operation)
+
+    for pending in batches.values():
+        size = batch_size or len(pending)
+        for start in range(0, len(pending), size):
+            batch = pending[start:start + size]
+
+            for operation, (result, error) in zip(batch, run_batch(batch)):
+                if journal is not None and error is None and result:
+                    journal.complete(operation['key'], result)
+                outcomes[operation['key']] = (result, error)
+
+    single = [operation for operation in operations if operation['action'] not in batched]
+    outcomes.update(zip((operation['key'] for operation in single),
+                        run_journaled(single, run, max_workers=parallelism, journal=journal)))
+
+    return [outcomes[operation['key']] for operation in operations]
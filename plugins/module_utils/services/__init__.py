@@ -0,0 +1,17 @@
+import importlib
+
+def lazy_async_service(module_name, async_module):
+    #
+    # Return a module __getattr__ that provides AsyncService from the
+    # sibling async_module.
+    #
+    # AsyncService pulls in asyncio, which modules never use. It is imported on
+    # first access, by name so that it also stays out of AnsiballZ payloads.
+    #
+    def __getattr__(name):
+        if name == 'AsyncService':
+            return importlib.import_module(f"{__name__}.{async_module}").AsyncService
+
+        raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+
+    return __getattr__
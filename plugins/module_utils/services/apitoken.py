@@ -1,25 +1,30 @@
-from ansible_collections.community.stackrox.plugins.module_utils.basic import StackroxService
-from ansible_collections.community.stackrox.plugins.module_utils import exceptions
+from ansible_collections.community.stackrox.plugins.module_utils.resource import ResourceService, ENDPOINTS, apply_operations
+from ansible_collections.community.stackrox.plugins.module_utils.profiling import timed
+from ansible_collections.community.stackrox.plugins.module_utils.services import lazy_async_service
 
-class Service(StackroxService):
-    def __init__(self, **kwargs):
-        kwargs['api_base'] = 'apitokens'
-        super().__init__(**kwargs)
+class Service(ResourceService):
+    ENDPOINT = ENDPOINTS['apitokens']
 
     def list(self, include_revoked=False):
         """
-        Return a list of all API tokens.
+        Return a list of all API tokens, as `Token` records.
 
         By default this will exclude all tokens that have been revoked.
 
         To include these, set `include_revoked` to `True`.
         """
 
-        res = self._request(
-                query_string=f"revoked={str(include_revoked).lower()}"
-              )
+        return super().list(revoked_query(include_revoked))
 
-        return res['tokens']
+    def index(self, include_revoked=False):
+        """
+        Return a dict of token name to the list of tokens with that name,
+        built from a single call to `list`.
+
+        Use this instead of repeated calls to `get` by name when looking up many tokens.
+        """
+
+        return super().index(query_string=revoked_query(include_revoked))
 
     def get(self, name=None, id=None, include_revoked=False):
         """
@@ -28,32 +33,24 @@ class Service(StackroxService):
         If ID is provided, this will be used by preference if Name is also provided.
 
         If only Name is provided, then all tokens will be fetched to find
-        the match. You may end up with multiple tokens returned as names are not unique
-        within the Stackrox API.
+        the match, unless `index` has already been called. You may end up with multiple
+        tokens returned as names are not unique within the Stackrox API.
         """
         
         if not name and not id:
             raise Exception("Either name or id must be provided")
 
-        matched_tokens = []
-
         def include_token(t):
             return ((not t['revoked']) or (t['revoked'] and include_revoked))
 
         if id:
-            t = self._request(
-                        url_suffix=id
-                    )
-
-            # token is either not revoked,
-            # or is revoked and we're including it anyway
-            if include_token(t):
-                matched_tokens.append(t)
-
+            tokens = [ super().get(id) ]
         else:
-            matched_tokens = [ t for t in self.list(include_revoked) if t['name'] == name and include_token(t) ]
+            tokens = self.find(name, query_string=revoked_query(include_revoked))
 
-        return matched_tokens
+        # token is either not revoked,
+        # or is revoked and we're including it anyway
+        return [ t for t in tokens if include_token(t) ]
 
     def create(self, name, role):
         """
@@ -64,13 +61,7 @@ class Service(StackroxService):
         Roles are strings and correspond to the role names as found in the API, e.g. "Continous Integration".
         """
 
-        token = self._request(
-                    url_suffix='generate',
-                    method='POST',
-                    data={"name": name, "role": role}
-                )
-
-        return token
+        return super().create({"name": name, "role": role})
 
     def revoke(self, id=None, name=None):
         """
@@ -90,14 +81,44 @@ class Service(StackroxService):
             # no ID provided but we have a name
 
             # fetch the token and get the ID
-            token = self.get(name=name)
+            tokens = self.get(name=name)
 
-            if isinstance(token, list):
+            if len(tokens) > 1:
                 raise Exception(f"More than one active token with the name {name} was found. Use token ID instead.")
 
-            id = token['id']
+            if len(tokens) == 0:
+                raise Exception(f"No active token with the name {name} was found.")
 
-        result = self._request(method="PATCH",
-                                url_suffix=f"revoke/{id}")
+            id = tokens[0]['id']
 
+        self.mutate('revoke', id=id)
         return True
+
+    @timed('apitokens.apply')
+    def apply(self, operations, parallelism=8, journal=None):
+        """
+        Carry out planned token operations concurrently, at most `parallelism` at a time,
+        and return a `(result, exception)` tuple for each, in order.
+
+        Each operation is a dict with a unique `key` and an `action`, either `create` (with
+        `name` and `role`) or `revoke` (with `id`). Results are as from `create` and `revoke`.
+
+        With a `Journal`, operations it records as completed are not sent again, and every
+        operation is recorded as soon as Central acknowledges it.
+        """
+
+        def run(operation):
+            if operation['action'] == 'create':
+                return self.create(name=operation['name'], role=operation['role'])
+
+            return self.revoke(id=operation['id'])
+
+        return apply_operations(operations, run, parallelism=parallelism, journal=journal)
+
+def revoked_query(include_revoked):
+    #
+    # Query string for listing tokens, with or without the revoked ones.
+    #
+    return f"revoked={str(include_revoked).lower()}"
+
+__getattr__ = lazy_async_service(__name__, 'apitoken_async')
@@ -0,0 +1,51 @@
+from ansible_collections.community.stackrox.plugins.module_utils.aio import AsyncResourceService
+from ansible_collections.community.stackrox.plugins.module_utils.resource import ENDPOINTS
+from ansible_collections.community.stackrox.plugins.module_utils.services.apitoken import revoked_query
+
+class AsyncService(AsyncResourceService):
+    """
+    asyncio counterpart of `Service`. Methods behave the same but must be awaited.
+    """
+
+    ENDPOINT = ENDPOINTS['apitokens']
+
+    async def list(self, include_revoked=False):
+        return await super().list(revoked_query(include_revoked))
+
+    async def index(self, include_revoked=False):
+        return await super().index(query_string=revoked_query(include_revoked))
+
+    async def get(self, name=None, id=None, include_revoked=False):
+        if not name and not id:
+            raise Exception("Either name or id must be provided")
+
+        def include_token(t):
+            return ((not t['revoked']) or (t['revoked'] and include_revoked))
+
+        if id:
+            tokens = [ await super().get(id) ]
+        else:
+            tokens = await self.find(name, query_string=revoked_query(include_revoked))
+
+        return [ t for t in tokens if include_token(t) ]
+
+    async def create(self, name, role):
+        return await super().create({"name": name, "role": role})
+
+    async def revoke(self, id=None, name=None):
+        if not id and not name:
+            raise Exception("Either token ID or name must be provided.")
+
+        if not id and name:
+            tokens = await self.get(name=name)
+
+            if len(tokens) > 1:
+                raise Exception(f"More than one active token with the name {name} was found. Use token ID instead.")
+
+            if len(tokens) == 0:
+                raise Exception(f"No active token with the name {name} was found.")
+
+            id = tokens[0]['id']
+
+        await self.mutate('revoke', id=id)
+        return True
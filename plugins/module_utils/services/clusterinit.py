@@ -1,25 +1,35 @@
-from ansible.module_utils.urls import open_url
-from http.client import HTTPException
-import json
-from typing import List, Dict
+import os
 
-from ansible_collections.community.stackrox.plugins.module_utils.basic import StackroxService
+from ansible_collections.community.stackrox.plugins.module_utils.resource import ResourceService, ENDPOINTS, apply_operations
+from ansible_collections.community.stackrox.plugins.module_utils.profiling import timed
+from ansible_collections.community.stackrox.plugins.module_utils.files import Base64File
 from ansible_collections.community.stackrox.plugins.module_utils import exceptions
+from ansible_collections.community.stackrox.plugins.module_utils.services import lazy_async_service
 
-class Service(StackroxService):
-    def __init__(self, **kwargs):
-        kwargs['api_base'] = 'cluster-init'
-        super().__init__(**kwargs)
+# file name for each bundle format in a new bundle, by response key
+BUNDLE_FILES = {
+    'helmValuesBundle': '{name}-helm-values.yaml',
+    'kubectlBundle': '{name}-kubectl.yaml'
+}
+
+class Service(ResourceService):
+    ENDPOINT = ENDPOINTS['initbundles']
 
     def list_initbundles(self):
         #
-        # Return a list of all bundles
+        # Return a list of all bundles, as InitBundle records
         #
-        res = self._request(
-                url_suffix='init-bundles'
-              )
+        return self.list()
 
-        return res['items']
+    def index_initbundles(self):
+        #
+        # Return a dict of bundle name to bundle, built from
+        # a single call to list_initbundles.
+        #
+        # Use this instead of repeated calls to get_initbundle
+        # when looking up many bundles.
+        #
+        return self.index()
 
     def get_initbundle(self, name):
         #
@@ -27,23 +37,47 @@ class Service(StackroxService):
         #
         # Returns None if no bundle is found.
         #
-        all_bundles = self.list_initbundles()
-        for bundle in all_bundles:
-            if bundle['name'] == name:
-                return bundle
-
-        return None
+        # bundle names are unique, so this stops reading
+        # as soon as it's found
+        return self.find(name)
 
-    def create_initbundle(self, name):
+    def create_initbundle(self, name, dest_dir=None):
         #
         # Create a bundle with the given name.
         #
-        bundle = self._request(
-                    url_suffix='init-bundles',
-                    method='POST',
-                    data={"name": name}
-                 )
-
+        # With dest_dir, the helm values and kubectl bundles are decoded
+        # into files there while the response streams in, and their paths
+        # are returned (as helmValuesBundleFile and kubectlBundleFile)
+        # instead of their base64 contents.
+        #
+        if dest_dir is None:
+            return self.create({"name": name})
+
+        paths = bundle_paths(dest_dir, name)
+        method, template = self.ENDPOINT.verbs['create']
+        files = {}
+
+        try:
+            for key, path in paths.items():
+                files[key] = Base64File(path)
+
+            with self._span('create'):
+                bundle = self._request_streamed(
+                            { key: f.write for key, f in files.items() },
+                            url_suffix=self.ENDPOINT.suffix(template),
+                            method=method,
+                            data={"name": name}
+                         )
+
+            for f in files.values():
+                f.commit()
+        finally:
+            self._indexes.clear()
+
+            for f in files.values():
+                f.discard()
+
+        bundle.update({ f"{key}File": f.path for key, f in files.items() })
         return bundle
 
     def revoke_initbundles(self, 
@@ -56,32 +90,108 @@ class Service(StackroxService):
         # bundle_ids may be a list of IDs or a string containing
         # a single ID.
         #
+        result = self.mutate('revoke', data=revoke_request(bundle_ids, impacted_cluster_ids))
 
-        bundle_ids = bundle_ids if type(bundle_ids) == list else [bundle_ids]
-
-        if len(bundle_ids) == 0:
-            raise ValueError("No init bundle IDs provided")
-
-        # ensure we only have strings in the bundle and cluster ids
-        for id in bundle_ids:
-            if type(id) != str:
-                raise ValueError("Bundle IDs must be strings")
+        return revoked_ids(result)
 
-        for id in impacted_cluster_ids:
-            if type(id) != str:
-                raise ValueError("Impacted cluster IDs must be strings")
-
-        data = {
-            "ids": bundle_ids,
-            "confirmImpactedClusterIds": impacted_cluster_ids
-        }
-
-        result = self._request(method="PATCH",
-                                url_suffix="init-bundles/revoke",
-                                data=data)
-
-        # one or more bundle IDs failed to revoke
-        if len(result['initBundleRevocationErrors']) > 0:
-            raise exceptions.BundleRevokeFailedException(result['initBundleRevocationErrors'])
-
-        return result['initBundleRevokedIds']
+    @timed('initbundles.apply')
+    def apply(self, operations, parallelism=8, journal=None, batch_size=None):
+        #
+        # Carry out planned bundle operations and return a (result, exception)
+        # tuple for each, in order.
+        #
+        # Each operation is a dict with a unique key and an action:
+        # create (with name and optionally dest_dir, as for create_initbundle)
+        # or revoke (with id and impacted_cluster_ids).
+        #
+        # Revocations go out batch_size at a time, all in one call by default,
+        # and result in whether Central revoked the bundle. Creates run
+        # concurrently, at most parallelism at a time.
+        #
+        # With a Journal, operations it records as completed are not sent
+        # again, and every operation is recorded as soon as Central
+        # acknowledges it.
+        #
+        return apply_operations(operations,
+                                lambda operation: self.create_initbundle(name=operation['name'],
+                                                                         dest_dir=operation.get('dest_dir')),
+                                parallelism=parallelism,
+                                journal=journal,
+                                batched=('revoke',),
+                                run_batch=lambda batch: revoke_batch(self, batch),
+                                batch_size=batch_size)
+
+def revoke_batch(service, batch):
+    #
+    # Revoke a batch of planned revoke operations in one call and
+    # return an outcome for each: True if Central revoked the bundle,
+    # False if it didn't, or the error it reported for it.
+    #
+    impacted_cluster_ids = list(dict.fromkeys(id for operation in batch for id in operation['impacted_cluster_ids']))
+
+    errors = {}
+    try:
+        revoked = service.revoke_initbundles(bundle_ids=[operation['id'] for operation in batch],
+                                             impacted_cluster_ids=impacted_cluster_ids)
+    except exceptions.BundleRevokeFailedException as e:
+        revoked = e.revoked_ids
+        errors = { error['id']: Exception(error['error']) for error in e.failed_bundles }
+    except Exception as e:
+        revoked = []
+        errors = { operation['id']: e for operation in batch }
+
+    outcomes = []
+    for operation in batch:
+        if operation['id'] in revoked:
+            outcomes.append((True, None))
+        elif operation['id'] in errors:
+            outcomes.append((None, errors[operation['id']]))
+        else:
+            outcomes.append((False, None))
+
+    return outcomes
+
+def bundle_paths(dest_dir, name):
+    #
+    # Return the path to write each format of the named bundle to, by response key.
+    #
+    if not name or name in ('.', '..') or os.path.basename(name) != name:
+        raise ValueError(f"Cannot write init bundle files for bundle name '{name}'")
+
+    return { key: os.path.join(dest_dir, template.format(name=name)) for key, template in BUNDLE_FILES.items() }
+
+def revoke_request(bundle_ids, impacted_cluster_ids):
+    #
+    # Validate revocation arguments and build the request body.
+    #
+    bundle_ids = bundle_ids if type(bundle_ids) == list else [bundle_ids]
+
+    if len(bundle_ids) == 0:
+        raise ValueError("No init bundle IDs provided")
+
+    # ensure we only have strings in the bundle and cluster ids
+    for id in bundle_ids:
+        if type(id) != str:
+            raise ValueError("Bundle IDs must be strings")
+
+    for id in impacted_cluster_ids:
+        if type(id) != str:
+            raise ValueError("Impacted cluster IDs must be strings")
+
+    return {
+        "ids": bundle_ids,
+        "confirmImpactedClusterIds": impacted_cluster_ids
+    }
+
+def revoked_ids(result):
+    #
+    # Return the revoked IDs from a revocation response,
+    # raising if any bundle failed to revoke.
+    #
+    if len(result['initBundleRevocationErrors']) > 0:
+        raise exceptions.BundleRevokeFailedException(result['initBundleRevocationErrors'],
+                                                     revoked_ids=result['initBundleRevokedIds'])
+
+    return result['initBundleRevokedIds']
+
+__getattr__ = lazy_async_service(__name__, 'clusterinit_async')
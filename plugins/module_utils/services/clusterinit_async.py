@@ -0,0 +1,27 @@
+from ansible_collections.community.stackrox.plugins.module_utils.aio import AsyncResourceService
+from ansible_collections.community.stackrox.plugins.module_utils.resource import ENDPOINTS
+from ansible_collections.community.stackrox.plugins.module_utils.services.clusterinit import revoke_request, revoked_ids
+
+class AsyncService(AsyncResourceService):
+    #
+    # asyncio counterpart of Service. Methods behave the same
+    # but must be awaited.
+    #
+    ENDPOINT = ENDPOINTS['initbundles']
+
+    async def list_initbundles(self):
+        return await self.list()
+
+    async def index_initbundles(self):
+        return await self.index()
+
+    async def get_initbundle(self, name):
+        return await self.find(name)
+
+    async def create_initbundle(self, name):
+        return await self.create({"name": name})
+
+    async def revoke_initbundles(self, bundle_ids, impacted_cluster_ids):
+        result = await self.mutate('revoke', data=revoke_request(bundle_ids, impacted_cluster_ids))
+
+        return revoked_ids(result)
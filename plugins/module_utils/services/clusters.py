@@ -0,0 +1,9 @@
+from ansible_collections.community.stackrox.plugins.module_utils.resource import ResourceService, ENDPOINTS
+
+class Service(ResourceService):
+    """
+    Secured clusters, as `Cluster` records. Names are unique; `find(name)` looks one up
+    and `delete(id)` removes it from Central.
+    """
+
+    ENDPOINT = ENDPOINTS['clusters']
@@ -0,0 +1,19 @@
+from ansible_collections.community.stackrox.plugins.module_utils.services import apitoken, clusterinit
+
+class Service:
+    """
+    The API token and cluster init bundle services together, for modules that work
+    on both. They share one connection pool, rate controller and set of metrics.
+    """
+
+    def __init__(self, **kwargs):
+        self.tokens = apitoken.Service(**kwargs)
+
+        kwargs.update(transport=self.tokens.transport, rate_controller=self.tokens.rate_controller)
+        self.initbundles = clusterinit.Service(**kwargs)
+
+        self.metrics = self.initbundles.metrics = self.tokens.metrics
+
+    def close(self):
+        self.initbundles.close()
+        self.tokens.close()
@@ -0,0 +1,9 @@
+from ansible_collections.community.stackrox.plugins.module_utils.resource import ResourceService, ENDPOINTS
+
+class Service(ResourceService):
+    """
+    Notifier integrations, as `Notifier` records. Names are unique; `find(name)` looks
+    one up by name.
+    """
+
+    ENDPOINT = ENDPOINTS['notifiers']
@@ -0,0 +1,40 @@
+from ansible_collections.community.stackrox.plugins.module_utils.resource import ResourceService, ENDPOINTS
+
+class Service(ResourceService):
+    """
+    Security policies, as `Policy` records from `list`, `index` and `find`. Whole policies
+    go in and out through Central's batch import and export endpoints.
+    """
+
+    ENDPOINT = ENDPOINTS['policies']
+
+    def export_policies(self, ids, batch_size=100):
+        """
+        Return the full policies with the given IDs, exported `batch_size` per request.
+        """
+
+        ids = list(ids)
+        policies = []
+        for start in range(0, len(ids), batch_size):
+            res = self.query('export', data={"policyIds": ids[start:start + batch_size]})
+            policies += res['policies']
+
+        return policies
+
+    def import_policies(self, policies, overwrite=True, batch_size=100):
+        """
+        Import full policies, `batch_size` per request, and return Central's response for
+        each, in order: a dict with `succeeded`, the stored `policy` and any `errors`.
+
+        With `overwrite`, a policy replaces the existing one with the same ID or name;
+        otherwise such a policy fails with a duplicate error.
+        """
+
+        policies = list(policies)
+        responses = []
+        for start in range(0, len(policies), batch_size):
+            res = self.mutate('import', data={"metadata": {"overwrite": overwrite},
+                                              "policies": policies[start:start + batch_size]})
+            responses += res['responses']
+
+        return responses
@@ -0,0 +1,9 @@
+from ansible_collections.community.stackrox.plugins.module_utils.resource import ResourceService, ENDPOINTS
+
+class Service(ResourceService):
+    """
+    Roles, as `Role` records. A role is addressed by its name, so `create(data)` takes
+    the name from `data` and `get`, `update` and `delete` take the name as ID.
+    """
+
+    ENDPOINT = ENDPOINTS['roles']
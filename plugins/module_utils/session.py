@@ -0,0 +1,139 @@
+import base64
+import json
+import os
+import time
+from urllib.parse import urlencode, urlsplit, parse_qs
+
+from ansible_collections.community.stackrox.plugins.module_utils.cache import private_dir, fingerprint, file_lock, atomic_write
+
+# refresh a session token this many seconds before it expires
+EXPIRY_MARGIN = 60
+
+# assumed lifetime of a token that doesn't say when it expires
+DEFAULT_LIFETIME = 300
+
+def token_expiry(token):
+    """
+    Return the `exp` claim of a JWT as a unix timestamp. The signature is not checked;
+    this is only used to decide when to refresh.
+    """
+
+    try:
+        payload = token.split('.')[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        return float(claims['exp'])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return time.time() + DEFAULT_LIFETIME
+
+class SessionTokenStore:
+    """
+    Exchanges a username and password for a short-lived Central session token, so that
+    Central verifies the password once rather than on every request.
+
+    The token is kept in a file readable only by the current user, shared by every module
+    run with the same Central and credentials, and exchanged again shortly before it expires.
+    Forks that need a new token at the same moment wait on a file lock for the first one.
+
+    The exchange logs in through Central's basic auth provider. If that fails for any
+    reason, `token()` returns None and callers should keep using basic auth.
+    """
+
+    def __init__(self, central, username, password, transport, cache_dir=None):
+        self.central = central
+        self.username = username
+        self.password = password
+        self.transport = transport
+        self._unavailable = False
+
+        directory = private_dir(cache_dir, 'sessions')
+
+        self.directory = directory
+        self.path = os.path.join(directory, fingerprint(central, username, password) + '.token')
+        self._token, self._expires = None, 0
+
+    def _read(self):
+        try:
+            with open(self.path, 'r') as f:
+                stored = json.load(f)
+            return stored['token'], stored['expires']
+        except (OSError, ValueError, KeyError):
+            return None, 0
+
+    def _valid(self, expires):
+        return expires - EXPIRY_MARGIN > time.time()
+
+    def _exchange(self):
+        #
+        # Log in through the basic auth provider and return the
+        # token Central hands back in the redirect.
+        #
+        resp = self.transport.request('GET', f"{self.central}/v1/login/authproviders",
+                                      headers={"Accept": "application/json"})
+        if resp.status != 200:
+            return None
+
+        providers = json.loads(resp.read()).get('authProviders', [])
+        basic = [p for p in providers if p.get('type') == 'basic' and p.get('enabled', True)]
+        if not basic:
+            return None
+
+        resp = self.transport.request('POST', f"{self.central}/sso/providers/basic/{basic[0]['id']}/challenge",
+                                      headers={"Content-Type": "application/x-www-form-urlencoded"},
+                                      body=urlencode({"username": self.username, "password": self.password}))
+
+        location = resp.headers.get('Location') if resp.status in (302, 303, 307) else None
+        if not location:
+            return None
+
+        parts = urlsplit(location)
+        found = parse_qs(parts.fragment).get('token') or parse_qs(parts.query).get('token')
+        return found[0] if found else None
+
+    def token(self):
+        """
+        Return a valid session token, exchanging credentials for one if needed,
+        or None if no session token can be had.
+        """
+
+        if self._unavailable:
+            return None
+
+        if self._valid(self._expires):
+            return self._token
+
+        self._token, self._expires = self._read()
+        if self._valid(self._expires):
+            return self._token
+
+        with file_lock(os.path.join(self.directory, '.lock')):
+            # another fork may have refreshed it while we waited
+            self._token, self._expires = self._read()
+            if self._valid(self._expires):
+                return self._token
+
+            try:
+                token = self._exchange()
+            except (OSError, ValueError):
+                token = None
+
+            if token is None:
+                self._unavailable = True
+                return None
+
+            self._token, self._expires = token, token_expiry(token)
+            atomic_write(self.directory, self.path,
+                         json.dumps({"token": self._token, "expires": self._expires}).encode('utf-8'))
+
+        return self._token
+
+    def invalidate(self):
+        """
+        Forget the current token, e.g. after Central rejected it.
+        """
+
+        self._token, self._expires = None, 0
+
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
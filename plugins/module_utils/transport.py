@@ -0,0 +1,297 @@
+import base64
+import http.client
+import select
+import ssl
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlsplit, unquote
+
+from ansible_collections.community.stackrox.plugins.module_utils.compression import DecodingResponse, content_encoding
+from ansible_collections.community.stackrox.plugins.module_utils.ratelimit import IDEMPOTENT_METHODS
+from ansible_collections.community.stackrox.plugins.module_utils import profiling
+
+# errors that mean a kept-alive connection was closed by the server, most
+# likely before it read our request. Idempotent requests are retried once on
+# a fresh connection; anything else might already have been carried out.
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+class Response:
+    """
+    A fully read response from the Stackrox API.
+
+    Mirrors the parts of the object returned by `open_url` that the services use,
+    so `status`, `headers` and `read()` behave the same.
+
+    `wire_size` is the size of the body as received, before any decompression.
+    """
+
+    def __init__(self, status, headers, body, wire_size=None):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.wire_size = len(body) if wire_size is None else wire_size
+
+    def read(self):
+        return self.body
+
+class _HTTPSConnection(http.client.HTTPSConnection):
+    """
+    HTTPS connection that resumes the TLS session last negotiated with the
+    same host, skipping the full handshake on reconnects.
+    """
+
+    def __init__(self, host, port=None, pool_key=None, sessions=None, **kwargs):
+        super().__init__(host, port, **kwargs)
+        self._pool_key = pool_key
+        self._sessions = sessions
+
+    def connect(self):
+        # plain TCP connect (and CONNECT tunnel, if proxied)
+        http.client.HTTPConnection.connect(self)
+
+        server_hostname = self._tunnel_host or self.host
+        session = self._sessions.get(self._pool_key)
+
+        try:
+            self.sock = self._context.wrap_socket(self.sock,
+                                                  server_hostname=server_hostname,
+                                                  session=session)
+        except ssl.SSLError:
+            if session is None:
+                raise
+
+            # the server refused to resume; forget the session and handshake in full
+            self._sessions.pop(self._pool_key, None)
+            self.sock.close()
+            http.client.HTTPConnection.connect(self)
+            self.sock = self._context.wrap_socket(self.sock, server_hostname=server_hostname)
+
+        if self.sock.session is not None:
+            self._sessions[self._pool_key] = self.sock.session
+
+class ConnectionPool:
+    """
+    Thread-safe pool of keep-alive HTTP(S) connections, keyed by Central host.
+
+    Connections are returned to the pool once their response has been read in full and
+    are reused by later requests to the same host. TLS sessions are cached per host
+    so that new connections can resume rather than renegotiate.
+
+    gzip and deflate encoded response bodies are decompressed as they are read.
+
+    `https_proxy` / `http_proxy` / `no_proxy` from the environment are honoured, including
+    credentials in the proxy URL.
+
+    `connect_timeout` bounds the TCP connect and TLS handshake of a new connection, and
+    `read_timeout` every wait for data from Central after that, in seconds. None waits forever.
+    """
+
+    def __init__(self, validate_certs=True, connect_timeout=None, read_timeout=None, maxsize=10):
+        self.validate_certs = validate_certs
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.maxsize = maxsize
+
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._sessions = {}
+        self._ssl_context = None
+
+    @property
+    def _context(self):
+        # loading the CA bundle is slow; only do it once an HTTPS connection is made
+        with self._lock:
+            if self._ssl_context is None:
+                with profiling.span('tls.context'):
+                    self._ssl_context = self._create_ssl_context(self.validate_certs)
+            return self._ssl_context
+
+    @staticmethod
+    def _create_ssl_context(validate_certs):
+        if not validate_certs:
+            # nothing is verified, so there's no need to load CA certificates
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+            return context
+
+        return ssl.create_default_context()
+
+    def _new_connection(self, key):
+        scheme, host, port = key
+        proxy = self._proxy_for(scheme, host)
+        connect_host, connect_port, proxy_headers = proxy if proxy else (host, port, {})
+
+        kwargs = {}
+        if self.connect_timeout is not None:
+            kwargs['timeout'] = self.connect_timeout
+
+        if scheme == 'https':
+            conn = _HTTPSConnection(connect_host, connect_port,
+                                    pool_key=key,
+                                    sessions=self._sessions,
+                                    context=self._context,
+                                    **kwargs)
+            if proxy:
+                conn.set_tunnel(host, port, headers=proxy_headers)
+            proxy_headers = {}
+        else:
+            conn = http.client.HTTPConnection(connect_host, connect_port, **kwargs)
+
+        # plain HTTP through a proxy needs the absolute URL in the request line,
+        # and the proxy's credentials on every request
+        conn._stackrox_absolute_url = bool(proxy) and scheme == 'http'
+        conn._stackrox_proxy_headers = proxy_headers
+        return conn
+
+    @staticmethod
+    def _proxy_for(scheme, host):
+        #
+        # Return (host, port, headers) of the proxy to use for scheme and host,
+        # or None. headers carry the credentials given in the proxy URL.
+        #
+        from urllib.request import getproxies, proxy_bypass
+
+        proxy = getproxies().get(scheme)
+        if not proxy or proxy_bypass(host):
+            return None
+
+        parts = urlsplit(proxy if '://' in proxy else f"http://{proxy}")
+
+        headers = {}
+        if parts.username is not None:
+            credentials = f"{unquote(parts.username)}:{unquote(parts.password or '')}"
+            headers['Proxy-Authorization'] = "Basic " + base64.b64encode(credentials.encode('utf-8')).decode('ascii')
+
+        return (parts.hostname, parts.port or 80, headers)
+
+    @staticmethod
+    def _dropped(conn):
+        # an idle connection with something to read has been closed by the server
+        if conn.sock is None:
+            return True
+
+        try:
+            readable, _, _ = select.select([conn.sock], [], [], 0)
+        except (OSError, ValueError):
+            return True
+
+        return bool(readable)
+
+    def _checkout(self, key):
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                conn = idle.pop() if idle else None
+
+            if conn is None:
+                return self._new_connection(key), False
+
+            if not self._dropped(conn):
+                return conn, True
+
+            conn.close()
+
+    def _checkin(self, key, conn):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.maxsize:
+                idle.append(conn)
+                return
+
+        conn.close()
+
+    def _send(self, key, target, method, headers, body):
+        #
+        # Send the request on a pooled connection and return (connection, response)
+        # with the response headers read but the body still unread.
+        #
+        while True:
+            conn, reused = self._checkout(key)
+
+            try:
+                if not reused:
+                    # TCP connect and, for HTTPS, the TLS handshake
+                    with profiling.span('http.connect'):
+                        conn.connect()
+
+                    # the socket kept the connect timeout; waits for responses use their own
+                    conn.sock.settimeout(self.read_timeout)
+
+                conn.request(method, target(conn), body=body, headers={**(headers or {}), **conn._stackrox_proxy_headers})
+                return conn, conn.getresponse()
+
+            except STALE_CONNECTION_ERRORS:
+                conn.close()
+                if reused and method in IDEMPOTENT_METHODS:
+                    # the server dropped an idle connection; try again on a new one.
+                    continue
+                raise
+
+            except BaseException:
+                conn.close()
+                raise
+
+    @contextmanager
+    def stream(self, method, url, headers=None, body=None):
+        """
+        Send a request and yield the unread `http.client.HTTPResponse`, for reading the body
+        incrementally. A compressed body is wrapped in a `DecodingResponse`.
+
+        The connection goes back to the pool if the body was read to the end, and is closed
+        otherwise, so stopping early never leaves unread data on a pooled connection.
+        """
+
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        default_port = 443 if scheme == 'https' else 80
+        key = (scheme, parts.hostname, parts.port or default_port)
+
+        def target(conn):
+            if conn._stackrox_absolute_url:
+                return url
+
+            path = parts.path or '/'
+            return f"{path}?{parts.query}" if parts.query else path
+
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+
+        conn, resp = self._send(key, target, method, headers, body)
+        encoding = content_encoding(resp.headers)
+
+        try:
+            yield DecodingResponse(resp, encoding) if encoding else resp
+        except BaseException:
+            conn.close()
+            raise
+
+        if resp.isclosed() and not resp.will_close:
+            self._checkin(key, conn)
+        else:
+            conn.close()
+
+    def request(self, method, url, headers=None, body=None):
+        """
+        Send a request and return a fully read `Response`.
+
+        `body` may be a `str` (sent UTF-8 encoded), `bytes` or `None`.
+        """
+
+        with self.stream(method, url, headers=headers, body=body) as resp:
+            body = resp.read()
+            return Response(resp.status, resp.headers, body,
+                            resp.wire_size if isinstance(resp, DecodingResponse) else None)
+
+    def close(self):
+        """
+        Close every idle connection and forget cached TLS sessions.
+        """
+
+        with self._lock:
+            idle, self._idle = self._idle, {}
+            self._sessions.clear()
+
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
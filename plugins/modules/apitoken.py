@@ -1,58 +1,61 @@
-from ansible_collections.community.stackrox.plugins.module_utils.basic import StackroxModule
+from ansible_collections.community.stackrox.plugins.module_utils.basic import StackroxModule, api_metrics, create_service
+from ansible_collections.community.stackrox.plugins.module_utils.fanout import run_all
 from ansible_collections.community.stackrox.plugins.module_utils.services.apitoken import Service
-
-import json
-
-def run_module():
-    module_args = dict(
-        name=dict(type='str', required=False),
-        id=dict(type='str', required=False),
-        role=dict(type='str', required=False),
-        include_revoked=dict(type='bool', required=False, default=False),
-        force_new=dict(type='bool', required=False, default=False),
-        state=dict(type='str', choices=['present','absent', 'list', 'get'], default='present')
-    )
-
+from ansible_collections.community.stackrox.plugins.module_utils.records import project
+from ansible_collections.community.stackrox.plugins.module_utils import exceptions
+
+MODULE_ARGS = dict(
+    name=dict(type='str', required=False),
+    id=dict(type='str', required=False),
+    role=dict(type='str', required=False),
+    include_revoked=dict(type='bool', required=False, default=False),
+    force_new=dict(type='bool', required=False, default=False),
+    state=dict(type='str', choices=['present','absent', 'list', 'get'], default='present'),
+    return_fields=dict(type='list', elements='str', required=False)
+)
+
+MODULE_OPTIONS = dict(
+    required_if=[
+        ('state', 'present', ['name']),
+        ('state', 'present', ['role']),
+        ('state', 'absent', ['name', 'id'], True)
+    ]
+)
+
+def execute(params, service):
+    #
+    # Run the module against already validated params and return the result.
+    #
+    # Shared with the action plugin, which runs this on the controller.
+    #
     result = dict(
         changed=False,
         tokens=[]
     )
 
-    module = StackroxModule(
-        argument_spec=module_args,
-        required_if=[
-            ('state', 'present', ['name']),
-            ('state', 'present', ['role']),
-            ('state', 'absent', ['name', 'id'], True)
-        ],
-        supports_check_mode=False
-    )
-
-    service = Service(**module.params)
-
-    if module.params['state'] == 'list':
-        result['tokens'] = service.list(include_revoked=module.params['include_revoked'])
+    if params['state'] == 'list':
+        result['tokens'] = service.list(include_revoked=params['include_revoked'])
 
-    elif module.params['state'] == 'get':
-        result['tokens'] = service.get(name=module.params['name'], 
-                                       id=module.params['id'],
-                                       include_revoked=module.params['include_revoked'])
+    elif params['state'] == 'get':
+        result['tokens'] = service.get(name=params['name'],
+                                       id=params['id'],
+                                       include_revoked=params['include_revoked'])
 
     else:
         # create or delete token
-        existing_token = service.get(id=module.params['id'], name=module.params['name'])
+        existing_token = service.get(id=params['id'], name=params['name'])
 
         # make sure that if we're revoking tokens, and the user passes a name only,
         # that we only get one possible option.
         #
         # If we get several possible tokens, then we don't know which one to revoke.
         #
-        if module.params['state'] == 'absent':
-            if len(existing_token) > 0:
-                module.fail_json(msg=f"Multiple tokens were found for the name provided. Cannot revoke. Use token ID instead.")
+        if params['state'] == 'absent':
+            if len(existing_token) > 1:
+                raise exceptions.ModuleFailedException(f"Multiple tokens were found for the name provided. Cannot revoke. Use token ID instead.")
 
             if len(existing_token) == 1:
-                service.revoke_token(id=existing_token['id'])
+                service.revoke(id=existing_token[0]['id'])
                 result['changed'] = True
 
             # if len == 0 then nothing to do.
@@ -61,8 +64,8 @@ def run_module():
             if len(existing_token) == 0:
 
                 new_token = service.create(
-                                        name=module.params['name'],
-                                        role=module.params['role']
+                                        name=params['name'],
+                                        role=params['role']
                             )
                 existing_token = [new_token]
                 result['changed'] = True
@@ -71,7 +74,30 @@ def run_module():
 
             result['tokens'] = existing_token
 
-    module.exit_json(**result)
+    # newly created tokens are returned whole, as they carry the token itself
+    return project(result, params['return_fields'])
+
+def run_module():
+    module = StackroxModule(
+        argument_spec=MODULE_ARGS,
+        supports_check_mode=False,
+        **MODULE_OPTIONS
+    )
+
+    if module.params['centrals']:
+        run_all(module, module.params, execute, Service)
+
+    service = create_service(module, Service, module.params)
+
+    try:
+        try:
+            result = execute(module.params, service)
+        except exceptions.ModuleFailedException as e:
+            module.fail_json(msg=e.msg, **e.result, **api_metrics(module.params, service))
+
+        module.exit_json(**result, **api_metrics(module.params, service))
+    finally:
+        service.close()
 
 def main():
     run_module()
@@ -0,0 +1,156 @@
+from ansible_collections.community.stackrox.plugins.module_utils.basic import StackroxModule, api_metrics, create_service
+from ansible_collections.community.stackrox.plugins.module_utils.fanout import run_all
+from ansible_collections.community.stackrox.plugins.module_utils.services.apitoken import Service
+from ansible_collections.community.stackrox.plugins.module_utils.journal import Journal, journal_request
+from ansible_collections.community.stackrox.plugins.module_utils.records import Token, project
+from ansible_collections.community.stackrox.plugins.module_utils import exceptions
+
+from collections import Counter
+
+MODULE_ARGS = dict(
+    tokens=dict(type='list', elements='dict', required=True, options=dict(
+        name=dict(type='str', required=True),
+        id=dict(type='str', required=False),
+        role=dict(type='str', required=False),
+        state=dict(type='str', choices=['present', 'absent'], default='present')
+    ), required_if=[
+        ('state', 'present', ['role'])
+    ]),
+    parallelism=dict(type='int', required=False, default=8),
+    return_fields=dict(type='list', elements='str', required=False),
+    journal=dict(type='path', required=False)
+)
+
+MODULE_OPTIONS = dict()
+
+def plan_token(tokens_by_name, item):
+    #
+    # Work out what bringing a single token in line with its desired state
+    # takes, using the pre-built name -> tokens index instead of listing again.
+    #
+    # Returns an operation for Service.apply, with no action when there is
+    # nothing to do, along with the tokens to report and any error.
+    #
+    existing_tokens = tokens_by_name.get(item['name'], [])
+    operation = dict(key=item['name'], action=None, tokens=existing_tokens, error=None)
+
+    if item['state'] == 'absent':
+        if item['id']:
+            existing_tokens = [t for t in existing_tokens if t['id'] == item['id']]
+
+        # names are not unique, so we can't tell which one to revoke.
+        if len(existing_tokens) > 1:
+            operation['error'] = f"Multiple tokens were found for the name {item['name']}. Cannot revoke. Use token ID instead."
+        elif len(existing_tokens) == 1:
+            operation.update(action='revoke', id=existing_tokens[0]['id'])
+
+    elif len(existing_tokens) == 0:
+        operation.update(action='create', name=item['name'], role=item['role'])
+
+    return operation
+
+def token_result(item, operation, outcome):
+    #
+    # Build the result for a single token from its planned operation
+    # and what came of it.
+    #
+    result, error = outcome
+    error = error or operation['error']
+
+    if error:
+        return dict(name=item['name'], state=item['state'], changed=False, failed=True, msg=str(error))
+
+    item_result = dict(name=item['name'], state=item['state'], changed=operation['action'] is not None,
+                       tokens=operation['tokens'])
+
+    if item['state'] == 'absent':
+        item_result['tokens'] = []
+    elif operation['action'] == 'create':
+        item_result['tokens'] = [result]
+
+    return item_result
+
+def execute(params, service):
+    #
+    # Run the module against already validated params and return the result.
+    #
+    # Shared with the action plugin, which runs this on the controller.
+    #
+    # With a journal, the plan and every completed operation are recorded as
+    # the run goes. Running again with the same journal after a failure picks
+    # up where it stopped, without listing the tokens again.
+    #
+    result = dict(
+        changed=False,
+        results=[]
+    )
+
+    # a name listed twice would race against itself in the thread pool
+    names = Counter(item['name'] for item in params['tokens'])
+    duplicates = sorted(name for name, count in names.items() if count > 1)
+    if duplicates:
+        raise exceptions.ModuleFailedException(f"Token names must be unique within tokens: {', '.join(duplicates)}")
+
+    journal = Journal(params['journal'], request=journal_request(params, params['tokens'])) if params['journal'] else None
+    failed = True
+
+    try:
+        if journal is not None and journal.resumed:
+            operations = [{**operation, 'tokens': [Token(t) for t in operation['tokens']]}
+                          for operation in journal.operations]
+        else:
+            tokens_by_name = service.index()
+            operations = [plan_token(tokens_by_name, item) for item in params['tokens']]
+
+            if journal is not None:
+                journal.plan(operations)
+
+        to_apply = [operation for operation in operations if operation['action'] and not operation['error']]
+        outcomes = dict(zip((operation['key'] for operation in to_apply),
+                            service.apply(to_apply, parallelism=params['parallelism'], journal=journal)))
+
+        for item, operation in zip(params['tokens'], operations):
+            item_result = token_result(item, operation, outcomes.get(operation['key'], (None, None)))
+
+            result['changed'] = result['changed'] or item_result['changed']
+            result['results'].append(item_result)
+
+        failed = any(r.get('failed') for r in result['results'])
+    finally:
+        if journal is not None:
+            journal.close(finished=not failed)
+
+    result = project(result, params['return_fields'])
+
+    if failed:
+        raise exceptions.ModuleFailedException("One or more tokens could not be reconciled", **result)
+
+    return result
+
+def run_module():
+    module = StackroxModule(
+        argument_spec=MODULE_ARGS,
+        supports_check_mode=False,
+        **MODULE_OPTIONS
+    )
+
+    if module.params['centrals']:
+        run_all(module, module.params, execute, Service)
+
+    service = create_service(module, Service, module.params)
+
+    try:
+        try:
+            result = execute(module.params, service)
+        except exceptions.ModuleFailedException as e:
+            module.fail_json(msg=e.msg, **e.result, **api_metrics(module.params, service))
+
+        module.exit_json(**result, **api_metrics(module.params, service))
+    finally:
+        service.close()
+
+def main():
+    run_module()
+
+if __name__ == '__main__':
+    main()
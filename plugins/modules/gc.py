@@ -0,0 +1,237 @@
+from ansible_collections.community.stackrox.plugins.module_utils.basic import StackroxModule, api_metrics, create_service
+from ansible_collections.community.stackrox.plugins.module_utils.fanout import run_all
+from ansible_collections.community.stackrox.plugins.module_utils.services.gc import Service
+from ansible_collections.community.stackrox.plugins.module_utils.journal import Journal, journal_request
+from ansible_collections.community.stackrox.plugins.module_utils import exceptions
+
+from datetime import datetime, timezone
+from fnmatch import fnmatchcase
+import re
+import time
+
+MODULE_ARGS = dict(
+    kinds=dict(type='list', elements='str', choices=['tokens', 'initbundles'], default=['tokens', 'initbundles']),
+    expired=dict(type='bool', required=False, default=True),
+    older_than=dict(type='int', required=False),
+    unused=dict(type='bool', required=False, default=False),
+    revoke_in_use=dict(type='bool', required=False, default=False),
+    names=dict(type='list', elements='str', required=False),
+    batch_size=dict(type='int', required=False, default=50),
+    parallelism=dict(type='int', required=False, default=8),
+    dry_run=dict(type='bool', required=False, default=False),
+    journal=dict(type='path', required=False)
+)
+
+MODULE_OPTIONS = dict()
+
+# (expiry field, age field) for each kind
+TIMESTAMPS = {
+    'tokens': ('expiration', 'issuedAt'),
+    'initbundles': ('expiresAt', 'createdAt')
+}
+
+def parse_timestamp(value):
+    #
+    # Parse an RFC 3339 timestamp from the API into a unix timestamp.
+    # Returns None if it's missing or can't be parsed.
+    #
+    if not value:
+        return None
+
+    # fromisoformat only takes up to microseconds and, before 3.11, no 'Z'
+    value = re.sub(r'(\.\d{6})\d+', r'\1', value.replace('Z', '+00:00'))
+
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+
+    return parsed.timestamp()
+
+def collect_reasons(kind, obj, params, now):
+    #
+    # Return why obj should be collected, or an empty list if it shouldn't.
+    #
+    if params['names'] and not any(fnmatchcase(obj['name'], pattern) for pattern in params['names']):
+        return []
+
+    expiry_field, age_field = TIMESTAMPS[kind]
+    reasons = []
+
+    expires = parse_timestamp(obj.get(expiry_field))
+    if params['expired'] and expires is not None and expires <= now:
+        reasons.append('expired')
+
+    created = parse_timestamp(obj.get(age_field))
+    if params['older_than'] is not None and created is not None and created <= now - params['older_than'] * 86400:
+        reasons.append('older_than')
+
+    if params['unused'] and kind == 'initbundles' and not obj['impactedClusters']:
+        reasons.append('unused')
+
+    return reasons
+
+def select(kind, objects, params, now):
+    #
+    # Return a revoke operation for every object of kind that should be
+    # collected, for the kind's Service.apply.
+    #
+    # Init bundles that secured clusters still use are only revoked with
+    # revoke_in_use. Otherwise they get a skip operation, which is reported
+    # but never sent, so Central's confirmation isn't given on anyone's behalf.
+    #
+    operations = []
+    for obj in objects:
+        reasons = collect_reasons(kind, obj, params, now)
+        if not reasons:
+            continue
+
+        operation = dict(key=f"{kind}/{obj['id']}", kind=kind, action='revoke',
+                         id=obj['id'], name=obj['name'], reasons=reasons)
+        if kind == 'initbundles':
+            operation['impacted_cluster_ids'] = [c['id'] for c in obj['impactedClusters']]
+            if operation['impacted_cluster_ids'] and not params['revoke_in_use']:
+                operation['action'] = 'skip'
+
+        operations.append(operation)
+
+    return operations
+
+def plan(service, params, now):
+    #
+    # List the selected kinds and return the revoke operations for everything to collect.
+    #
+    operations = []
+
+    if 'tokens' in params['kinds']:
+        operations += select('tokens', service.tokens.list(), params, now)
+
+    if 'initbundles' in params['kinds']:
+        operations += select('initbundles', service.initbundles.list_initbundles(), params, now)
+
+    return operations
+
+def collect(service, params, operations, journal):
+    #
+    # Revoke what the operations select and return a result for each, by kind.
+    #
+    # Tokens are revoked concurrently, one call per token, and bundles
+    # batch_size bundles per revoke call. Skipped bundles are only reported.
+    #
+    results = dict(tokens=[], initbundles=[])
+    revoking = dict(tokens=[], initbundles=[])
+    for operation in operations:
+        item_result = dict(id=operation['id'], name=operation['name'], reasons=operation['reasons'], revoked=False)
+        if 'impacted_cluster_ids' in operation:
+            item_result['impacted_cluster_ids'] = operation['impacted_cluster_ids']
+        if operation['action'] == 'skip':
+            item_result['skipped_in_use'] = True
+        else:
+            revoking[operation['kind']].append((operation, item_result))
+        results[operation['kind']].append(item_result)
+
+    if params['dry_run']:
+        return results
+
+    tokens = [operation for operation, item_result in revoking['tokens']]
+    bundles = [operation for operation, item_result in revoking['initbundles']]
+
+    outcomes = service.tokens.apply(tokens, parallelism=params['parallelism'], journal=journal) + \
+               service.initbundles.apply(bundles, journal=journal, batch_size=params['batch_size'])
+
+    for (operation, item_result), (revoked, error) in zip(revoking['tokens'] + revoking['initbundles'], outcomes):
+        if error:
+            item_result.update(failed=True, msg=str(error))
+        else:
+            item_result['revoked'] = bool(revoked)
+
+    return results
+
+def execute(params, service):
+    #
+    # Run the module against already validated params and return the result.
+    #
+    # Shared with the action plugin, which runs this on the controller.
+    #
+    # With a journal, the plan and every revocation are recorded as the run
+    # goes. Running again with the same journal after a failure picks up
+    # where it stopped, without listing anything again.
+    #
+    if not (params['expired'] or params['older_than'] is not None or params['unused']):
+        raise exceptions.ModuleFailedException("At least one of expired, older_than or unused must select something to collect")
+
+    if params['batch_size'] < 1:
+        raise exceptions.ModuleFailedException("batch_size must be at least 1")
+
+    result = dict(
+        changed=False,
+        dry_run=params['dry_run'],
+        tokens=[],
+        initbundles=[]
+    )
+
+    journal = None
+    if params['journal'] and not params['dry_run']:
+        journal = Journal(params['journal'],
+                          request=journal_request(params, {key: params[key] for key in ('kinds', 'expired', 'older_than', 'unused',
+                                                                                          'revoke_in_use', 'names')}))
+    failed = True
+
+    try:
+        if journal is not None and journal.resumed:
+            operations = journal.operations
+        else:
+            operations = plan(service, params, time.time())
+
+            if journal is not None:
+                journal.plan(operations)
+
+        result.update(collect(service, params, operations, journal))
+        collected = result['tokens'] + result['initbundles']
+        failed = any(r.get('failed') for r in collected)
+    finally:
+        if journal is not None:
+            journal.close(finished=not failed)
+
+    if params['dry_run']:
+        result['changed'] = any(not r.get('skipped_in_use') for r in collected)
+    else:
+        result['changed'] = any(r['revoked'] for r in collected)
+
+    if failed:
+        raise exceptions.ModuleFailedException("One or more objects could not be revoked", **result)
+
+    return result
+
+def run_module():
+    module = StackroxModule(
+        argument_spec=MODULE_ARGS,
+        supports_check_mode=True,
+        **MODULE_OPTIONS
+    )
+
+    params = {**module.params, 'dry_run': module.params['dry_run'] or module.check_mode}
+
+    if params['centrals']:
+        run_all(module, params, execute, Service)
+
+    service = create_service(module, Service, params)
+
+    try:
+        try:
+            result = execute(params, service)
+        except exceptions.ModuleFailedException as e:
+            module.fail_json(msg=e.msg, **e.result, **api_metrics(params, service))
+
+        module.exit_json(**result, **api_metrics(params, service))
+    finally:
+        service.close()
+
+def main():
+    run_module()
+
+if __name__ == '__main__':
+    main()
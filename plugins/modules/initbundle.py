@@ -1,32 +1,141 @@
-from ansible_collections.community.stackrox.plugins.module_utils.basic import StackroxModule
+from ansible_collections.community.stackrox.plugins.module_utils.basic import StackroxModule, api_metrics, create_service
+from ansible_collections.community.stackrox.plugins.module_utils.fanout import run_all
 from ansible_collections.community.stackrox.plugins.module_utils.services.clusterinit import Service
+from ansible_collections.community.stackrox.plugins.module_utils.journal import Journal, journal_request
+from ansible_collections.community.stackrox.plugins.module_utils.records import InitBundle, project
+from ansible_collections.community.stackrox.plugins.module_utils import exceptions
 
-import json
+from collections import Counter
+import os
 
-def run_module():
-    module_args = dict(
+MODULE_ARGS = dict(
+    name=dict(type='str', required=False),
+    state=dict(type='str', choices=['present','absent'], default='present'),
+    bundles=dict(type='list', elements='dict', required=False, options=dict(
         name=dict(type='str', required=True),
-        state=dict(type='str', choices=['present','absent'], default='present')
-    )
+        state=dict(type='str', choices=['present', 'absent'], default='present')
+    )),
+    parallelism=dict(type='int', required=False, default=8),
+    return_fields=dict(type='list', elements='str', required=False),
+    dest_dir=dict(type='path', required=False, aliases=['dest']),
+    journal=dict(type='path', required=False)
+)
+
+MODULE_OPTIONS = dict(
+    mutually_exclusive=[('name', 'bundles')],
+    required_one_of=[('name', 'bundles')],
+    required_by=dict(journal='bundles')
+)
+
+def plan_bundle(bundles_by_name, bundle, dest_dir):
+    #
+    # Work out what bringing a single bundle in line with its desired state
+    # takes. Returns an operation for Service.apply, with no action when
+    # there is nothing to do, along with the existing bundle to report.
+    #
+    existing_bundle = bundles_by_name.get(bundle['name'])
+    operation = dict(key=bundle['name'], action=None,
+                     initbundle=existing_bundle if bundle['state'] == 'present' else None)
+
+    if bundle['state'] == 'present' and existing_bundle is None:
+        operation.update(action='create', name=bundle['name'], dest_dir=dest_dir)
+
+    elif bundle['state'] == 'absent' and existing_bundle is not None:
+        operation.update(action='revoke', id=existing_bundle['id'],
+                         impacted_cluster_ids=[cluster['id'] for cluster in existing_bundle['impactedClusters']])
+
+    return operation
+
+def reconcile_bundles(service, bundles, parallelism, dest_dir=None, journal=None):
+    #
+    # Bring several bundles in line with their desired state.
+    #
+    # The bundle list is fetched once, every revocation goes out
+    # in a single revoke call and creates run concurrently.
+    #
+    # A resumed journal already holds the plan, so the list isn't
+    # fetched again and completed operations aren't repeated.
+    #
+    if journal is not None and journal.resumed:
+        operations = [{**operation, 'initbundle': InitBundle(operation['initbundle']) if operation['initbundle'] else None}
+                      for operation in journal.operations]
+    else:
+        bundles_by_name = service.index_initbundles()
+        operations = [plan_bundle(bundles_by_name, b, dest_dir) for b in bundles]
+
+        if journal is not None:
+            journal.plan(operations)
+
+    to_apply = [operation for operation in operations if operation['action']]
+    outcomes = dict(zip((operation['key'] for operation in to_apply),
+                        service.apply(to_apply, parallelism=parallelism, journal=journal)))
+
+    results = []
+    for b, operation in zip(bundles, operations):
+        item_result = dict(name=b['name'], state=b['state'], changed=False)
+
+        if operation['initbundle'] is not None:
+            item_result['initbundle'] = operation['initbundle']
+
+        if operation['action']:
+            bundle, error = outcomes[operation['key']]
+            if error:
+                item_result.update(failed=True, msg=str(error))
+            elif operation['action'] == 'create':
+                item_result.update(changed=True, initbundle=bundle)
+            else:
+                item_result['changed'] = bundle
+
+        results.append(item_result)
 
+    return results
+
+def execute(params, service):
+    #
+    # Run the module against already validated params and return the result.
+    #
+    # Shared with the action plugin, which runs this on the controller.
+    #
     result = dict(
         changed=False,
     )
 
-    module = StackroxModule(
-        argument_spec=module_args,
-        supports_check_mode=False
-    )
+    if params['dest_dir']:
+        # new bundles are written here instead of being returned
+        os.makedirs(params['dest_dir'], mode=0o700, exist_ok=True)
+
+    if params['bundles']:
+        names = Counter(b['name'] for b in params['bundles'])
+        duplicates = sorted(name for name, count in names.items() if count > 1)
+        if duplicates:
+            raise exceptions.ModuleFailedException(f"Bundle names must be unique within bundles: {', '.join(duplicates)}")
 
-    service = Service(**module.params)
+        journal = None
+        if params['journal']:
+            journal = Journal(params['journal'],
+                              request=journal_request(params, dict(bundles=params['bundles'], dest_dir=params['dest_dir'])))
+        failed = True
 
-    if module.params['state'] == None:
+        try:
+            result['results'] = project(reconcile_bundles(service, params['bundles'], params['parallelism'],
+                                                          params['dest_dir'], journal),
+                                        params['return_fields'])
+            result['changed'] = any(r['changed'] for r in result['results'])
+            failed = any(r.get('failed') for r in result['results'])
+        finally:
+            if journal is not None:
+                journal.close(finished=not failed)
+
+        if failed:
+            raise exceptions.ModuleFailedException("One or more init bundles could not be reconciled", **result)
+
+    elif params['state'] == None:
         result['initbundles'] = service.list_initbundles()
 
     else:
-        existing_bundle = service.get_initbundle(module.params['name'])
+        existing_bundle = service.get_initbundle(params['name'])
 
-        if module.params['state'] == 'absent':
+        if params['state'] == 'absent':
             if existing_bundle:
                 impacted_cluster_ids = [cluster['id'] for cluster in existing_bundle['impactedClusters']]
 
@@ -36,12 +145,36 @@ def run_module():
                 result['changed'] = True
         else:
             if existing_bundle is None:
-                existing_bundle = service.create_initbundle(name=module.params['name'])
+                existing_bundle = service.create_initbundle(name=params['name'], dest_dir=params['dest_dir'])
                 result['changed'] = True
 
             result['initbundle'] = existing_bundle
 
-    module.exit_json(**result)
+    # newly created bundles are returned whole, as they carry the bundle contents
+    # or, with dest_dir, the paths they were written to
+    return project(result, params['return_fields'])
+
+def run_module():
+    module = StackroxModule(
+        argument_spec=MODULE_ARGS,
+        supports_check_mode=False,
+        **MODULE_OPTIONS
+    )
+
+    if module.params['centrals']:
+        run_all(module, module.params, execute, Service)
+
+    service = create_service(module, Service, module.params)
+
+    try:
+        try:
+            result = execute(module.params, service)
+        except exceptions.ModuleFailedException as e:
+            module.fail_json(msg=e.msg, **e.result, **api_metrics(module.params, service))
+
+        module.exit_json(**result, **api_metrics(module.params, service))
+    finally:
+        service.close()
 
 def main():
     run_module()
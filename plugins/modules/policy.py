@@ -0,0 +1,263 @@
+from ansible_collections.community.stackrox.plugins.module_utils.basic import StackroxModule, api_metrics, create_service
+from ansible_collections.community.stackrox.plugins.module_utils.fanout import run_all
+from ansible_collections.community.stackrox.plugins.module_utils.services.policy import Service
+from ansible_collections.community.stackrox.plugins.module_utils.cache import fingerprint, atomic_write
+from ansible_collections.community.stackrox.plugins.module_utils import exceptions
+
+from fnmatch import fnmatchcase
+import json
+import os
+import re
+
+MODULE_ARGS = dict(
+    src=dict(type='path', required=False),
+    dest=dict(type='path', required=False),
+    names=dict(type='list', elements='str', required=False),
+    include_default=dict(type='bool', required=False, default=False),
+    overwrite=dict(type='bool', required=False, default=True),
+    batch_size=dict(type='int', required=False, default=100),
+    dry_run=dict(type='bool', required=False, default=False)
+)
+
+MODULE_OPTIONS = dict(
+    mutually_exclusive=[('src', 'dest')],
+    required_one_of=[('src', 'dest')]
+)
+
+# fields Central sets or maintains itself, which don't make two policies different
+SERVER_FIELDS = ('id', 'lastUpdated', 'isDefault', 'source', 'criteriaLocked', 'mitreVectorsLocked',
+                 'SORTName', 'SORTLifecycleStage', 'SORTEnforcement')
+
+# fields left out of exported files, so they only change when the policy does
+EXPORT_OMITTED = ('lastUpdated', 'SORTName', 'SORTLifecycleStage', 'SORTEnforcement')
+
+def normalize(value):
+    #
+    # Drop empty and default values (null, false, 0, "", [] and {}) at any depth.
+    # Central leaves them out or fills them in as it pleases, so a policy
+    # read back may differ from the one sent in nothing else.
+    #
+    if isinstance(value, dict):
+        normalized = { key: normalize(item) for key, item in value.items() }
+        return { key: item for key, item in normalized.items() if item not in (None, False, 0, '', [], {}) }
+
+    if isinstance(value, list):
+        return [normalize(item) for item in value]
+
+    return value
+
+def content_hash(policy):
+    #
+    # Hash of what a policy does, regardless of the fields Central
+    # manages and of key order.
+    #
+    content = normalize({ key: value for key, value in policy.items() if key not in SERVER_FIELDS })
+    return fingerprint(json.dumps(content, sort_keys=True, separators=(',', ':')))
+
+def read_policies(src):
+    #
+    # Return (path, policy) for every policy under src: a JSON file or a
+    # directory of them, each holding a single policy or an export
+    # ({"policies": [...]}).
+    #
+    if os.path.isdir(src):
+        paths = [os.path.join(src, name) for name in sorted(os.listdir(src)) if name.endswith('.json')]
+    else:
+        paths = [src]
+
+    policies = []
+    names = {}
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                document = json.load(f)
+        except (OSError, ValueError) as e:
+            raise exceptions.ModuleFailedException(f"Unable to read policies from {path}: {e}")
+
+        found = document['policies'] if isinstance(document, dict) and 'policies' in document else [document]
+        for policy in found:
+            if not isinstance(policy, dict) or not policy.get('name'):
+                raise exceptions.ModuleFailedException(f"Every policy in {path} needs a name")
+
+            if policy['name'] in names:
+                raise exceptions.ModuleFailedException(
+                    f"Policy '{policy['name']}' is defined in both {names[policy['name']]} and {path}")
+
+            names[policy['name']] = path
+            policies.append((path, policy))
+
+    return policies
+
+def policy_filename(name, taken):
+    #
+    # File name to export the named policy to, unique among taken.
+    #
+    base = re.sub(r'[^A-Za-z0-9._-]+', '-', name).strip('-.') or 'policy'
+    filename = f"{base}.json"
+
+    n = 2
+    while filename in taken:
+        filename = f"{base}-{n}.json"
+        n += 1
+
+    taken.add(filename)
+    return filename
+
+def import_policies(service, params):
+    #
+    # Bring Central in line with the policies under src and return a result
+    # for each. Only new policies and ones whose content differs from
+    # Central's are sent, batch_size per import request.
+    #
+    local = read_policies(params['src'])
+    existing = service.index()
+
+    # policies are matched by name, then by ID, so a renamed policy updates
+    # the one it was exported from. An ID whose policy is already matched,
+    # by name or by another file, is dropped and the policy created anew
+    # rather than overwriting that one.
+    by_id = { policy['id']: policy for policy in existing.values() }
+    claimed = { existing[policy['name']]['id'] for path, policy in local if policy['name'] in existing }
+    matches = []
+    for path, policy in local:
+        found = existing.get(policy['name'])
+        if found is None and policy.get('id') in by_id:
+            if policy['id'] in claimed:
+                policy = { key: value for key, value in policy.items() if key != 'id' }
+            else:
+                found = by_id[policy['id']]
+                claimed.add(found['id'])
+        matches.append((path, policy, found))
+
+    # one export of the matching policies is enough to tell what changed
+    matched = [found['id'] for path, policy, found in matches if found is not None]
+    current = { policy['id']: policy for policy in service.export_policies(matched, batch_size=params['batch_size']) }
+
+    results = []
+    send = []
+    for path, policy, found in matches:
+        item_result = dict(name=policy['name'], path=path)
+        results.append(item_result)
+
+        if found is None:
+            item_result.update(status='created', id=policy.get('id'))
+            send.append((item_result, policy))
+        elif found['id'] in current and content_hash(current[found['id']]) == content_hash(policy):
+            item_result.update(status='unchanged', id=found['id'])
+        elif not params['overwrite']:
+            item_result.update(status='skipped', id=found['id'])
+        else:
+            item_result.update(status='updated', id=found['id'])
+            # replace the existing policy, whatever ID the file carries
+            send.append((item_result, {**policy, 'id': found['id']}))
+
+    if params['dry_run'] or not send:
+        return results
+
+    responses = service.import_policies([policy for item_result, policy in send],
+                                        overwrite=True,
+                                        batch_size=params['batch_size'])
+
+    for (item_result, policy), response in zip(send, responses):
+        if response.get('succeeded'):
+            item_result['id'] = response.get('policy', {}).get('id', item_result['id'])
+        else:
+            errors = [error.get('message', '') for error in response.get('errors') or []]
+            item_result.update(status='failed', msg="; ".join(errors) or "Central did not import the policy")
+
+    return results
+
+def export_policies(service, params):
+    #
+    # Write the selected policies to one JSON file each under dest and
+    # return a result for each. Files whose policy hasn't changed are
+    # left alone.
+    #
+    selected = [policy for policy in service.list()
+                if (params['include_default'] or not policy.get('isDefault'))
+                and (not params['names'] or any(fnmatchcase(policy['name'], pattern) for pattern in params['names']))]
+
+    policies = service.export_policies([policy['id'] for policy in selected], batch_size=params['batch_size'])
+
+    if not params['dry_run']:
+        os.makedirs(params['dest'], exist_ok=True)
+
+    results = []
+    taken = set()
+    for policy in sorted(policies, key=lambda p: p['name']):
+        path = os.path.join(params['dest'], policy_filename(policy['name'], taken))
+        item_result = dict(name=policy['name'], id=policy['id'], path=path, status='unchanged')
+        results.append(item_result)
+
+        try:
+            with open(path, 'rb') as f:
+                written = json.load(f)
+        except (OSError, ValueError):
+            written = None
+
+        if written is not None and content_hash(written) == content_hash(policy) and written.get('id') == policy['id']:
+            continue
+
+        item_result['status'] = 'written'
+        if not params['dry_run']:
+            content = { key: value for key, value in policy.items() if key not in EXPORT_OMITTED }
+            atomic_write(params['dest'], path, (json.dumps(content, indent=2, sort_keys=True) + '\n').encode('utf-8'))
+
+    return results
+
+def execute(params, service):
+    #
+    # Run the module against already validated params and return the result.
+    #
+    # Shared with the action plugin, which runs this on the controller.
+    #
+    if params['batch_size'] < 1:
+        raise exceptions.ModuleFailedException("batch_size must be at least 1")
+
+    if params['src']:
+        policies = import_policies(service, params)
+        changed = any(p['status'] in ('created', 'updated') for p in policies)
+    else:
+        policies = export_policies(service, params)
+        changed = any(p['status'] == 'written' for p in policies)
+
+    result = dict(
+        changed=changed,
+        dry_run=params['dry_run'],
+        policies=policies
+    )
+
+    if any(p['status'] == 'failed' for p in policies):
+        raise exceptions.ModuleFailedException("One or more policies could not be imported", **result)
+
+    return result
+
+def run_module():
+    module = StackroxModule(
+        argument_spec=MODULE_ARGS,
+        supports_check_mode=True,
+        **MODULE_OPTIONS
+    )
+
+    params = {**module.params, 'dry_run': module.params['dry_run'] or module.check_mode}
+
+    if params['centrals']:
+        run_all(module, params, execute, Service)
+
+    service = create_service(module, Service, params)
+
+    try:
+        try:
+            result = execute(params, service)
+        except exceptions.ModuleFailedException as e:
+            module.fail_json(msg=e.msg, **e.result, **api_metrics(params, service))
+
+        module.exit_json(**result, **api_metrics(params, service))
+    finally:
+        service.close()
+
+def main():
+    run_module()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+import threading
+
+from ansible.module_utils.common.arg_spec import ArgumentSpecValidator
+from ansible.module_utils.common.parameters import remove_values
+from ansible.module_utils.basic import missing_required_lib
+from ansible.plugins.action import ActionBase
+
+from ansible_collections.community.stackrox.plugins.module_utils.basic import STACKROX_ARGS, stackrox_options, api_metrics, profile_result
+from ansible_collections.community.stackrox.plugins.module_utils.fanout import execute_all
+from ansible_collections.community.stackrox.plugins.module_utils.codec import HAS_ORJSON
+from ansible_collections.community.stackrox.plugins.module_utils.transport import ConnectionPool
+from ansible_collections.community.stackrox.plugins.module_utils.ratelimit import RateController
+from ansible_collections.community.stackrox.plugins.module_utils import profiling
+from ansible_collections.community.stackrox.plugins.module_utils import exceptions
+
+# connection pools and rate controllers live for the whole worker process.
+# Ansible forks a worker for every task on every host, so this only shares
+# them within one task: between the items of a loop, and the Centrals of a
+# task with centrals. Each task still opens its own connections.
+_shared_lock = threading.Lock()
+_shared_transports = {}
+_shared_rate_controllers = {}
+
+def shared_transport(params):
+    key = (params['central'], params['validate_certs'] is not False, params['connect_timeout'], params['read_timeout'])
+
+    with _shared_lock:
+        if key not in _shared_transports:
+            _shared_transports[key] = ConnectionPool(validate_certs=key[1], connect_timeout=key[2], read_timeout=key[3])
+        return _shared_transports[key]
+
+def shared_rate_controller(params):
+    key = (params['central'], params['rate_limit'], params['max_concurrency'])
+
+    with _shared_lock:
+        if key not in _shared_rate_controllers:
+            _shared_rate_controllers[key] = RateController(rate=params['rate_limit'],
+                                                           max_concurrency=params['max_concurrency'])
+        return _shared_rate_controllers[key]
+
+class StackroxActionBase(ActionBase):
+    """
+    Runs a Stackrox module on the controller instead of shipping it to the target.
+
+    The modules only ever talk to the Central API, so there is nothing to do on the
+    managed host. Subclasses set `MODULE` to the module's python module, which provides
+    `MODULE_ARGS`, `MODULE_OPTIONS`, `Service` and `execute(params, service)`; arguments are
+    validated against the same spec and results are the same as from the module itself.
+
+    Modules with a `dry_run` option support check mode, which turns it on. With `centrals`,
+    the module runs against every Central listed at once (see `fanout.execute_all`). With
+    `profile`, the run is profiled on the controller and the profile written there.
+
+    Services share a connection pool and rate controller per Central within the worker
+    process running the task, so loop items reuse connections; separate tasks do not.
+    """
+
+    MODULE = None
+
+    TRANSFERS_FILES = False
+    _requires_connection = False
+    _supports_check_mode = False
+
+    def _create_service(self, params):
+        return self.MODULE.Service(**params,
+                                   transport=shared_transport(params),
+                                   rate_controller=shared_rate_controller(params))
+
+    def run(self, tmp=None, task_vars=None):
+        result = super().run(tmp, task_vars)
+        del tmp
+
+        validator = ArgumentSpecValidator({**STACKROX_ARGS, **self.MODULE.MODULE_ARGS},
+                                          **stackrox_options(self.MODULE.MODULE_OPTIONS))
+        validation = validator.validate(self._task.args)
+
+        if validation.error_messages:
+            result.update(failed=True, msg=", ".join(validation.error_messages))
+            return result
+
+        params = validation.validated_parameters
+        if params['json_codec'] == 'orjson' and not HAS_ORJSON:
+            result.update(failed=True, msg=missing_required_lib('orjson'))
+            return result
+
+        if self._task.check_mode and 'dry_run' in params:
+            params = {**params, 'dry_run': True}
+        result['invocation'] = dict(module_args=remove_values(params, validation._no_log_values))
+
+        if params['profile']:
+            profiling.start(params['profile'], params['profile_format'], name=self._task.action)
+
+        try:
+            result.update(self._execute(params))
+        finally:
+            result.update(profile_result())
+
+        return result
+
+    def _execute(self, params):
+        result = {}
+
+        if params['centrals']:
+            try:
+                result.update(execute_all(params, self.MODULE.execute, self._create_service))
+            except exceptions.ModuleFailedException as e:
+                result.update(failed=True, msg=e.msg, **e.result)
+            return result
+
+        try:
+            service = self._create_service(params)
+        except OSError as e:
+            result.update(failed=True, msg=f"Unable to set up the Stackrox service: {e}")
+            return result
+
+        try:
+            result.update(self.MODULE.execute(params, service))
+        except exceptions.ModuleFailedException as e:
+            result.update(failed=True, msg=e.msg, **e.result)
+        except Exception as e:
+            result.update(failed=True, msg=str(e))
+        finally:
+            service.close()
+
+        result.update(api_metrics(params, service))
+        return result
@@ -0,0 +1,66 @@
+from ansible.errors import AnsibleLookupError
+from ansible.plugins.lookup import LookupBase
+from ansible.plugins.loader import cache_loader
+
+from ansible_collections.community.stackrox.plugins.module_utils.cache import fingerprint
+
+class StackroxLookupBase(LookupBase):
+    """
+    Base class for lookups that read from the Stackrox API in the controller process.
+
+    Subclasses call `_cached` around their API calls so results can be shared through
+    an Ansible cache plugin, keyed by Central URL, credentials and the query.
+    """
+
+    def _service_kwargs(self):
+        return dict(
+            central=self.get_option('central'),
+            token=self.get_option('token'),
+            username=self.get_option('username'),
+            password=self.get_option('password'),
+            validate_certs=self.get_option('validate_certs'),
+            session_token=self.get_option('session_token'),
+            connect_timeout=self.get_option('connect_timeout'),
+            read_timeout=self.get_option('read_timeout')
+        )
+
+    def _cache(self):
+        plugin = self.get_option('cache_plugin')
+        if not plugin:
+            return None
+
+        cache_options = {
+            '_uri': self.get_option('cache_connection'),
+            '_prefix': self.get_option('cache_prefix'),
+            '_timeout': self.get_option('cache_timeout')
+        }
+
+        cache = cache_loader.get(plugin, **{k: v for k, v in cache_options.items() if v is not None})
+        if cache is None:
+            raise AnsibleLookupError(f"Unable to load the cache plugin {plugin}")
+
+        return cache
+
+    def _cached(self, endpoint, fetch):
+        """
+        Return `fetch()`, served from the configured cache plugin when possible.
+        """
+
+        cache = self._cache()
+        if cache is None:
+            return fetch()
+
+        # never put the credentials themselves into a cache key
+        credentials = fingerprint(self.get_option('token'), self.get_option('username'), self.get_option('password'))
+        key = fingerprint(self.get_option('central'), credentials, endpoint)
+
+        if cache.contains(key):
+            try:
+                return cache.get(key)
+            except KeyError:
+                # expired between the two calls
+                pass
+
+        value = fetch()
+        cache.set(key, value)
+        return value
@@ -0,0 +1,92 @@
+"""
+Benchmark of the JSON codecs in module_utils.codec on /v1/apitokens list responses.
+
+For each inventory size, parses the same body the fake Central would send with every
+available codec, and with 'auto', and reports the median time per parse, along with the
+one-off cost of importing each codec's library in a fresh interpreter.
+
+    python -m ansible_collections.community.stackrox.tests.benchmarks.bench_codecs \\
+        --sizes 10,100,1000,10000 --repeat 20 --output codecs.json
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from ansible_collections.community.stackrox.plugins.module_utils.codec import CODECS, HAS_ORJSON, get_codec
+from ansible_collections.community.stackrox.tests.benchmarks.fake_central import Inventory
+
+# measures an import on top of what every module already loads;
+# json is imported last, as it's one of the modules measured
+IMPORT_PROBE = """
+import time
+import ansible.module_utils.basic
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+import json
+print(json.dumps(seconds))
+"""
+
+def tokens_body(size, padding):
+    inventory = Inventory(tokens=size, bundles=0, padding=padding)
+    return json.dumps({"tokens": list(inventory.tokens.values())}).encode('utf-8')
+
+def median_seconds(func, repeat):
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+
+    return statistics.median(samples)
+
+def import_seconds(module, repeat):
+    samples = []
+    for i in range(repeat):
+        proc = subprocess.run([sys.executable, '-c', IMPORT_PROBE.format(module=module)],
+                              capture_output=True, text=True, check=True)
+        samples.append(json.loads(proc.stdout))
+
+    return statistics.median(samples)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the JSON codecs on apitokens list responses.")
+    parser.add_argument('--sizes', default='10,100,1000,10000', help="comma separated token counts")
+    parser.add_argument('--padding', type=int, default=0, help="bytes of description per token")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--output', help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    codecs = [name for name in CODECS if name != 'orjson' or HAS_ORJSON]
+    if not HAS_ORJSON:
+        print("orjson is not installed, only the standard library codec is measured", file=sys.stderr)
+
+    results = dict(imports={}, parse=[])
+
+    for name in codecs:
+        results['imports'][name] = import_seconds(name, args.repeat)
+        print(f"import {name:<8} {results['imports'][name] * 1000:8.2f}ms", file=sys.stderr)
+
+    for size in [int(s) for s in args.sizes.split(',')]:
+        body = tokens_body(size, args.padding)
+
+        for name in codecs + ['auto']:
+            codec = get_codec(name)
+            seconds = median_seconds(lambda: codec.loads(body), args.repeat)
+            results['parse'].append(dict(codec=name, tokens=size, bytes=len(body), seconds=seconds))
+
+            print(f"{size:>8} tokens {len(body) / 1024:10.1f}KiB  {name:<8} {seconds * 1000:10.3f}ms"
+                  f"  {len(body) / seconds / 2**20:8.1f}MiB/s", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+
+if __name__ == '__main__':
+    main()
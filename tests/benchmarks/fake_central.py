@@ -0,0 +1,402 @@
+"""
+A local stand-in for Stackrox Central, for benchmarking the collection without a cluster.
+
+Serves the API token and cluster init bundle endpoints the collection uses over HTTP or
+HTTPS (with a throwaway self-signed certificate), with a configurable inventory size,
+per-request latency, padding to grow each item, gzip compressed list responses and
+injected error responses.
+"""
+
+import datetime
+import gzip
+import hashlib
+import ipaddress
+import json
+import os
+import random
+import re
+import ssl
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def _self_signed_cert(directory):
+    #
+    # Write a certificate and key for 127.0.0.1 into directory
+    # and return their paths.
+    #
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "fake-central")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+
+    cert = (x509.CertificateBuilder()
+            .subject_name(name)
+            .issuer_name(name)
+            .public_key(key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - datetime.timedelta(minutes=5))
+            .not_valid_after(now + datetime.timedelta(days=1))
+            .add_extension(x509.SubjectAlternativeName([x509.DNSName("localhost"),
+                                                        x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]),
+                           critical=False)
+            .sign(key, hashes.SHA256()))
+
+    cert_path = os.path.join(directory, 'cert.pem')
+    key_path = os.path.join(directory, 'key.pem')
+
+    with open(cert_path, 'wb') as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+
+    with open(key_path, 'wb') as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM,
+                                  serialization.PrivateFormat.PKCS8,
+                                  serialization.NoEncryption()))
+
+    return cert_path, key_path
+
+class Inventory:
+    """
+    The tokens and init bundles the fake Central knows about.
+
+    Serialized list responses are kept until the next change, so large inventories
+    cost the server little per request and the timings reflect the client.
+    """
+
+    def __init__(self, tokens=100, bundles=10, padding=0):
+        self.lock = threading.Lock()
+        self.padding = "x" * padding
+        self.generation = 0
+        self._bodies = {}
+
+        self.tokens = {}
+        for i in range(tokens):
+            self.add_token(f"token-{i}", "Admin")
+
+        self.bundles = {}
+        for i in range(bundles):
+            self.add_bundle(f"bundle-{i}")
+
+    def _changed(self):
+        self.generation += 1
+        self._bodies = {}
+
+    def add_token(self, name, role):
+        token = {
+            "id": str(uuid.uuid4()),
+            "name": name,
+            "roles": [role],
+            "issuedAt": "2024-01-01T00:00:00Z",
+            "expiration": "2025-01-01T00:00:00Z",
+            "revoked": False
+        }
+        if self.padding:
+            token["description"] = self.padding
+
+        self.tokens[token['id']] = token
+        self._changed()
+        return token
+
+    def add_bundle(self, name):
+        bundle = {
+            "id": str(uuid.uuid4()),
+            "name": name,
+            "createdAt": "2024-01-01T00:00:00Z",
+            "expiresAt": "2025-01-01T00:00:00Z",
+            "impactedClusters": [{"id": str(uuid.uuid4()), "name": f"{name}-cluster"}]
+        }
+        if self.padding:
+            bundle["description"] = self.padding
+
+        self.bundles[bundle['id']] = bundle
+        self._changed()
+        return bundle
+
+    def body(self, key, build, encode=None):
+        #
+        # Return the cached serialized response for key,
+        # building it with build() on a miss.
+        #
+        if key not in self._bodies:
+            self._bodies[key] = encode(build()) if encode else json.dumps(build()).encode('utf-8')
+        return self._bodies[key]
+
+class Stats:
+    """
+    Counts of what the fake Central has seen since the last `reset()`.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.connections = 0
+        self.errors = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+
+    def add(self, **counts):
+        with self.lock:
+            for name, count in counts.items():
+                setattr(self, name, getattr(self, name) + count)
+
+    def as_dict(self):
+        return dict(requests=self.requests,
+                    connections=self.connections,
+                    errors=self.errors,
+                    not_modified=self.not_modified,
+                    bytes_sent=self.bytes_sent)
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    # headers and body go out in separate writes; don't let
+    # Nagle's algorithm hold the body back for the client's ACK
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.stats.add(connections=1)
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b'', headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.stats.add(bytes_sent=len(body))
+
+    def _send_json(self, data, status=200):
+        self._send(status, json.dumps(data).encode('utf-8'))
+
+    def _send_list(self, key, build):
+        inventory = self.server.inventory
+        gzipped = self.server.compress and 'gzip' in self.headers.get('Accept-Encoding', '')
+
+        with inventory.lock:
+            body = inventory.body(key, build)
+            etag = '"%s"' % hashlib.sha1(body).hexdigest()
+            if gzipped:
+                body = inventory.body((key, 'gzip'), lambda: body, encode=lambda b: gzip.compress(b, compresslevel=6))
+
+        headers = {"ETag": etag}
+        if gzipped:
+            headers['Content-Encoding'] = 'gzip'
+
+        if self.headers.get('If-None-Match') == etag:
+            self.server.stats.add(not_modified=1)
+            self._send(304, headers={"ETag": etag})
+        else:
+            self._send(200, body, headers=headers)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        if self.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        return json.loads(body) if body else {}
+
+    def _dispatch(self, method):
+        server = self.server
+        server.stats.add(requests=1)
+
+        if server.latency:
+            time.sleep(server.latency)
+
+        body = self._read_json() if method in ('POST', 'PATCH') else None
+
+        if server.should_fail():
+            server.stats.add(errors=1)
+            headers = {"Retry-After": "0"} if server.error_status in (429, 503) else None
+            self._send(server.error_status, b'{"error": "injected"}', headers)
+            return
+
+        if server.token and self.headers.get('Authorization') != f"Bearer {server.token}":
+            self._send(401, b'{"error": "unauthenticated"}')
+            return
+
+        path, _, query = self.path.partition('?')
+        for route_method, pattern, handler in ROUTES:
+            match = re.fullmatch(pattern, path)
+            if route_method == method and match:
+                handler(self, query, body, *match.groups())
+                return
+
+        self._send(404, b'{"error": "not found"}')
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PATCH(self):
+        self._dispatch('PATCH')
+
+    # routes
+
+    def list_tokens(self, query, body):
+        include_revoked = 'revoked=true' in query
+        inventory = self.server.inventory
+
+        def build():
+            return {"tokens": [t for t in inventory.tokens.values() if include_revoked or not t['revoked']]}
+
+        self._send_list(('tokens', include_revoked), build)
+
+    def get_token(self, query, body, id):
+        with self.server.inventory.lock:
+            token = self.server.inventory.tokens.get(id)
+
+        if token is None:
+            self._send(404, b'{"error": "not found"}')
+        else:
+            self._send_json(token)
+
+    def generate_token(self, query, body):
+        with self.server.inventory.lock:
+            token = self.server.inventory.add_token(body['name'], body['role'])
+
+        self._send_json({"token": "fake." + token['id'], "metadata": token})
+
+    def revoke_token(self, query, body, id):
+        with self.server.inventory.lock:
+            token = self.server.inventory.tokens.get(id)
+            if token is not None:
+                token['revoked'] = True
+                self.server.inventory._changed()
+
+        if token is None:
+            self._send(404, b'{"error": "not found"}')
+        else:
+            self._send_json({})
+
+    def list_bundles(self, query, body):
+        inventory = self.server.inventory
+        self._send_list('bundles', lambda: {"items": list(inventory.bundles.values())})
+
+    def generate_bundle(self, query, body):
+        with self.server.inventory.lock:
+            bundle = self.server.inventory.add_bundle(body['name'])
+
+        self._send_json({"meta": bundle, "helmValuesBundle": "aGVsbQ==", "kubectlBundle": "a3ViZWN0bA=="})
+
+    def revoke_bundles(self, query, body):
+        inventory = self.server.inventory
+        revoked, errors = [], []
+
+        with inventory.lock:
+            for id in body.get('ids', []):
+                if inventory.bundles.pop(id, None) is None:
+                    errors.append({"id": id, "error": "not found", "impactedClusters": []})
+                else:
+                    revoked.append(id)
+            inventory._changed()
+
+        self._send_json({"initBundleRevocationErrors": errors, "initBundleRevokedIds": revoked})
+
+ROUTES = [
+    ('GET', r'/v1/apitokens', _Handler.list_tokens),
+    ('POST', r'/v1/apitokens/generate', _Handler.generate_token),
+    ('PATCH', r'/v1/apitokens/revoke/([^/]+)', _Handler.revoke_token),
+    ('GET', r'/v1/apitokens/([^/]+)', _Handler.get_token),
+    ('GET', r'/v1/cluster-init/init-bundles', _Handler.list_bundles),
+    ('POST', r'/v1/cluster-init/init-bundles', _Handler.generate_bundle),
+    ('PATCH', r'/v1/cluster-init/init-bundles/revoke', _Handler.revoke_bundles),
+]
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # clients dropping kept-alive connections is expected
+        if not isinstance(sys.exc_info()[1], (ConnectionError, ssl.SSLError)):
+            super().handle_error(request, client_address)
+
+class FakeCentral:
+    """
+    Run a fake Central in a background thread for the duration of a `with` block.
+
+    `tokens` and `bundles` set the inventory size, `padding` adds that many bytes to
+    every item, `compress` gzips list responses for clients that accept it,
+    `latency` is slept before answering each request and a fraction
+    `error_rate` of requests (chosen with a fixed `seed`) are answered with `error_status`.
+    Requests must carry `token` as a bearer token.
+
+    `url` is the base URL to use as `central`. With `tls` set it is HTTPS with a
+    self-signed certificate, so clients need `validate_certs=False`.
+    """
+
+    def __init__(self, tokens=100, bundles=10, padding=0, latency=0, error_rate=0, error_status=503,
+                 tls=False, token="benchmark", seed=0, compress=False):
+        self.server = _Server(('127.0.0.1', 0), _Handler)
+        self.server.inventory = Inventory(tokens=tokens, bundles=bundles, padding=padding)
+        self.server.stats = Stats()
+        self.server.latency = latency
+        self.server.compress = compress
+        self.server.error_status = error_status
+        self.server.token = token
+
+        errors = random.Random(seed)
+        errors_lock = threading.Lock()
+
+        def should_fail():
+            with errors_lock:
+                return errors.random() < error_rate
+
+        self.server.should_fail = should_fail
+
+        self.token = token
+        self.tls = tls
+        self._thread = None
+        self._tmp = None
+
+    @property
+    def url(self):
+        scheme = 'https' if self.tls else 'http'
+        return f"{scheme}://127.0.0.1:{self.server.server_address[1]}"
+
+    @property
+    def inventory(self):
+        return self.server.inventory
+
+    @property
+    def stats(self):
+        return self.server.stats
+
+    def start(self):
+        if self.tls:
+            self._tmp = tempfile.TemporaryDirectory()
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(*_self_signed_cert(self._tmp.name))
+            self.server.socket = context.wrap_socket(self.server.socket, server_side=True)
+
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self._tmp:
+            self._tmp.cleanup()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,284 @@
+"""
+Benchmarks for the collection against a local fake Central.
+
+Run from a checkout installed as a collection, with the directory containing
+`ansible_collections` on PYTHONPATH:
+
+    python -m ansible_collections.community.stackrox.tests.benchmarks.run \\
+        --sizes 10 1000 100000 --repeat 5 --output results.json
+
+Every benchmark is timed `--repeat` times per inventory size, against a fresh fake Central,
+and the results are written as JSON: one entry per benchmark and size with the timings
+in seconds and what the server saw (requests, connections, bytes sent). Compare two
+result files with `--compare` to spot regressions.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from ansible_collections.community.stackrox.plugins.module_utils.services import apitoken, clusterinit
+from ansible_collections.community.stackrox.plugins.modules import apitoken as apitoken_module
+from ansible_collections.community.stackrox.tests.benchmarks.fake_central import FakeCentral
+
+# the collection root's parent, i.e. the directory holding ansible_collections
+COLLECTIONS_PATH = os.path.abspath(os.path.join(os.path.dirname(apitoken_module.__file__), *['..'] * 5))
+
+BENCHMARKS = {}
+
+def benchmark(name, operations=1, **service_options):
+    #
+    # Register a benchmark. The function gets a service factory and the
+    # fake Central, and performs `operations` API operations per run.
+    #
+    def register(func):
+        BENCHMARKS[name] = dict(func=func, operations=operations, service_options=service_options)
+        return func
+
+    return register
+
+@benchmark('tokens.list')
+def bench_token_list(services, central):
+    services.tokens().list()
+
+@benchmark('tokens.list.repeat', operations=20)
+def bench_token_list_repeat(services, central):
+    service = services.tokens()
+    for i in range(20):
+        service.list()
+
+@benchmark('tokens.list.cached', operations=20, cache_ttl=60)
+def bench_token_list_cached(services, central):
+    service = services.tokens()
+    for i in range(20):
+        service.list()
+
+@benchmark('tokens.list.revalidate', operations=20, revalidate=True)
+def bench_token_list_revalidate(services, central):
+    service = services.tokens()
+    for i in range(20):
+        service.list()
+
+@benchmark('tokens.get.name')
+def bench_token_get_name(services, central):
+    # the last token, so the whole list is read
+    services.tokens().get(name=f"token-{len(central.inventory.tokens) - 1}")
+
+@benchmark('tokens.get.id', operations=20)
+def bench_token_get_id(services, central):
+    service = services.tokens()
+    for id in list(central.inventory.tokens)[:20]:
+        service.get(id=id)
+
+@benchmark('tokens.create', operations=20)
+def bench_token_create(services, central):
+    service = services.tokens()
+    for i in range(20):
+        service.create(name=f"bench-{i}", role="Admin")
+
+@benchmark('tokens.revoke', operations=20)
+def bench_token_revoke(services, central):
+    service = services.tokens()
+    ids = [id for id, t in central.inventory.tokens.items() if not t['revoked']][:20]
+    for id in ids:
+        service.revoke(id=id)
+
+@benchmark('initbundles.get')
+def bench_bundle_get(services, central):
+    services.bundles().get_initbundle(f"bundle-{len(central.inventory.bundles) - 1}")
+
+@benchmark('initbundles.list')
+def bench_bundle_list(services, central):
+    services.bundles().list_initbundles()
+
+@benchmark('module.apitoken')
+def bench_module_apitoken(services, central):
+    services.run_module('apitoken', name="token-0", role="Admin", state="present")
+
+@benchmark('module.initbundle')
+def bench_module_initbundle(services, central):
+    services.run_module('initbundle', name="bundle-0", state="present")
+
+class Services:
+    """
+    Creates services pointed at the fake Central and closes them after the run.
+    """
+
+    def __init__(self, central, **options):
+        self.central = central
+        self.options = options
+        self._services = []
+
+    def _connection(self):
+        return dict(token=self.central.token, username=None, password=None,
+                    central=self.central.url, validate_certs=not self.central.tls)
+
+    def _create(self, cls):
+        service = cls(**self._connection(), **self.options)
+        self._services.append(service)
+        return service
+
+    def tokens(self):
+        return self._create(apitoken.Service)
+
+    def bundles(self):
+        return self._create(clusterinit.Service)
+
+    def run_module(self, module, **params):
+        #
+        # Run a module the way Ansible does, as a separate Python process
+        # reading its arguments from a file.
+        #
+        path = os.path.join(os.path.dirname(apitoken_module.__file__), f"{module}.py")
+        args = {"ANSIBLE_MODULE_ARGS": {**self._connection(), **self.options, **params}}
+
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as f:
+            json.dump(args, f)
+            f.flush()
+
+            env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [COLLECTIONS_PATH, os.environ.get('PYTHONPATH')]))}
+            proc = subprocess.run([sys.executable, path, f.name], env=env, capture_output=True, text=True)
+
+        result = json.loads(proc.stdout)
+        if result.get('failed'):
+            raise RuntimeError(f"{module} failed: {result.get('msg')}")
+
+        return result
+
+    def close(self):
+        for service in self._services:
+            service.close()
+
+def summarize(timings):
+    ordered = sorted(timings)
+    return dict(min=ordered[0],
+                median=statistics.median(ordered),
+                mean=statistics.mean(ordered),
+                p95=ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+                max=ordered[-1])
+
+def run_benchmark(name, size, args, cache_dir):
+    spec = BENCHMARKS[name]
+    timings = []
+    server = []
+
+    for i in range(args.repeat):
+        central = FakeCentral(tokens=size, bundles=size, padding=args.padding, latency=args.latency,
+                              error_rate=args.error_rate, error_status=args.error_status, tls=args.tls,
+                              compress=args.compress)
+
+        with central:
+            run_dir = tempfile.mkdtemp(dir=cache_dir)
+            services = Services(central, cache_dir=run_dir, **spec['service_options'])
+
+            try:
+                start = time.perf_counter()
+                spec['func'](services, central)
+                timings.append(time.perf_counter() - start)
+            finally:
+                services.close()
+
+            server.append(central.stats.as_dict())
+
+    return dict(name=name,
+                size=size,
+                operations=spec['operations'],
+                repeat=args.repeat,
+                seconds=summarize(timings),
+                timings=timings,
+                server={key: statistics.median(s[key] for s in server) for key in server[0]})
+
+def compare(baseline_path, results_path, threshold):
+    #
+    # Print the change in median time of every benchmark in both files
+    # and return the number that got slower by more than threshold.
+    #
+    def load(path):
+        with open(path) as f:
+            return {(r['name'], r['size']): r for r in json.load(f)['results']}
+
+    baseline, results = load(baseline_path), load(results_path)
+    regressions = 0
+
+    for key in sorted(set(baseline) & set(results)):
+        before = baseline[key]['seconds']['median']
+        after = results[key]['seconds']['median']
+        change = (after - before) / before if before else 0.0
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        print(f"{key[0]:<28} {key[1]:>8}  {before * 1000:10.2f}ms -> {after * 1000:10.2f}ms  {change:+7.1%}{flag}")
+
+    return regressions
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Stackrox collection against a fake Central.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000],
+                        help="inventory sizes (tokens and init bundles) to run every benchmark at")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--filter', default='',
+                        help="only run benchmarks whose name starts with this")
+    parser.add_argument('--latency', type=float, default=0,
+                        help="seconds the fake Central waits before answering each request")
+    parser.add_argument('--padding', type=int, default=0,
+                        help="extra bytes added to every token and init bundle")
+    parser.add_argument('--error-rate', type=float, default=0,
+                        help="fraction of requests answered with --error-status")
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--tls', action='store_true', help="serve HTTPS")
+    parser.add_argument('--compress', action='store_true', help="gzip list responses")
+    parser.add_argument('--output', help="write results to this JSON file")
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help="compare the results with an earlier results file")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="slowdown, as a fraction, reported as a regression by --compare")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = []
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for name in BENCHMARKS:
+            if not name.startswith(args.filter):
+                continue
+
+            for size in args.sizes:
+                result = run_benchmark(name, size, args, cache_dir)
+                results.append(result)
+                print(f"{name:<28} {size:>8}  median {result['seconds']['median'] * 1000:10.2f}ms"
+                      f"  requests {result['server']['requests']:>6}  connections {result['server']['connections']:>4}",
+                      file=sys.stderr)
+
+    report = dict(
+        environment=dict(python=platform.python_version(),
+                         platform=platform.platform(),
+                         timestamp=time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())),
+        options=dict(latency=args.latency, padding=args.padding, error_rate=args.error_rate,
+                     error_status=args.error_status, tls=args.tls, compress=args.compress),
+        results=results
+    )
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+    if args.compare:
+        if not args.output:
+            raise SystemExit("--compare needs --output")
+        if compare(args.compare, args.output, args.threshold):
+            return 1
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
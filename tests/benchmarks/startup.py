@@ -0,0 +1,104 @@
+"""
+Cold-start benchmark for the collection's modules.
+
+For every module, measures in fresh interpreters how long importing it takes, which
+of the collection's module_utils it loads, and how big its AnsiballZ payload is,
+i.e. the zip of the module and every module_util Ansible ships with it.
+
+    python -m ansible_collections.community.stackrox.tests.benchmarks.startup \\
+        --repeat 20 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from ansible_collections.community.stackrox.tests.benchmarks.run import COLLECTIONS_PATH
+
+MODULES_DIR = os.path.join(COLLECTIONS_PATH, 'ansible_collections', 'community', 'stackrox', 'plugins', 'modules')
+
+# run in a fresh interpreter for each sample
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import ansible.module_utils.basic
+baseline = time.perf_counter()
+import {fqn}
+end = time.perf_counter()
+print(json.dumps(dict(total=end - start, module=end - baseline,
+                      module_utils=sorted(m for m in sys.modules if m.startswith('ansible_collections.'))
+                      )))
+"""
+
+# builds the module's AnsiballZ zip the way Ansible does. Run in its own interpreter
+# since the collection loader has to be set up before anything imports the collection.
+PAYLOAD_PROBE = """
+import io, json, zipfile
+from ansible.executor.module_common import recursive_finder
+from ansible.plugins.loader import init_plugin_loader
+
+init_plugin_loader([{collections_path!r}])
+
+with open({path!r}, 'rb') as f:
+    data = f.read()
+
+buffer = io.BytesIO()
+with zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_DEFLATED) as zf:
+    recursive_finder({name!r}, {fqn!r}, data, zf)
+    zf.writestr({fqn!r}.replace('.', '/') + '.py', data)
+    files = zf.namelist()
+
+print(json.dumps(dict(bytes=len(buffer.getvalue()),
+                      files=len(files),
+                      collection_files=sorted(f for f in files if f.startswith('ansible_collections/')))))
+"""
+
+def module_fqn(name):
+    return f"ansible_collections.community.stackrox.plugins.modules.{name}"
+
+def probe(code):
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [COLLECTIONS_PATH, os.environ.get('PYTHONPATH')]))}
+    proc = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout)
+
+def import_times(name, repeat):
+    samples = [probe(PROBE.format(fqn=module_fqn(name))) for i in range(repeat)]
+
+    return dict(seconds=statistics.median(s['total'] for s in samples),
+                collection_seconds=statistics.median(s['module'] for s in samples),
+                loaded=samples[0]['module_utils'])
+
+def payload_size(name):
+    return probe(PAYLOAD_PROBE.format(collections_path=COLLECTIONS_PATH,
+                                      path=os.path.join(MODULES_DIR, f"{name}.py"),
+                                      name=name,
+                                      fqn=module_fqn(name)))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure module import time and AnsiballZ payload size.")
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--output', help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    modules = sorted(f[:-3] for f in os.listdir(MODULES_DIR) if f.endswith('.py') and not f.startswith('_'))
+    results = []
+
+    for name in modules:
+        result = dict(module=name, imports=import_times(name, args.repeat), payload=payload_size(name))
+        results.append(result)
+        print(f"{name:<16} import {result['imports']['seconds'] * 1000:8.1f}ms"
+              f" (collection {result['imports']['collection_seconds'] * 1000:6.1f}ms)"
+              f"  payload {result['payload']['bytes'] / 1024:8.1f}KiB in {result['payload']['files']} files",
+              file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(dict(results=results), f, indent=2)
+    else:
+        json.dump(dict(results=results), sys.stdout, indent=2)
+
+if __name__ == '__main__':
+    main()
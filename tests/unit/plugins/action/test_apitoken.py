@@ -0,0 +1,59 @@
+from ansible_collections.community.stackrox.plugins.action.apitoken import ActionModule
+
+import unittest
+from unittest.mock import patch, MagicMock
+
+class TestApiTokenAction(unittest.TestCase):
+
+    def __create_action(self, args, check_mode=False):
+        task = MagicMock()
+        task.args = args
+        task.async_val = 0
+        task.check_mode = check_mode
+
+        return ActionModule(task, MagicMock(), MagicMock(), MagicMock(), MagicMock(), MagicMock())
+
+    @patch('ansible_collections.community.stackrox.plugins.modules.apitoken.Service', autospec=True)
+    def test_runs_on_controller_with_shared_transport(self, service_class):
+        #
+        # Two tasks against the same Central should use the same
+        # connection pool, and results should match the module's.
+        #
+        token = {"id": "1", "name": "ci", "revoked": False}
+        service_class.return_value.get.return_value = [token]
+
+        args = {"central": "https://central.com", "token": "secret", "name": "ci", "role": "Admin"}
+
+        first = self.__create_action(args).run(task_vars={})
+        second = self.__create_action(args).run(task_vars={})
+
+        self.assertFalse(first.get('failed'))
+        self.assertFalse(first['changed'])
+        self.assertEqual(first['tokens'], [token])
+        self.assertEqual(first['invocation']['module_args']['token'], 'VALUE_SPECIFIED_IN_NO_LOG_PARAMETER')
+
+        transports = [c.kwargs['transport'] for c in service_class.call_args_list]
+        self.assertIs(transports[0], transports[1])
+        service_class.return_value.create.assert_not_called()
+        self.assertEqual(second['tokens'], [token])
+
+    @patch('ansible_collections.community.stackrox.plugins.modules.apitoken.Service', autospec=True)
+    def test_reports_validation_and_module_failures(self, service_class):
+        result = self.__create_action({"central": "https://central.com", "state": "present"}).run(task_vars={})
+        self.assertTrue(result['failed'])
+        service_class.assert_not_called()
+
+        service_class.return_value.get.return_value = [{"id": "1"}, {"id": "2"}]
+        result = self.__create_action({"central": "https://central.com", "name": "ci", "state": "absent"}).run(task_vars={})
+
+        self.assertTrue(result['failed'])
+        self.assertIn("Multiple tokens", result['msg'])
+        service_class.return_value.revoke.assert_not_called()
+
+        # a service that can't be set up fails the task instead of raising
+        service_class.side_effect = PermissionError("Refusing to use cache directory /tmp/shared")
+        result = self.__create_action({"central": "https://central.com", "name": "ci", "state": "absent",
+                                       "cache_dir": "/tmp/shared"}).run(task_vars={})
+
+        self.assertTrue(result['failed'])
+        self.assertIn("Refusing to use cache directory", result['msg'])
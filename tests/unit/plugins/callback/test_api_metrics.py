@@ -0,0 +1,51 @@
+from ansible.plugins.loader import callback_loader
+
+from ansible_collections.community.stackrox.tests.unit.plugins.utils import PluginLoaderTestCase
+
+import os
+import json
+import tempfile
+from unittest.mock import MagicMock
+
+def task_result(result, task="create tokens"):
+    r = MagicMock()
+    r._task.get_name.return_value = task
+    r._host.get_name.return_value = "localhost"
+    r._result = result
+    return r
+
+def record(method, endpoint, latency):
+    return dict(method=method, endpoint=endpoint, status=200, latency=latency, bytes_in=100, bytes_out=0, retries=0)
+
+class TestApiMetricsCallback(PluginLoaderTestCase):
+
+    def test_aggregates_tasks_loop_items_and_centrals(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        output = os.path.join(tmp.name, "metrics.json")
+
+        callback = callback_loader.get('community.stackrox.api_metrics')
+        callback.set_options(direct={'output': output})
+        callback._display = MagicMock()
+
+        callback.v2_runner_on_ok(task_result({"api_metrics": [record('GET', '/v1/apitokens', 0.1)]}))
+        callback.v2_runner_on_ok(task_result({"results": [
+            {"api_metrics": [record('GET', '/v1/apitokens', 0.3)]},
+            {"api_metrics": [record('POST', '/v1/apitokens/generate', 0.2)]}
+        ]}))
+        callback.v2_runner_on_failed(task_result({"centrals": {
+            "prod": {"api_metrics": [record('GET', '/v1/apitokens', 0.2)]},
+            "staging": {"failed": True, "msg": "Connection refused"}
+        }}))
+        callback.v2_runner_on_ok(task_result({"changed": False}))
+        callback.v2_playbook_on_stats(MagicMock())
+
+        with open(output) as f:
+            written = json.load(f)
+
+        self.assertEqual(written['endpoints']['GET /v1/apitokens']['calls'], 3)
+        self.assertEqual(written['endpoints']['GET /v1/apitokens']['latency']['max'], 0.3)
+        self.assertEqual(written['endpoints']['POST /v1/apitokens/generate']['calls'], 1)
+        self.assertEqual(len(written['requests']), 4)
+        self.assertEqual(written['requests'][3]['central'], "prod")
+        self.assertTrue(callback._display.display.called)
@@ -0,0 +1,49 @@
+from ansible.plugins.loader import lookup_loader
+
+from ansible_collections.community.stackrox.tests.unit.plugins.utils import PluginLoaderTestCase
+
+import tempfile
+from unittest.mock import patch
+
+TOKENS = [
+    {"id": "1", "name": "ci", "revoked": False},
+    {"id": "2", "name": "ci", "revoked": False},
+    {"id": "3", "name": "admin", "revoked": False}
+]
+
+# the lookup's options come from its documentation, which needs the collection loader
+class TestTokensLookup(PluginLoaderTestCase):
+
+    def setUp(self):
+        patcher = patch('ansible_collections.community.stackrox.plugins.lookup.tokens.Service', autospec=True)
+        self.service_class = patcher.start()
+        self.service_class.return_value.list.return_value = TOKENS
+        self.addCleanup(patcher.stop)
+
+        self.lookup = lookup_loader.get('community.stackrox.tokens')
+
+    def test_filters_by_name_and_id(self):
+        self.assertEqual(self.lookup.run([], {}, central="https://central.com"), TOKENS)
+        self.assertEqual(self.lookup.run(["ci"], {}, central="https://central.com"), TOKENS[:2])
+        self.assertEqual(self.lookup.run(["admin"], {}, central="https://central.com", id=["1"]), [TOKENS[0], TOKENS[2]])
+
+        self.service_class.return_value.list.assert_called_with(include_revoked=False)
+        self.service_class.return_value.close.assert_called_with()
+
+    def test_cache_plugin_is_shared_between_lookups(self):
+        #
+        # With a file based cache plugin, a second lookup (as made by another
+        # fork) should not call the API again.
+        #
+        with tempfile.TemporaryDirectory() as cache_dir:
+            options = dict(central="https://central.com", token="t", cache_plugin="jsonfile", cache_connection=cache_dir)
+
+            first = self.lookup.run(["ci"], {}, **options)
+            second = lookup_loader.get('community.stackrox.tokens').run(["admin"], {}, **options)
+
+            other_token = lookup_loader.get('community.stackrox.tokens').run([], {}, **{**options, "token": "other"})
+
+        self.assertEqual(first, TOKENS[:2])
+        self.assertEqual(second, TOKENS[2:])
+        self.assertEqual(other_token, TOKENS)
+        self.assertEqual(self.service_class.return_value.list.call_count, 2)
@@ -0,0 +1,167 @@
+from ansible_collections.community.stackrox.plugins.module_utils.services import apitoken, clusterinit
+from ansible_collections.community.stackrox.plugins.module_utils.aio import AsyncConnectionPool
+from ansible_collections.community.stackrox.tests.unit.plugins.utils import PluginLoaderTestCase
+
+import ansible_collections
+import unittest
+from unittest.mock import patch
+import importlib
+import asyncio
+import time
+import threading
+import subprocess
+import sys
+import os
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TOKENS = [{"id": str(i), "name": f"token-{i}", "revoked": False} for i in range(50)]
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def _send_json(self, data, chunked=False):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for i in range(0, len(body), 100):
+                chunk = body[i:i + 100]
+                self.wfile.write(f"{len(chunk):x}\r\n".encode('ascii') + chunk + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.endswith('/slow'):
+            time.sleep(0.5)
+
+        if self.path.startswith('/v1/apitokens'):
+            self.server.lists += 1
+            self._send_json({"tokens": TOKENS})
+        elif self.path == '/v1/cluster-init/init-bundles':
+            self._send_json({"items": [{"id": "b1", "name": "bundle-1", "impactedClusters": []}]}, chunked=True)
+
+    def do_PATCH(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.server.revoked.append(self.path)
+        self._send_json({})
+
+    def log_message(self, *args):
+        pass
+
+class TestAsyncServices(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.server.connections = 0
+        self.server.revoked = []
+        self.server.lists = 0
+        # clients giving up on a slow response hang up before it is written
+        self.server.handle_error = lambda request, client_address: None
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.central = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def __kwargs(self, **extra):
+        return dict(token="token", username=None, password=None, central=self.central, **extra)
+
+    def test_concurrent_calls_share_bounded_connections(self):
+        #
+        # Many gathered calls should complete with no more
+        # connections than the in-flight limit, and lookups by
+        # name share a single list.
+        #
+        async def run():
+            async with apitoken.AsyncService(**self.__kwargs(max_in_flight=4)) as service:
+                found = await asyncio.gather(*[service.get(name=t['name']) for t in TOKENS])
+                await asyncio.gather(*[service.revoke(id=t['id']) for t in TOKENS[:10]])
+                return found
+
+        found = asyncio.run(run())
+
+        self.assertEqual([f[0] for f in found], TOKENS)
+        self.assertEqual(sorted(self.server.revoked), sorted(f"/v1/apitokens/revoke/{t['id']}" for t in TOKENS[:10]))
+        self.assertLessEqual(self.server.connections, 4)
+        self.assertEqual(self.server.lists, 1)
+
+    def test_chunked_responses_are_decoded(self):
+        async def run():
+            async with clusterinit.AsyncService(**self.__kwargs()) as service:
+                return await service.get_initbundle("bundle-1"), await service.get_initbundle("missing")
+
+        (bundle, missing) = asyncio.run(run())
+
+        self.assertEqual(bundle['id'], "b1")
+        self.assertIsNone(missing)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_timeouts_and_unsupported_options(self):
+        async def run():
+            async with apitoken.AsyncService(**self.__kwargs(read_timeout=0.1, max_retries=0)) as service:
+                await service.get(id="slow")
+
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(run())
+
+        with self.assertRaises(ValueError):
+            apitoken.AsyncService(**self.__kwargs(session_token=True, rate_limit=0))
+
+    def test_proxies_are_refused(self):
+        async def run():
+            async with apitoken.AsyncService(**self.__kwargs()) as service:
+                await service.list()
+
+        with patch.dict(os.environ, {"http_proxy": "http://proxy:3128", "no_proxy": "", "NO_PROXY": ""}):
+            with self.assertRaises(ValueError):
+                asyncio.run(run())
+
+        self.assertEqual(self.server.connections, 0)
+
+    @patch('ansible_collections.community.stackrox.plugins.module_utils.aio.ssl.create_default_context')
+    def test_ca_path_is_trusted(self, create_default_context):
+        AsyncConnectionPool(ca_path="/etc/stackrox/ca.pem")
+        create_default_context.return_value.load_verify_locations.assert_called_once_with(cafile="/etc/stackrox/ca.pem")
+
+class TestLazyImport(unittest.TestCase):
+
+    def test_modules_do_not_import_asyncio(self):
+        #
+        # The async services are only loaded when asked for, so
+        # module runs don't pay for importing asyncio.
+        #
+        code = ("import sys\n"
+                "import ansible_collections.community.stackrox.plugins.modules.initbundle\n"
+                "import ansible_collections.community.stackrox.plugins.modules.apitoken\n"
+                "print('asyncio' in sys.modules)")
+
+        env = {**os.environ, "PYTHONPATH": os.path.dirname(list(ansible_collections.__path__)[0])}
+        proc = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True)
+
+        self.assertEqual(proc.stdout.strip(), "False")
+
+class TestLazyImportWithCollectionLoader(PluginLoaderTestCase):
+
+    def test_async_services_resolve(self):
+        #
+        # Controller-side plugins import the services through the
+        # collection loader rather than as a plain package.
+        #
+        for name in ('apitoken', 'clusterinit'):
+            module = importlib.import_module(f"ansible_collections.community.stackrox.plugins.module_utils.services.{name}")
+
+            self.assertEqual(module.AsyncService.__module__, f"{module.__name__}_async")
+
+            with self.assertRaises(AttributeError):
+                module.NoSuchService
@@ -0,0 +1,110 @@
+from ansible_collections.community.stackrox.plugins.module_utils.breaker import CircuitBreaker
+from ansible_collections.community.stackrox.plugins.module_utils.services import apitoken
+from ansible_collections.community.stackrox.plugins.module_utils.transport import Response
+from ansible_collections.community.stackrox.plugins.module_utils import exceptions
+
+import unittest
+from unittest.mock import patch
+import tempfile
+import json
+from contextlib import nullcontext
+import io
+
+class DownTransport:
+    #
+    # A Central that refuses connections until it is brought back up.
+    #
+    def __init__(self):
+        self.up = False
+        self.requests = 0
+
+    def request(self, method, url, headers=None, body=None):
+        self.requests += 1
+        if not self.up:
+            raise ConnectionRefusedError("Connection refused")
+        return Response(200, {}, json.dumps({"tokens": []}).encode('utf-8'))
+
+    def stream(self, method, url, headers=None, body=None):
+        resp = self.request(method, url, headers, body)
+        resp.read = io.BytesIO(resp.body).read
+        return nullcontext(resp)
+
+    def close(self):
+        pass
+
+@patch('ansible_collections.community.stackrox.plugins.module_utils.breaker.time.time')
+class TestCircuitBreaker(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_dir = tmp.name
+
+    def __create_breaker(self):
+        return CircuitBreaker("https://central.com", threshold=3, reset_timeout=30, cache_dir=self.cache_dir)
+
+    def test_opens_after_consecutive_failures(self, now):
+        now.return_value = 1000
+        breaker = self.__create_breaker()
+
+        breaker.failure()
+        breaker.failure()
+        breaker.success()
+        breaker.failure()
+        breaker.failure()
+        breaker.before()
+
+        breaker.failure()
+
+        # a second breaker stands in for another fork
+        with self.assertRaises(exceptions.CircuitOpenException) as e:
+            self.__create_breaker().before()
+
+        self.assertIn("https://central.com is unavailable", e.exception.msg)
+
+    def test_half_open_lets_a_single_probe_through(self, now):
+        now.return_value = 1000
+        breaker, other = self.__create_breaker(), self.__create_breaker()
+        for i in range(3):
+            breaker.failure()
+
+        now.return_value = 1031
+        breaker.before()
+
+        with self.assertRaises(exceptions.CircuitOpenException):
+            other.before()
+
+        # the probe failed; wait out the reset timeout again
+        breaker.failure()
+        now.return_value = 1040
+        with self.assertRaises(exceptions.CircuitOpenException):
+            breaker.before()
+
+        now.return_value = 1062
+        breaker.before()
+        breaker.success()
+        other.before()
+
+@patch('ansible_collections.community.stackrox.plugins.module_utils.basic.time.sleep')
+class TestServiceCircuitBreaker(unittest.TestCase):
+
+    def test_fails_fast_once_open(self, sleep):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+
+        transport = DownTransport()
+        service = apitoken.Service(token="token", username=None, password=None,
+                                   central="https://central.com",
+                                   transport=transport,
+                                   circuit_breaker=True,
+                                   circuit_breaker_threshold=2,
+                                   cache_dir=tmp.name)
+
+        # the second failed attempt opens the circuit, which ends the retries
+        with self.assertRaises(exceptions.CircuitOpenException):
+            service.list()
+
+        with self.assertRaises(exceptions.CircuitOpenException):
+            service.list()
+
+        self.assertEqual(transport.requests, 2)
@@ -0,0 +1,171 @@
+from ansible_collections.community.stackrox.plugins.module_utils.cache import ResponseCache
+from ansible_collections.community.stackrox.plugins.module_utils.services import apitoken
+from ansible_collections.community.stackrox.plugins.module_utils.transport import Response
+
+from unittest.mock import patch
+
+import unittest
+import tempfile
+import os
+import threading
+import time
+import json
+
+class FakeTransport:
+    #
+    # Records requests and answers every one with the same token list.
+    #
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.requests = []
+
+    def request(self, method, url, headers=None, body=None):
+        self.requests.append((method, url))
+        time.sleep(self.delay)
+        return Response(200, {}, json.dumps({"tokens": [{"id": "1", "name": "t", "revoked": False}]}).encode('utf-8'))
+
+    def close(self):
+        pass
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_dir = tmp.name
+
+    def __create_service(self, transport, token="token"):
+        return apitoken.Service(token=token, username=None, password=None,
+                                central="https://central.com",
+                                transport=transport,
+                                cache_ttl=60,
+                                cache_dir=self.cache_dir)
+
+    def test_concurrent_misses_fetch_once(self):
+        #
+        # Many services hitting an empty cache at the same time
+        # should result in a single request to the API.
+        #
+        transport = FakeTransport(delay=0.2)
+        services = [self.__create_service(transport) for i in range(8)]
+        results = []
+
+        threads = [threading.Thread(target=lambda s=s: results.append(s.list())) for s in services]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(transport.requests), 1)
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(r == results[0] for r in results))
+
+    def test_mutation_invalidates(self):
+        transport = FakeTransport()
+        service = self.__create_service(transport)
+
+        service.list()
+        service.list()
+        self.assertEqual(len(transport.requests), 1)
+
+        service.revoke(id="1")
+        service.list()
+        self.assertEqual([m for (m, u) in transport.requests], ['GET', 'PATCH', 'GET'])
+
+    def test_credentials_are_part_of_the_key(self):
+        transport = FakeTransport()
+
+        self.__create_service(transport, token="one").list()
+        self.__create_service(transport, token="two").list()
+
+        self.assertEqual(len(transport.requests), 2)
+
+    def test_expired_entries_are_refetched(self):
+        cache = ResponseCache("ns", ttl=0.1, cache_dir=self.cache_dir)
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return b"{}"
+
+        cache.get_or_fetch("url", fetch)
+        cache.get_or_fetch("url", fetch)
+        time.sleep(0.15)
+        cache.get_or_fetch("url", fetch)
+
+        self.assertEqual(len(calls), 2)
+
+    def test_refuses_a_cache_dir_open_to_others(self):
+        shared = os.path.join(self.cache_dir, "shared")
+        os.mkdir(shared)
+        os.chmod(shared, 0o1777)
+
+        with self.assertRaises(PermissionError):
+            ResponseCache("ns", ttl=60, cache_dir=shared)
+
+        link = os.path.join(self.cache_dir, "link")
+        os.symlink(self.cache_dir, link)
+
+        with self.assertRaises(PermissionError):
+            ResponseCache("ns", ttl=60, cache_dir=link)
+
+    def test_default_cache_dir_is_per_user(self):
+        with patch.dict(os.environ, {"XDG_CACHE_HOME": self.cache_dir}):
+            cache = ResponseCache("ns", ttl=60)
+
+        self.assertEqual(cache.path, os.path.join(self.cache_dir, "stackrox", "ns"))
+        self.assertEqual(os.stat(os.path.dirname(cache.path)).st_mode & 0o777, 0o700)
+
+class RevalidatingTransport:
+    #
+    # Serves a token list with an ETag and answers 304 when it is
+    # presented again, like a Central that supports conditional requests.
+    #
+    def __init__(self):
+        self.etag = '"v1"'
+        self.requests = []
+
+    def request(self, method, url, headers=None, body=None):
+        self.requests.append(headers.get('If-None-Match'))
+
+        if headers.get('If-None-Match') == self.etag:
+            return Response(304, {}, b'')
+
+        body = json.dumps({"tokens": [{"id": self.etag, "name": "t", "revoked": False}]}).encode('utf-8')
+        return Response(200, {"ETag": self.etag}, body)
+
+    def close(self):
+        pass
+
+class TestRevalidation(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_dir = tmp.name
+
+    def __create_service(self, transport):
+        return apitoken.Service(token="token", username=None, password=None,
+                                central="https://central.com",
+                                transport=transport,
+                                revalidate=True,
+                                cache_dir=self.cache_dir)
+
+    def test_not_modified_serves_stored_body(self):
+        #
+        # The second run sends the stored ETag and is answered from disk
+        # on a 304; a changed ETag is fetched in full again.
+        #
+        transport = RevalidatingTransport()
+
+        first = self.__create_service(transport).list()
+        second = self.__create_service(transport).list()
+
+        self.assertEqual(first, second)
+        self.assertEqual(transport.requests, [None, '"v1"'])
+
+        transport.etag = '"v2"'
+        third = self.__create_service(transport).list()
+
+        self.assertEqual(third[0]['id'], '"v2"')
+        self.assertEqual(transport.requests, [None, '"v1"', '"v1"'])
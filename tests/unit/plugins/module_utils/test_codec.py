@@ -0,0 +1,50 @@
+from ansible_collections.community.stackrox.plugins.module_utils import codec
+from ansible_collections.community.stackrox.plugins.modules import apitokens
+
+from ansible_collections.community.stackrox.tests.unit.plugins.modules import utils
+
+import unittest
+from unittest.mock import patch
+import json
+
+TOKENS = {"tokens": [{"id": "1", "name": "café ☃", "roles": ["Admin"], "revoked": False, "expiration": None}]}
+
+class TestCodecs(unittest.TestCase):
+
+    def test_codecs_agree_with_json(self):
+        body = json.dumps(TOKENS).encode('utf-8')
+
+        names = ['json', 'orjson', 'auto'] if codec.HAS_ORJSON else ['json']
+        for name in names:
+            c = codec.get_codec(name)
+            self.assertEqual(c.loads(body), TOKENS)
+            self.assertEqual(c.loads(body.decode('utf-8')), TOKENS)
+            self.assertIsInstance(c.dumps(TOKENS), bytes)
+            self.assertEqual(json.loads(c.dumps(TOKENS)), TOKENS)
+
+    @unittest.skipUnless(codec.HAS_ORJSON, "orjson is not installed")
+    def test_auto_only_uses_orjson_for_large_bodies(self):
+        with patch.object(codec.OrjsonCodec, 'loads', return_value="orjson") as orjson_loads:
+            self.assertEqual(codec.AutoCodec.loads(b'{"tokens": []}'), {"tokens": []})
+            orjson_loads.assert_not_called()
+
+            with patch.object(codec.AutoCodec, 'THRESHOLD', 8):
+                self.assertEqual(codec.AutoCodec.loads(b'{"tokens": []}'), "orjson")
+
+    @patch.object(codec, 'HAS_ORJSON', False)
+    def test_falls_back_without_orjson(self):
+        self.assertIs(codec.get_codec('auto'), codec.JsonCodec)
+
+        with self.assertRaises(ValueError):
+            codec.get_codec('orjson')
+
+class TestModuleCodecOption(utils.ModuleTestCase):
+
+    @patch('ansible_collections.community.stackrox.plugins.module_utils.basic.HAS_ORJSON', False)
+    def test_orjson_requested_but_missing(self):
+        utils.set_module_args({**self.default_args, "json_codec": "orjson", "tokens": []})
+
+        with self.assertRaises(utils.AnsibleFailJson) as result:
+            apitokens.main()
+
+        self.assertIn("orjson", result.exception.args[0]['msg'])
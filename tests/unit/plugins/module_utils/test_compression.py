@@ -0,0 +1,114 @@
+from ansible_collections.community.stackrox.plugins.module_utils.compression import DecodingResponse
+from ansible_collections.community.stackrox.plugins.module_utils.jsonstream import iter_array_items
+from ansible_collections.community.stackrox.plugins.module_utils.services import apitoken
+
+import unittest
+import threading
+import gzip
+import zlib
+import io
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TOKENS = [{"id": str(i), "name": f"token-{i}", "revoked": False} for i in range(2000)]
+
+def raw_deflate(data):
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+class _RawResponse:
+    def __init__(self, body, headers=None):
+        self.status = 200
+        self.headers = headers or {}
+        self._body = io.BytesIO(body)
+
+    def read(self, size=-1):
+        return self._body.read(size)
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def _send(self, body):
+        encoded = 'gzip' in self.headers.get('Accept-Encoding', '')
+        if encoded:
+            body = gzip.compress(body)
+            self.server.encoded += 1
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if encoded:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._send(json.dumps({"tokens": TOKENS}).encode('utf-8'))
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.server.request_encodings.append(self.headers.get('Content-Encoding'))
+        if self.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        self._send(body)
+
+    def log_message(self, *args):
+        pass
+
+class TestDecodingResponse(unittest.TestCase):
+
+    def test_decodes_incrementally(self):
+        body = json.dumps({"tokens": TOKENS}).encode('utf-8')
+
+        for encoded, encoding in [(gzip.compress(body), 'gzip'),
+                                  (zlib.compress(body), 'deflate'),
+                                  (raw_deflate(body), 'deflate')]:
+            resp = DecodingResponse(_RawResponse(encoded), encoding, chunk_size=100)
+            self.assertEqual(list(iter_array_items(resp.read, 'tokens', chunk_size=512)), TOKENS)
+
+            resp = DecodingResponse(_RawResponse(encoded), encoding)
+            self.assertEqual(resp.read(), body)
+
+class TestCompressedRequests(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.server.connections = 0
+        self.server.encoded = 0
+        self.server.request_encodings = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.central = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def __create_service(self, **kwargs):
+        service = apitoken.Service(token="token", username=None, password=None, central=self.central, **kwargs)
+        self.addCleanup(service.close)
+        return service
+
+    def test_responses_are_compressed_and_connections_reused(self):
+        service = self.__create_service()
+
+        self.assertEqual(service.list(), TOKENS)
+        self.assertEqual(service.get(name="token-1999"), [TOKENS[-1]])
+        self.assertEqual(service.get(name="token-0"), [TOKENS[0]])
+
+        self.assertEqual(self.server.encoded, 3)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_compression_can_be_disabled(self):
+        self.assertEqual(self.__create_service(compression=False).list(), TOKENS)
+        self.assertEqual(self.server.encoded, 0)
+
+    def test_large_request_bodies_are_compressed(self):
+        service = self.__create_service(compress_min_size=64)
+
+        service.create(name="t", role="Admin")
+        service.create(name="t" * 100, role="Admin")
+
+        self.assertEqual(self.server.request_encodings, [None, 'gzip'])
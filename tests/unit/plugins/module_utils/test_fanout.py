@@ -0,0 +1,211 @@
+from ansible_collections.community.stackrox.plugins.module_utils.fanout import execute_all, endpoint_params
+from ansible_collections.community.stackrox.plugins.module_utils import exceptions
+from ansible_collections.community.stackrox.plugins.module_utils.services import apitoken as apitoken_service
+from ansible_collections.community.stackrox.plugins.module_utils.records import Token
+from ansible_collections.community.stackrox.plugins.modules import apitoken, apitokens
+
+from ansible_collections.community.stackrox.tests.unit.plugins.modules import utils
+
+from unittest.mock import create_autospec
+from functools import partial
+import threading
+import unittest
+import tempfile
+import time
+import os
+
+PARAMS = dict(
+    central=None,
+    token="task-token",
+    username=None,
+    password=None,
+    validate_certs=None,
+    api_metrics=False,
+    central_parallelism=8
+)
+
+class FakeService:
+    def __init__(self, params):
+        self.params = params
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+class TestEndpointParams(unittest.TestCase):
+
+    def test_endpoint_credentials_replace_the_task_credentials(self):
+        params = endpoint_params(PARAMS, dict(central="https://eu", username="admin", password="secret"))
+
+        self.assertEqual(params['central'], "https://eu")
+        self.assertIsNone(params['token'])
+        self.assertEqual((params['username'], params['password']), ("admin", "secret"))
+        self.assertIsNone(params['centrals'])
+
+    def test_journal_is_kept_per_central(self):
+        params = {**PARAMS, 'journal': "/var/tmp/tokens.journal"}
+
+        self.assertEqual(endpoint_params(params, dict(name="eu", central="https://eu"))['journal'], "/var/tmp/tokens.journal.eu")
+        self.assertEqual(endpoint_params(params, dict(central="https://us.example.com:443"))['journal'],
+                         "/var/tmp/tokens.journal.https-us.example.com-443")
+        self.assertNotIn('journal', endpoint_params(PARAMS, dict(central="https://eu")))
+
+    def test_files_are_written_per_central(self):
+        params = {**PARAMS, 'dest_dir': "/srv/bundles"}
+
+        self.assertEqual(endpoint_params(params, dict(name="eu", central="https://eu"))['dest_dir'], "/srv/bundles/eu")
+        self.assertEqual(endpoint_params(params, dict(name="us", central="https://us"))['dest_dir'], "/srv/bundles/us")
+
+        # policy exports too
+        params = {**PARAMS, 'dest': "/srv/policies"}
+        self.assertEqual(endpoint_params(params, dict(name="eu", central="https://eu"))['dest'], "/srv/policies/eu")
+
+    def test_task_credentials_are_used_by_default(self):
+        params = endpoint_params({**PARAMS, 'validate_certs': True}, dict(central="https://eu", validate_certs=False))
+
+        self.assertEqual(params['token'], "task-token")
+        self.assertFalse(params['validate_certs'])
+
+class TestExecuteAll(unittest.TestCase):
+
+    def test_runs_every_central_concurrently(self):
+        #
+        # Every execute waits for all the others to start, which only works
+        # if they all run at the same time.
+        #
+        barrier = threading.Barrier(3, timeout=5)
+        services = []
+
+        def execute(params, service):
+            barrier.wait()
+            return dict(changed=params['central'] == "https://us", central=params['central'])
+
+        def create_service(params):
+            services.append(FakeService(params))
+            return services[-1]
+
+        centrals = [dict(name="eu", central="https://eu"), dict(name="us", central="https://us"), dict(central="https://ap")]
+        result = execute_all({**PARAMS, 'centrals': centrals}, execute, create_service)
+
+        self.assertTrue(result['changed'])
+        self.assertEqual(list(result['centrals']), ["eu", "us", "https://ap"])
+        self.assertEqual(result['centrals']['eu'], dict(changed=False, central="https://eu"))
+        self.assertTrue(all(service.closed for service in services))
+
+    def test_bounded_by_central_parallelism(self):
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def execute(params, service):
+            with lock:
+                running.append(params['central'])
+                peak.append(len(running))
+            time.sleep(0.02)
+            with lock:
+                running.remove(params['central'])
+            return dict(changed=False)
+
+        centrals = [dict(central=f"https://c{i}") for i in range(6)]
+        execute_all({**PARAMS, 'centrals': centrals, 'central_parallelism': 2}, execute, FakeService)
+
+        self.assertLessEqual(max(peak), 2)
+
+    def test_failures_are_isolated(self):
+        def execute(params, service):
+            if params['central'] == "https://eu":
+                raise exceptions.ModuleFailedException("Token revoke failed", tokens=[])
+            if params['central'] == "https://us":
+                raise exceptions.UnauthorizedException("Stackrox API rejected the supplied credentials")
+            return dict(changed=True)
+
+        centrals = [dict(central="https://eu"), dict(central="https://us"), dict(central="https://ap")]
+
+        with self.assertRaises(exceptions.ModuleFailedException) as failure:
+            execute_all({**PARAMS, 'centrals': centrals}, execute, FakeService)
+
+        self.assertEqual(failure.exception.msg, "Failed on 2 of 3 Centrals: https://eu, https://us")
+        results = failure.exception.result['centrals']
+        self.assertEqual(results['https://eu'], dict(changed=False, failed=True, msg="Token revoke failed", tokens=[]))
+        self.assertEqual(results['https://us']['msg'], "Stackrox API rejected the supplied credentials")
+        self.assertEqual(results['https://ap'], dict(changed=True))
+        self.assertTrue(failure.exception.result['changed'])
+
+    def test_rejects_duplicate_names(self):
+        centrals = [dict(name="eu", central="https://eu-1"), dict(name="eu", central="https://eu-2")]
+
+        with self.assertRaises(exceptions.ModuleFailedException):
+            execute_all({**PARAMS, 'centrals': centrals}, lambda params, service: {}, FakeService)
+
+class TestModuleFanOut(utils.ModuleTestCase):
+
+    @utils.patch('ansible_collections.community.stackrox.plugins.modules.apitoken.Service')
+    def test_module_runs_against_each_central(self, service_class):
+        service_class.return_value.get.return_value = []
+        service_class.return_value.create.return_value = {"id": "id-ci", "name": "ci", "token": "secret"}
+
+        utils.set_module_args({
+            "token": "doesnotmatter",
+            "centrals": [
+                {"name": "eu", "central": "https://eu.central.com"},
+                {"name": "us", "central": "https://us.central.com", "username": "admin", "password": "secret"}
+            ],
+            "name": "ci",
+            "role": "Admin"
+        })
+
+        with self.assertRaises(utils.AnsibleExitJson) as result:
+            apitoken.main()
+
+        result = result.exception.args[0]
+        self.assertTrue(result['changed'])
+        self.assertEqual(sorted(result['centrals']), ["eu", "us"])
+        self.assertEqual(result['centrals']['us']['tokens'][0]['id'], "id-ci")
+
+        endpoints = sorted((kwargs['central'], kwargs['token']) for args, kwargs in service_class.call_args_list)
+        self.assertEqual(endpoints, [("https://eu.central.com", "doesnotmatter"), ("https://us.central.com", None)])
+
+    @utils.patch('ansible_collections.community.stackrox.plugins.modules.apitokens.Service')
+    def test_journals_are_not_shared_between_centrals(self, service_class):
+        #
+        # Both Centrals fail halfway and resume. Each must resume its own plan,
+        # revoking its own token exactly once.
+        #
+        services = {}
+        for name in ("a", "b"):
+            service = create_autospec(apitoken_service.Service, instance=True)
+            service.apply.side_effect = partial(apitoken_service.Service.apply, service)
+            service.index.return_value = {"old": [Token({"id": f"{name}-old", "name": "old", "revoked": False})]}
+            service.create.side_effect = [ConnectionResetError("Central restarted"), {"id": f"{name}-new", "name": "new"}]
+            services[f"https://{name}"] = service
+
+        service_class.side_effect = lambda **params: services[params['central']]
+
+        journal = os.path.join(tempfile.mkdtemp(), "journal")
+        utils.set_module_args({
+            "token": "doesnotmatter",
+            "centrals": [{"name": "a", "central": "https://a"}, {"name": "b", "central": "https://b"}],
+            "tokens": [{"name": "new", "role": "Admin"}, {"name": "old", "state": "absent"}],
+            "journal": journal,
+            "parallelism": 1
+        })
+
+        with self.assertRaises(utils.AnsibleFailJson):
+            apitokens.main()
+
+        self.assertEqual(sorted(os.listdir(os.path.dirname(journal))), ["journal.a", "journal.b"])
+
+        with self.assertRaises(utils.AnsibleExitJson):
+            apitokens.main()
+
+        for name in ("a", "b"):
+            services[f"https://{name}"].revoke.assert_called_once_with(id=f"{name}-old")
+            services[f"https://{name}"].index.assert_called_once_with()
+
+        self.assertEqual(os.listdir(os.path.dirname(journal)), [])
+
+    def test_central_or_centrals_is_required(self):
+        utils.set_module_args({"token": "doesnotmatter", "name": "ci", "role": "Admin"})
+
+        with self.assertRaises(utils.AnsibleFailJson):
+            apitoken.main()
@@ -0,0 +1,127 @@
+from ansible_collections.community.stackrox.plugins.module_utils.files import Base64File
+from ansible_collections.community.stackrox.plugins.module_utils.services import clusterinit
+from ansible_collections.community.stackrox.plugins.module_utils.transport import Response
+
+import unittest
+import tempfile
+import base64
+import json
+import stat
+import io
+import os
+
+HELM = b"clusterName: eu\n" * 1000
+KUBECTL = b"apiVersion: v1\nkind: Secret\n" * 1000
+
+class StreamingTransport:
+    #
+    # Answers every request with body, read a few bytes at a time.
+    #
+    def __init__(self, body, status=200):
+        self.body = body
+        self.status = status
+        self.requests = []
+
+    def stream(self, method, url, headers=None, body=None):
+        self.requests.append((method, url, body))
+
+        resp = Response(self.status, {}, self.body)
+        resp.read = lambda n, read=io.BytesIO(self.body).read: read(min(n, 100))
+
+        class Stream:
+            def __enter__(self):
+                return resp
+
+            def __exit__(self, *exc_info):
+                pass
+
+        return Stream()
+
+    def close(self):
+        pass
+
+class TestBase64File(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.path = os.path.join(self.dir.name, "out")
+
+    def test_decodes_pieces_of_any_size(self):
+        encoded = base64.b64encode(HELM).decode('ascii')
+
+        f = Base64File(self.path)
+        for start in range(0, len(encoded), 7):
+            f.write(encoded[start:start + 7])
+        f.commit()
+
+        with open(self.path, 'rb') as data:
+            self.assertEqual(data.read(), HELM)
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+
+    def test_discard_leaves_nothing_behind(self):
+        f = Base64File(self.path)
+        f.write("aGVs")
+        f.discard()
+
+        self.assertEqual(os.listdir(self.dir.name), [])
+
+    def test_truncated_data_is_not_committed(self):
+        f = Base64File(self.path)
+        f.write("aGV")
+
+        with self.assertRaises(ValueError):
+            f.commit()
+        f.discard()
+
+        self.assertEqual(os.listdir(self.dir.name), [])
+
+class TestCreateInitBundleToFiles(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def __create_service(self, transport):
+        return clusterinit.Service(token="token", username=None, password=None,
+                                   central="https://central.com",
+                                   transport=transport)
+
+    def test_writes_bundles_and_returns_paths(self):
+        body = json.dumps({
+            "meta": {"id": "1", "name": "eu"},
+            "helmValuesBundle": base64.b64encode(HELM).decode('ascii'),
+            "kubectlBundle": base64.b64encode(KUBECTL).decode('ascii')
+        }).encode('utf-8')
+        transport = StreamingTransport(body)
+
+        bundle = self.__create_service(transport).create_initbundle(name="eu", dest_dir=self.dir.name)
+
+        helm_path = os.path.join(self.dir.name, "eu-helm-values.yaml")
+        kubectl_path = os.path.join(self.dir.name, "eu-kubectl.yaml")
+        self.assertEqual(bundle, {
+            "meta": {"id": "1", "name": "eu"},
+            "helmValuesBundleFile": helm_path,
+            "kubectlBundleFile": kubectl_path
+        })
+        self.assertEqual([(method, url, json.loads(body)) for method, url, body in transport.requests],
+                         [("POST", "https://central.com/v1/cluster-init/init-bundles", {"name": "eu"})])
+
+        for path, expected in [(helm_path, HELM), (kubectl_path, KUBECTL)]:
+            with open(path, 'rb') as data:
+                self.assertEqual(data.read(), expected)
+
+    def test_failed_create_writes_nothing(self):
+        service = self.__create_service(StreamingTransport(b'{"error": "denied"}', status=403))
+
+        with self.assertRaises(Exception):
+            service.create_initbundle(name="eu", dest_dir=self.dir.name)
+
+        self.assertEqual(os.listdir(self.dir.name), [])
+
+    def test_rejects_names_that_are_not_file_names(self):
+        service = self.__create_service(StreamingTransport(b'{}'))
+
+        for name in ["../eu", "a/b", ".."]:
+            with self.assertRaises(ValueError):
+                service.create_initbundle(name=name, dest_dir=self.dir.name)
@@ -0,0 +1,88 @@
+from ansible_collections.community.stackrox.plugins.module_utils.journal import Journal, run_journaled
+from ansible_collections.community.stackrox.plugins.module_utils import exceptions
+
+import unittest
+import tempfile
+import stat
+import os
+
+OPERATIONS = [
+    {"key": "a", "action": "revoke", "id": "id-a"},
+    {"key": "b", "action": "revoke", "id": "id-b"},
+    {"key": "c", "action": "create", "name": "c"}
+]
+
+class TestJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.path = os.path.join(self.dir.name, "journal")
+
+    def test_resumes_plan_and_completed_operations(self):
+        journal = Journal(self.path, request=["a", "b", "c"])
+        self.assertFalse(journal.resumed)
+        journal.plan(OPERATIONS)
+        journal.complete("a", True)
+        journal.close()
+
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+
+        journal = Journal(self.path, request=["a", "b", "c"])
+        self.assertTrue(journal.resumed)
+        self.assertEqual(journal.operations, OPERATIONS)
+        self.assertEqual(journal.results, {"a": True})
+        journal.close()
+
+    def test_torn_line_is_dropped(self):
+        journal = Journal(self.path, request=["a"])
+        journal.plan(OPERATIONS)
+        journal.complete("a", True)
+        journal.close()
+
+        # a crash in the middle of writing the next entry
+        with open(self.path, 'ab') as f:
+            f.write(b'{"done":"b","res')
+
+        journal = Journal(self.path, request=["a"])
+        self.assertEqual(journal.results, {"a": True})
+        journal.complete("b", True)
+        journal.close()
+
+        self.assertEqual(Journal(self.path, request=["a"]).results, {"a": True, "b": True})
+
+    def test_rejects_journal_of_a_different_request(self):
+        journal = Journal(self.path, request=["a"])
+        journal.plan(OPERATIONS)
+        journal.close()
+
+        with self.assertRaises(exceptions.JournalMismatchException):
+            Journal(self.path, request=["b"])
+
+    def test_finished_journal_is_removed(self):
+        journal = Journal(self.path, request=["a"])
+        journal.plan(OPERATIONS)
+        journal.close(finished=True)
+
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_run_journaled_skips_completed_operations(self):
+        journal = Journal(self.path, request=["a"])
+        journal.plan(OPERATIONS)
+        journal.complete("a", "recorded")
+
+        ran = []
+
+        def run(operation):
+            ran.append(operation['key'])
+            if operation['key'] == "b":
+                raise Exception("Central restarted")
+            return operation['key']
+
+        outcomes = run_journaled(OPERATIONS, run, max_workers=1, journal=journal)
+
+        self.assertEqual(ran, ["b", "c"])
+        self.assertEqual([result for result, error in outcomes], ["recorded", None, "c"])
+        self.assertEqual(str(outcomes[1][1]), "Central restarted")
+        self.assertEqual(journal.results, {"a": "recorded", "c": "c"})
+        journal.close()
@@ -0,0 +1,98 @@
+from ansible_collections.community.stackrox.plugins.module_utils.jsonstream import iter_array_items, read_object
+
+import unittest
+import io
+import json
+
+class TestIterArrayItems(unittest.TestCase):
+
+    def __items(self, document, key, chunk_size):
+        return list(iter_array_items(io.BytesIO(document.encode('utf-8')).read, key, chunk_size=chunk_size))
+
+    def test_items_match_json_loads_at_any_chunk_size(self):
+        #
+        # Values must decode identically no matter where the chunk
+        # boundaries fall, including inside numbers and multi-byte characters.
+        #
+        document = json.dumps({
+            "before": {"nested": [1, 2, {"tokens": "not this one"}]},
+            "tokens": [
+                {"id": "1", "name": "café ☃", "revoked": False},
+                12345,
+                -1.5e10,
+                "plain string",
+                None,
+                [True, False]
+            ],
+            "after": 1234567
+        }, indent=2)
+
+        expected = json.loads(document)['tokens']
+
+        for chunk_size in [1, 2, 3, 7, 64, 65536]:
+            self.assertEqual(self.__items(document, 'tokens', chunk_size), expected)
+
+    def test_empty_and_missing_arrays(self):
+        self.assertEqual(self.__items('{"tokens": []}', 'tokens', 4), [])
+        self.assertEqual(self.__items('{}', 'tokens', 4), [])
+        self.assertEqual(self.__items('{"items": [1, 2]}', 'tokens', 4), [])
+
+    def test_stops_reading_when_caller_stops(self):
+        reads = []
+        stream = io.BytesIO(json.dumps({"items": [{"n": i} for i in range(1000)]}).encode('utf-8'))
+
+        def read(n):
+            reads.append(n)
+            return stream.read(n)
+
+        for item in iter_array_items(read, 'items', chunk_size=16):
+            if item['n'] == 2:
+                break
+
+        self.assertLess(len(reads), 10)
+
+    def test_malformed_document_raises(self):
+        with self.assertRaises(ValueError):
+            self.__items('{"tokens": [1 2]}', 'tokens', 4)
+
+        with self.assertRaises(ValueError):
+            self.__items('{"tokens": [1, 2', 'tokens', 4)
+
+class TestReadObject(unittest.TestCase):
+
+    def __read(self, document, keys, chunk_size):
+        pieces = {key: [] for key in keys}
+        rest = read_object(io.BytesIO(document.encode('utf-8')).read,
+                           {key: pieces[key].append for key in keys},
+                           chunk_size=chunk_size)
+
+        return rest, {key: ''.join(p) for key, p in pieces.items()}
+
+    def test_streams_strings_at_any_chunk_size(self):
+        #
+        # Streamed strings must come out unescaped and whole no matter where the
+        # chunk boundaries fall, including inside escapes.
+        #
+        document = json.dumps({
+            "meta": {"id": "1", "name": "bundle"},
+            "helmValuesBundle": "aGVsbQ==" * 50,
+            "kubectlBundle": 'quote " slash / back \\ tab \t é ☃ end',
+            "count": 12
+        })
+
+        expected = json.loads(document)
+
+        for chunk_size in [1, 2, 3, 7, 64, 65536]:
+            rest, strings = self.__read(document, ['helmValuesBundle', 'kubectlBundle'], chunk_size)
+            self.assertEqual(rest, {"meta": expected['meta'], "count": 12})
+            self.assertEqual(strings, {key: expected[key] for key in ['helmValuesBundle', 'kubectlBundle']})
+
+    def test_other_values_of_streamed_keys_are_returned(self):
+        rest, strings = self.__read('{"helmValuesBundle": null}', ['helmValuesBundle'], 4)
+
+        self.assertEqual(rest, {"helmValuesBundle": None})
+        self.assertEqual(strings, {"helmValuesBundle": ""})
+
+    def test_truncated_string_raises(self):
+        with self.assertRaises(ValueError):
+            self.__read('{"helmValuesBundle": "aGVs', ['helmValuesBundle'], 4)
@@ -0,0 +1,133 @@
+from ansible_collections.community.stackrox.plugins.module_utils.metrics import endpoint_template, summarize
+from ansible_collections.community.stackrox.plugins.module_utils.services import apitoken
+from ansible_collections.community.stackrox.plugins.module_utils.transport import Response
+from ansible_collections.community.stackrox.plugins.module_utils.compression import DecodingResponse
+
+import unittest
+from unittest.mock import patch
+import io
+import gzip
+import json
+
+BODY = json.dumps({"tokens": [{"id": "1", "name": "ci", "revoked": False}]}).encode('utf-8')
+
+class ScriptedTransport:
+    #
+    # Answers with the scripted statuses, then 200 and BODY.
+    #
+    def __init__(self, statuses=()):
+        self.statuses = list(statuses)
+
+    def _response(self):
+        return Response(self.statuses.pop(0) if self.statuses else 200, {}, BODY)
+
+    def request(self, method, url, headers=None, body=None):
+        return self._response()
+
+    def stream(self, method, url, headers=None, body=None):
+        resp = self._response()
+        resp.read = io.BytesIO(resp.body).read
+
+        class Stream:
+            def __enter__(self):
+                return resp
+
+            def __exit__(self, *exc_info):
+                pass
+
+        return Stream()
+
+    def close(self):
+        pass
+
+@patch('ansible_collections.community.stackrox.plugins.module_utils.basic.time.sleep')
+class TestRequestMetrics(unittest.TestCase):
+
+    def __create_service(self, transport, **kwargs):
+        return apitoken.Service(token="token", username=None, password=None,
+                                central="https://central.com",
+                                transport=transport,
+                                **kwargs)
+
+    def test_records_each_request(self, sleep):
+        service = self.__create_service(ScriptedTransport([503]), api_metrics=True)
+
+        service.list()
+        service.revoke(id="5f0a5e5c-1a5b-4a43-9c2d-7a3c2b9f8e10")
+        service.get(name="ci")
+
+        records = service.metrics.records
+        self.assertEqual([(r['method'], r['endpoint'], r['status'], r['retries']) for r in records], [
+            ('GET', '/v1/apitokens', 200, 1),
+            ('PATCH', '/v1/apitokens/revoke/{id}', 200, 0),
+            ('GET', '/v1/apitokens', 200, 0)
+        ])
+        self.assertEqual(records[0]['bytes_in'], len(BODY))
+        self.assertEqual(records[2]['bytes_in'], len(BODY))
+
+    def test_records_failures(self, sleep):
+        service = self.__create_service(ScriptedTransport([404]), api_metrics=True)
+
+        with self.assertRaises(Exception):
+            service.create(name="ci", role="Admin")
+
+        record = service.metrics.records[0]
+        self.assertEqual((record['method'], record['status']), ('POST', 404))
+        self.assertGreater(record['bytes_out'], 0)
+
+    def test_compressed_responses_count_bytes_received(self, sleep):
+        #
+        # bytes_in, like bytes_out, is what went over the wire.
+        #
+        compressed = gzip.compress(BODY)
+
+        class GzipTransport(ScriptedTransport):
+            def request(self, method, url, headers=None, body=None):
+                return Response(200, {}, BODY, wire_size=len(compressed))
+
+            def stream(self, method, url, headers=None, body=None):
+                raw = Response(200, {}, compressed)
+                raw.read = io.BytesIO(compressed).read
+                resp = DecodingResponse(raw, 'gzip')
+
+                class Stream:
+                    def __enter__(self):
+                        return resp
+
+                    def __exit__(self, *exc_info):
+                        pass
+
+                return Stream()
+
+        service = self.__create_service(GzipTransport(), api_metrics=True)
+
+        self.assertEqual(service.list()[0]['name'], "ci")
+        service.revoke(id="5f0a5e5c-1a5b-4a43-9c2d-7a3c2b9f8e10")
+
+        self.assertEqual([r['bytes_in'] for r in service.metrics.records], [len(compressed)] * 2)
+
+    def test_disabled_by_default(self, sleep):
+        service = self.__create_service(ScriptedTransport())
+        service.list()
+        self.assertIsNone(service.metrics)
+
+class TestSummarize(unittest.TestCase):
+
+    def test_endpoint_template(self):
+        self.assertEqual(endpoint_template("https://c/v1/apitokens/42?revoked=false"), "/v1/apitokens/{id}")
+        self.assertEqual(endpoint_template("https://c/v1/cluster-init/init-bundles"), "/v1/cluster-init/init-bundles")
+
+    def test_percentiles_per_endpoint(self):
+        records = [dict(method='GET', endpoint='/v1/apitokens', status=200, latency=i / 100,
+                        bytes_in=10, bytes_out=0, retries=0) for i in range(1, 101)]
+        records.append(dict(method='PATCH', endpoint='/v1/apitokens/revoke/{id}', status=None, latency=1.0,
+                            bytes_in=0, bytes_out=0, retries=3))
+
+        summary = summarize(records)
+
+        self.assertEqual(summary['GET /v1/apitokens']['calls'], 100)
+        self.assertEqual(summary['GET /v1/apitokens']['latency']['p50'], 0.5)
+        self.assertEqual(summary['GET /v1/apitokens']['latency']['p99'], 0.99)
+        self.assertEqual(summary['GET /v1/apitokens']['bytes_in'], 1000)
+        self.assertEqual(summary['PATCH /v1/apitokens/revoke/{id}']['errors'], 1)
+        self.assertEqual(summary['PATCH /v1/apitokens/revoke/{id}']['retries'], 3)
@@ -0,0 +1,84 @@
+from ansible_collections.community.stackrox.plugins.module_utils import profiling
+from ansible_collections.community.stackrox.plugins.modules import apitokens
+
+from ansible_collections.community.stackrox.tests.unit.plugins.modules import utils
+
+import unittest
+from unittest.mock import patch
+import tempfile
+import pstats
+import time
+import os
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.addCleanup(profiling.stop)
+
+    def test_spans_do_nothing_when_not_profiling(self):
+        self.assertIsNone(profiling.stop())
+
+        with profiling.span('idle'):
+            pass
+
+        self.assertIsNone(profiling.stop())
+
+    def test_pstats_profile_and_spans(self):
+        path = os.path.join(self.dir.name, "run.prof")
+
+        @profiling.timed('busy')
+        def timed_busy():
+            busy(0.01)
+
+        profiling.start(path, 'pstats')
+        timed_busy()
+        timed_busy()
+        summary = profiling.stop()
+
+        self.assertEqual(summary['path'], path)
+        self.assertEqual(summary['spans']['busy']['count'], 2)
+        self.assertGreaterEqual(summary['spans']['busy']['total'], 0.02)
+        self.assertIn('busy', [func[2] for func in pstats.Stats(path).stats])
+
+    def test_collapsed_profile_samples_other_threads(self):
+        profiling.start(self.dir.name, 'collapsed', name='apitoken')
+
+        from ansible_collections.community.stackrox.plugins.module_utils.parallel import run_parallel
+        run_parallel(lambda i: busy(0.1), range(2), max_workers=2)
+
+        summary = profiling.stop()
+
+        self.assertTrue(os.path.basename(summary['path']).startswith('apitoken-'))
+        self.assertTrue(summary['path'].endswith('.folded'))
+
+        with open(summary['path']) as f:
+            lines = f.read().splitlines()
+
+        self.assertTrue(any('busy (test_profiling.py' in line for line in lines))
+        self.assertTrue(all(line.rsplit(' ', 1)[1].isdigit() for line in lines))
+
+class TestModuleProfiling(utils.ModuleTestCase):
+
+    @utils.patch('ansible_collections.community.stackrox.plugins.modules.apitokens.Service', autospec=True)
+    def test_profile_from_environment(self, service_class):
+        service_class.return_value.apply.return_value = []
+        service_class.return_value.index.return_value = {}
+
+        path = os.path.join(tempfile.mkdtemp(), "apitokens.prof")
+        utils.set_module_args({**self.default_args, "tokens": []})
+
+        with patch.dict(os.environ, STACKROX_PROFILE=path):
+            with self.assertRaises(utils.AnsibleExitJson) as result:
+                apitokens.main()
+
+        profile = result.exception.args[0]['profile']
+        self.assertEqual(profile['path'], path)
+        self.assertIn('module.args', profile['spans'])
+        self.assertTrue(os.path.exists(path))
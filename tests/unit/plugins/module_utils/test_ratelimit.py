@@ -0,0 +1,101 @@
+from ansible_collections.community.stackrox.plugins.module_utils.ratelimit import RateController, parse_retry_after
+from ansible_collections.community.stackrox.plugins.module_utils.services import apitoken
+from ansible_collections.community.stackrox.plugins.module_utils.transport import Response
+from ansible_collections.community.stackrox.plugins.module_utils import exceptions
+
+import unittest
+from unittest.mock import patch
+import json
+from contextlib import nullcontext
+import io
+
+class ScriptedTransport:
+    #
+    # Answers requests with a scripted sequence of (status, headers) pairs,
+    # then 200 with an empty token list.
+    #
+    def __init__(self, script):
+        self.script = list(script)
+        self.requests = []
+
+    def request(self, method, url, headers=None, body=None):
+        self.requests.append(method)
+        status, response_headers = self.script.pop(0) if self.script else (200, {})
+        return Response(status, response_headers, json.dumps({"tokens": [], "id": "new"}).encode('utf-8'))
+
+    def stream(self, method, url, headers=None, body=None):
+        resp = self.request(method, url, headers, body)
+        resp.read = io.BytesIO(resp.body).read
+        return nullcontext(resp)
+
+    def close(self):
+        pass
+
+@patch('ansible_collections.community.stackrox.plugins.module_utils.basic.time.sleep')
+class TestRetries(unittest.TestCase):
+
+    def __create_service(self, transport, **kwargs):
+        return apitoken.Service(token="token", username=None, password=None,
+                                central="https://central.com",
+                                transport=transport,
+                                **kwargs)
+
+    def test_get_is_retried_and_honours_retry_after(self, sleep):
+        transport = ScriptedTransport([(503, {"Retry-After": "0.1"}), (429, {})])
+        service = self.__create_service(transport)
+
+        self.assertEqual(service.list(), [])
+        self.assertEqual(transport.requests, ['GET', 'GET', 'GET'])
+        self.assertGreaterEqual(sleep.call_args_list[0][0][0], 0.1)
+
+    def test_create_is_only_retried_when_throttled(self, sleep):
+        transport = ScriptedTransport([(429, {})])
+        self.__create_service(transport).create(name="t", role="Admin")
+        self.assertEqual(transport.requests, ['POST', 'POST'])
+
+        transport = ScriptedTransport([(503, {})])
+        with self.assertRaises(exceptions.UnexpectedStatusException) as e:
+            self.__create_service(transport).create(name="t", role="Admin")
+
+        self.assertEqual(e.exception.status, 503)
+        self.assertEqual(transport.requests, ['POST'])
+
+    def test_gives_up_after_max_retries(self, sleep):
+        transport = ScriptedTransport([(503, {})] * 10)
+
+        with self.assertRaises(exceptions.UnexpectedStatusException):
+            self.__create_service(transport, max_retries=2).list()
+
+        self.assertEqual(len(transport.requests), 3)
+
+    def test_unauthorized_is_not_retried(self, sleep):
+        transport = ScriptedTransport([(401, {})])
+
+        with self.assertRaises(exceptions.UnauthorizedException):
+            self.__create_service(transport).list()
+
+        self.assertEqual(len(transport.requests), 1)
+
+class TestRateController(unittest.TestCase):
+
+    def test_limits_halve_on_throttle_and_recover(self):
+        controller = RateController(rate=10000, max_concurrency=16)
+
+        with controller.slot() as outcome:
+            outcome.throttled = True
+
+        self.assertEqual(controller.limit, 8)
+        self.assertEqual(controller.rate, 5000)
+
+        for i in range(200):
+            with controller.slot():
+                pass
+
+        self.assertEqual(controller.limit, 16)
+        self.assertEqual(controller.rate, 10000)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after({"Retry-After": "3"}), 3)
+        self.assertEqual(parse_retry_after({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}), 0)
+        self.assertIsNone(parse_retry_after({"Retry-After": "soon"}))
+        self.assertIsNone(parse_retry_after({}))
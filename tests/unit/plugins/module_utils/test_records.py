@@ -0,0 +1,81 @@
+from ansible_collections.community.stackrox.plugins.module_utils.records import Token, InitBundle, project
+from ansible_collections.community.stackrox.plugins.module_utils.services import clusterinit
+from ansible_collections.community.stackrox.plugins.module_utils.transport import Response
+
+import unittest
+from unittest.mock import patch
+import json
+from contextlib import nullcontext
+import io
+
+BUNDLE = {
+    "id": "b1",
+    "name": "prod",
+    "createdAt": "2024-01-01T00:00:00Z",
+    "expiresAt": "2025-01-01T00:00:00Z",
+    "createdBy": {"id": "u1", "authProviderId": "p1", "attributes": [{"key": "email", "value": "a@b.c"}]},
+    "impactedClusters": [{"id": "c1", "name": "eu-1"}, {"id": "c2", "name": "us-1"}]
+}
+
+class ListTransport:
+    def request(self, method, url, headers=None, body=None):
+        return Response(200, {}, json.dumps({"items": [BUNDLE]}).encode('utf-8'))
+
+    def stream(self, method, url, headers=None, body=None):
+        resp = self.request(method, url, headers, body)
+        resp.read = io.BytesIO(resp.body).read
+        return nullcontext(resp)
+
+    def close(self):
+        pass
+
+class TestRecords(unittest.TestCase):
+
+    def test_behaves_like_the_original_dict(self):
+        bundle = InitBundle(BUNDLE)
+
+        self.assertEqual(bundle, BUNDLE)
+        self.assertEqual(bundle['name'], "prod")
+        self.assertEqual(bundle['impactedClusters'][1]['name'], "us-1")
+        self.assertEqual(bundle.get('missing', 'default'), 'default')
+        self.assertEqual(set(bundle), set(BUNDLE))
+        self.assertNotIn('revoked', bundle)
+        self.assertFalse(hasattr(bundle, '__dict__'))
+
+        with self.assertRaises(KeyError):
+            Token({"id": "1"})['name']
+
+    def test_nested_values_are_decoded_once(self):
+        bundle = InitBundle(BUNDLE)
+
+        with patch('ansible_collections.community.stackrox.plugins.module_utils.records._codec') as codec:
+            codec.loads.return_value = {"impactedClusters": BUNDLE['impactedClusters']}
+            bundle['impactedClusters']
+            list(bundle)
+            len(bundle)
+
+        codec.loads.assert_called_once()
+
+    def test_projection(self):
+        bundle = InitBundle(BUNDLE)
+
+        self.assertEqual(bundle.to_dict(['id', 'createdBy.id', 'impactedClusters.name', 'missing.key']), {
+            "id": "b1",
+            "createdBy": {"id": "u1"},
+            "impactedClusters": [{"name": "eu-1"}, {"name": "us-1"}]
+        })
+
+        result = dict(changed=False, results=[dict(name="prod", initbundle=bundle)], created={"meta": {"id": "x"}})
+        self.assertEqual(project(result, ['name']), dict(changed=False,
+                                                         results=[dict(name="prod", initbundle={"name": "prod"})],
+                                                         created={"meta": {"id": "x"}}))
+        self.assertIs(type(project([bundle])[0]), dict)
+
+    def test_services_return_records(self):
+        service = clusterinit.Service(token="token", username=None, password=None,
+                                      central="https://central.com", transport=ListTransport())
+
+        bundles = service.list_initbundles()
+
+        self.assertIsInstance(bundles[0], InitBundle)
+        self.assertEqual(bundles, [BUNDLE])
@@ -0,0 +1,132 @@
+from ansible_collections.community.stackrox.plugins.module_utils.resource import apply_operations
+from ansible_collections.community.stackrox.plugins.module_utils.services import apitoken, clusters, roles, policy
+from ansible_collections.community.stackrox.plugins.module_utils.records import Cluster, Role
+from ansible_collections.community.stackrox.plugins.module_utils.transport import Response
+
+import unittest
+import tempfile
+import io
+import json
+
+CLUSTERS = {"clusters": [{"id": f"c{i}", "name": f"cluster-{i}", "type": "OPENSHIFT4_CLUSTER"} for i in range(5)]}
+
+class ResourceTransport:
+    #
+    # Serves a fixed body for every GET and echoes the body of any other
+    # request, recording each request as "METHOD /path?query".
+    #
+    def __init__(self, body):
+        self.body = json.dumps(body).encode('utf-8')
+        self.requests = []
+
+    def _response(self, method, url, body):
+        self.requests.append(f"{method} {url.split('/v1/', 1)[1]}")
+        return Response(200, {}, self.body if method == 'GET' else (body or b'{}'))
+
+    def request(self, method, url, headers=None, body=None):
+        return self._response(method, url, body)
+
+    def stream(self, method, url, headers=None, body=None):
+        resp = self._response(method, url, body)
+        resp.read = io.BytesIO(resp.body).read
+
+        class Stream:
+            def __enter__(self):
+                return resp
+
+            def __exit__(self, *exc_info):
+                pass
+
+        return Stream()
+
+    def close(self):
+        pass
+
+class TestResourceService(unittest.TestCase):
+
+    def __create_service(self, module, body, **kwargs):
+        transport = ResourceTransport(body)
+        return module.Service(token="token", username=None, password=None,
+                              central="https://central.com", transport=transport, **kwargs), transport
+
+    def test_lookups_are_answered_from_the_index(self):
+        service, transport = self.__create_service(clusters, CLUSTERS)
+
+        # a single lookup streams the list
+        self.assertEqual(service.find("cluster-3")['id'], "c3")
+        self.assertIsNone(service.find("missing"))
+
+        index = service.index()
+        self.assertIsInstance(index["cluster-1"], Cluster)
+        self.assertEqual([service.find(f"cluster-{i}")['id'] for i in range(5)], ["c0", "c1", "c2", "c3", "c4"])
+        self.assertEqual(transport.requests, ["GET clusters", "GET clusters", "GET clusters"])
+
+        # a change drops the index
+        service.delete("c1")
+        service.find("cluster-1")
+        self.assertEqual(transport.requests[3:], ["DELETE clusters/c1", "GET clusters"])
+
+    def test_identity_is_used_as_the_id(self):
+        service, transport = self.__create_service(roles, {"roles": [{"name": "Continuous Integration"}]})
+
+        self.assertIsInstance(service.get("Continuous Integration"), Role)
+        service.create({"name": "Continuous Integration", "permissionSetId": "p1"})
+
+        self.assertEqual(transport.requests, ["GET roles/Continuous%20Integration",
+                                              "POST roles/Continuous%20Integration"])
+
+        with self.assertRaises(ValueError):
+            service.mutate('revoke', id="Admin")
+
+    def test_queries_keep_the_index_and_the_cache(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        service, transport = self.__create_service(policy, {"policies": [{"id": "p1", "name": "one"}]},
+                                                   cache_ttl=60, cache_dir=tmp.name)
+
+        service.index()
+        service.query('export', data={"policyIds": ["p1"]})
+        service.find("one")
+        service.list()
+        self.assertEqual(transport.requests, ["GET policies", "POST policies/export"])
+
+        service.delete("p1")
+        service.list()
+        self.assertEqual(transport.requests[2:], ["DELETE policies/p1", "GET policies"])
+
+        with self.assertRaises(ValueError):
+            service.query('import')
+
+    def test_apitoken_service_on_the_engine(self):
+        tokens = {"tokens": [{"id": "1", "name": "ci", "revoked": False},
+                             {"id": "2", "name": "ci", "revoked": False}]}
+        service, transport = self.__create_service(apitoken, tokens)
+
+        self.assertEqual([t['id'] for t in service.get(name="ci")], ["1", "2"])
+        self.assertEqual(list(service.index()), ["ci"])
+        self.assertEqual(len(service.get(name="ci")), 2)
+        self.assertTrue(service.revoke(id="2"))
+
+        self.assertEqual(transport.requests, ["GET apitokens?revoked=false",
+                                              "GET apitokens?revoked=false",
+                                              "PATCH apitokens/revoke/2"])
+
+class TestApplyOperations(unittest.TestCase):
+
+    def test_batched_operations_go_first_in_batches(self):
+        operations = [{"key": "new", "action": "create"}] + \
+                     [{"key": f"old-{i}", "action": "revoke"} for i in range(5)]
+        calls = []
+
+        def run_batch(batch):
+            calls.append([operation['key'] for operation in batch])
+            return [(operation['key'] != "old-4", None) for operation in batch]
+
+        def run(operation):
+            calls.append(operation['key'])
+            return "created"
+
+        outcomes = apply_operations(operations, run, batched=('revoke',), run_batch=run_batch, batch_size=2)
+
+        self.assertEqual(calls, [["old-0", "old-1"], ["old-2", "old-3"], ["old-4"], "new"])
+        self.assertEqual([result for result, error in outcomes], ["created", True, True, True, True, False])
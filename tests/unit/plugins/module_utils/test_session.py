@@ -0,0 +1,105 @@
+from ansible_collections.community.stackrox.plugins.module_utils.services import apitoken
+from ansible_collections.community.stackrox.plugins.module_utils.transport import Response
+
+import unittest
+import tempfile
+import base64
+import time
+import json
+from contextlib import nullcontext
+import io
+
+def make_token(expires_in):
+    claims = json.dumps({"exp": time.time() + expires_in}).encode('utf-8')
+    return "header." + base64.urlsafe_b64encode(claims).decode('ascii').rstrip('=') + ".signature"
+
+class SessionTransport:
+    #
+    # Fake Central with a basic auth provider. Hands out a new session token
+    # on every login and only accepts the most recent one on the API.
+    #
+    def __init__(self, provider=True, expires_in=300):
+        self.provider = provider
+        self.expires_in = expires_in
+        self.logins = 0
+        self.current = None
+        self.api_auth = []
+
+    def request(self, method, url, headers=None, body=None):
+        if url.endswith('/v1/login/authproviders'):
+            providers = [{"id": "p1", "type": "basic", "enabled": True}] if self.provider else []
+            return Response(200, {}, json.dumps({"authProviders": providers}).encode('utf-8'))
+
+        if '/sso/providers/basic/' in url:
+            self.logins += 1
+            self.current = make_token(self.expires_in)
+            return Response(303, {"Location": f"https://central.com/auth/response/generic#token={self.current}"}, b'')
+
+        auth = headers['Authorization']
+        self.api_auth.append(auth)
+        if auth.startswith('Bearer ') and auth != f"Bearer {self.current}":
+            return Response(401, {}, b'{}')
+
+        return Response(200, {}, json.dumps({"tokens": []}).encode('utf-8'))
+
+    def stream(self, method, url, headers=None, body=None):
+        resp = self.request(method, url, headers, body)
+        resp.read = io.BytesIO(resp.body).read
+        return nullcontext(resp)
+
+    def close(self):
+        pass
+
+class TestSessionToken(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_dir = tmp.name
+
+    def __create_service(self, transport):
+        return apitoken.Service(token=None, username="admin", password="secret",
+                                central="https://central.com",
+                                transport=transport,
+                                cache_dir=self.cache_dir,
+                                session_token=True)
+
+    def test_token_is_exchanged_once_and_shared(self):
+        transport = SessionTransport()
+
+        for i in range(3):
+            self.__create_service(transport).list()
+
+        self.assertEqual(transport.logins, 1)
+        self.assertEqual(transport.api_auth, [f"Bearer {transport.current}"] * 3)
+
+    def test_expiring_token_is_refreshed(self):
+        # lifetime inside the refresh margin
+        transport = SessionTransport(expires_in=30)
+        service = self.__create_service(transport)
+
+        service.list()
+        service.list()
+
+        self.assertEqual(transport.logins, 2)
+
+    def test_rejected_token_is_exchanged_again(self):
+        transport = SessionTransport()
+        self.__create_service(transport).list()
+
+        # Central forgot the session, e.g. after a restart
+        transport.current = "revoked"
+        self.__create_service(transport).list()
+
+        self.assertEqual(transport.logins, 2)
+        self.assertEqual(transport.api_auth[-1], f"Bearer {transport.current}")
+
+    def test_falls_back_to_basic_auth(self):
+        transport = SessionTransport(provider=False)
+        service = self.__create_service(transport)
+
+        service.list()
+        service.list()
+
+        self.assertEqual(transport.logins, 0)
+        self.assertTrue(all(auth.startswith('Basic ') for auth in transport.api_auth))
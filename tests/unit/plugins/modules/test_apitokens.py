@@ -0,0 +1,153 @@
+from ansible_collections.community.stackrox.plugins.modules import apitokens
+from ansible_collections.community.stackrox.plugins.module_utils.records import Token
+from ansible_collections.community.stackrox.plugins.module_utils.services import apitoken
+
+from ansible_collections.community.stackrox.tests.unit.plugins.modules import utils
+from functools import partial
+import tempfile
+import os
+
+class TestApiTokensModule(utils.ModuleTestCase):
+
+    @utils.patch('ansible_collections.community.stackrox.plugins.modules.apitokens.Service', autospec=True)
+    def test_module_lists_once_and_reconciles_each_token(self, service_class):
+        #
+        # We expect the module to:
+        #
+        # - build the name index with a single list call
+        # - create missing tokens, revoke unwanted ones and leave existing ones alone
+        # - report a result per token, in input order
+        #
+        service = service_class.return_value
+        service.apply.side_effect = partial(apitoken.Service.apply, service)
+
+        existing = {"id": "id-existing", "name": "existing", "revoked": False}
+        unwanted = {"id": "id-unwanted", "name": "unwanted", "revoked": False}
+        created = {"id": "id-new", "name": "new", "revoked": False}
+
+        service.index.return_value = {"existing": [existing], "unwanted": [unwanted]}
+        service.create.return_value = created
+
+        utils.set_module_args({
+            **self.default_args,
+            "tokens": [
+                {"name": "new", "role": "Admin"},
+                {"name": "existing", "role": "Admin"},
+                {"name": "unwanted", "state": "absent"},
+                {"name": "missing", "state": "absent"}
+            ]
+        })
+
+        with self.assertRaises(utils.AnsibleExitJson) as result:
+            apitokens.main()
+
+        results = result.exception.args[0]['results']
+
+        service.index.assert_called_once_with()
+        service.create.assert_called_once_with(name="new", role="Admin")
+        service.revoke.assert_called_once_with(id="id-unwanted")
+        service.close.assert_called_once_with()
+
+        self.assertTrue(result.exception.args[0]['changed'])
+        self.assertEqual([r['name'] for r in results], ["new", "existing", "unwanted", "missing"])
+        self.assertEqual([r['changed'] for r in results], [True, False, True, False])
+        self.assertEqual(results[0]['tokens'], [created])
+        self.assertEqual(results[1]['tokens'], [existing])
+
+    @utils.patch('ansible_collections.community.stackrox.plugins.modules.apitokens.Service', autospec=True)
+    def test_module_fails_on_ambiguous_revoke(self, service_class):
+        #
+        # Revoking by a name shared by several tokens must fail that item
+        # without stopping the others.
+        #
+        service = service_class.return_value
+        service.apply.side_effect = partial(apitoken.Service.apply, service)
+        service.index.return_value = {
+            "shared": [{"id": "a", "name": "shared"}, {"id": "b", "name": "shared"}]
+        }
+        service.create.return_value = {"id": "c", "name": "other"}
+
+        utils.set_module_args({
+            **self.default_args,
+            "tokens": [
+                {"name": "shared", "state": "absent"},
+                {"name": "other", "role": "Admin"}
+            ]
+        })
+
+        with self.assertRaises(utils.AnsibleFailJson) as result:
+            apitokens.main()
+
+        results = result.exception.args[0]['results']
+        self.assertTrue(results[0]['failed'])
+        self.assertTrue(results[1]['changed'])
+        service.revoke.assert_not_called()
+
+    def test_module_rejects_duplicate_names(self):
+        utils.set_module_args({
+            **self.default_args,
+            "tokens": [
+                {"name": "dup", "role": "Admin"},
+                {"name": "dup", "state": "absent"}
+            ]
+        })
+
+        with self.assertRaises(utils.AnsibleFailJson):
+            apitokens.main()
+
+    @utils.patch('ansible_collections.community.stackrox.plugins.modules.apitokens.Service', autospec=True)
+    def test_module_projects_return_fields(self, service_class):
+        service = service_class.return_value
+        service.apply.side_effect = partial(apitoken.Service.apply, service)
+        service.index.return_value = {
+            "existing": [Token({"id": "a", "name": "existing", "roles": ["Admin"], "revoked": False})]
+        }
+
+        utils.set_module_args({
+            **self.default_args,
+            "tokens": [{"name": "existing", "role": "Admin"}],
+            "return_fields": ["id", "roles"]
+        })
+
+        with self.assertRaises(utils.AnsibleExitJson) as result:
+            apitokens.main()
+
+        self.assertEqual(result.exception.args[0]['results'][0]['tokens'], [{"id": "a", "roles": ["Admin"]}])
+
+    @utils.patch('ansible_collections.community.stackrox.plugins.modules.apitokens.Service', autospec=True)
+    def test_module_resumes_from_journal(self, service_class):
+        #
+        # A run that fails halfway leaves its journal behind. Running again
+        # with it must not list the tokens again nor repeat what succeeded,
+        # and a run that completes removes the journal.
+        #
+        service = service_class.return_value
+        service.apply.side_effect = partial(apitoken.Service.apply, service)
+        service.index.return_value = {"unwanted": [Token({"id": "id-unwanted", "name": "unwanted", "revoked": False})]}
+        service.create.side_effect = [ConnectionResetError("Central restarted"), {"id": "id-new", "name": "new"}]
+
+        journal = os.path.join(tempfile.mkdtemp(), "journal")
+        utils.set_module_args({
+            **self.default_args,
+            "tokens": [
+                {"name": "new", "role": "Admin"},
+                {"name": "unwanted", "state": "absent"}
+            ],
+            "journal": journal,
+            "parallelism": 1
+        })
+
+        with self.assertRaises(utils.AnsibleFailJson):
+            apitokens.main()
+
+        self.assertTrue(os.path.exists(journal))
+        service.revoke.assert_called_once_with(id="id-unwanted")
+
+        with self.assertRaises(utils.AnsibleExitJson) as result:
+            apitokens.main()
+
+        service.index.assert_called_once_with()
+        service.revoke.assert_called_once_with(id="id-unwanted")
+        self.assertEqual(service.create.call_count, 2)
+        self.assertEqual([r['changed'] for r in result.exception.args[0]['results']], [True, True])
+        self.assertFalse(os.path.exists(journal))
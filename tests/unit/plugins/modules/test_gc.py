@@ -0,0 +1,117 @@
+from ansible_collections.community.stackrox.plugins.modules import gc
+from ansible_collections.community.stackrox.plugins.module_utils.services import apitoken, clusterinit
+from ansible_collections.community.stackrox.plugins.module_utils import exceptions
+
+from ansible_collections.community.stackrox.tests.unit.plugins.modules import utils
+from unittest.mock import call
+from functools import partial
+
+PAST = "2020-01-01T00:00:00.123456789Z"
+FUTURE = "2999-01-01T00:00:00Z"
+
+def token(name, expiration=FUTURE, issued=FUTURE):
+    return {"id": f"id-{name}", "name": name, "expiration": expiration, "issuedAt": issued, "revoked": False}
+
+def bundle(name, expires=FUTURE, clusters=()):
+    return {"id": f"id-{name}", "name": name, "expiresAt": expires, "createdAt": PAST,
+            "impactedClusters": [{"id": c, "name": c} for c in clusters]}
+
+class TestGcModule(utils.ModuleTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        patcher = utils.patch('ansible_collections.community.stackrox.plugins.modules.gc.Service')
+        self.service = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+        # the bulk paths run for real on top of the mocked API calls
+        self.service.tokens.apply.side_effect = partial(apitoken.Service.apply, self.service.tokens)
+        self.service.initbundles.apply.side_effect = partial(clusterinit.Service.apply, self.service.initbundles)
+
+        self.service.tokens.list.return_value = [
+            token("expired", expiration=PAST),
+            token("ci-old", issued=PAST),
+            token("current")
+        ]
+        self.service.initbundles.list_initbundles.return_value = [
+            bundle("expired-1", expires=PAST, clusters=["c1"]),
+            bundle("expired-2", expires=PAST, clusters=["c1", "c2"]),
+            bundle("expired-3", expires=PAST),
+            bundle("unused")
+        ]
+
+    def __run(self, **args):
+        utils.set_module_args({**self.default_args, **args})
+
+        with self.assertRaises((utils.AnsibleExitJson, utils.AnsibleFailJson)) as result:
+            gc.main()
+
+        return result.exception.args[0]
+
+    def test_dry_run_reports_without_revoking(self):
+        result = self.__run(dry_run=True, older_than=30, names=["ci-*", "expired*"])
+
+        self.assertTrue(result['changed'])
+        self.assertEqual([(t['name'], t['reasons']) for t in result['tokens']],
+                         [("expired", ["expired"]), ("ci-old", ["older_than"])])
+        self.assertEqual([b['name'] for b in result['initbundles']], ["expired-1", "expired-2", "expired-3"])
+        self.service.tokens.revoke.assert_not_called()
+        self.service.initbundles.revoke_initbundles.assert_not_called()
+
+    def test_revokes_bundles_in_batches_and_tokens_individually(self):
+        self.service.initbundles.revoke_initbundles.side_effect = [
+            ["id-expired-1", "id-expired-2"],
+            ["id-unused"]
+        ]
+
+        result = self.__run(unused=True, revoke_in_use=True, batch_size=2,
+                            names=["expired", "expired-1", "expired-2", "unused"])
+
+        self.assertTrue(result['changed'])
+        self.service.tokens.revoke.assert_called_once_with(id="id-expired")
+        self.assertEqual(self.service.initbundles.revoke_initbundles.call_args_list, [
+            call(bundle_ids=["id-expired-1", "id-expired-2"], impacted_cluster_ids=["c1", "c2"]),
+            call(bundle_ids=["id-unused"], impacted_cluster_ids=[])
+        ])
+        self.assertTrue(all(r['revoked'] for r in result['tokens'] + result['initbundles']))
+        self.service.close.assert_called_once_with()
+
+    def test_reports_failed_revocations(self):
+        self.service.initbundles.revoke_initbundles.side_effect = exceptions.BundleRevokeFailedException(
+            [{"id": "id-expired-2", "error": "still in use", "impactedClusters": []}],
+            revoked_ids=["id-expired-1"])
+
+        result = self.__run(kinds=["initbundles"], revoke_in_use=True, names=["expired-1", "expired-2"])
+
+        self.assertTrue(result['failed'])
+        self.assertEqual([(b['revoked'], b.get('msg')) for b in result['initbundles']],
+                         [(True, None), (False, "still in use")])
+        self.service.tokens.list.assert_not_called()
+
+    def test_skips_bundles_in_use_unless_asked(self):
+        self.service.initbundles.revoke_initbundles.return_value = ["id-expired-3"]
+
+        result = self.__run(kinds=["initbundles"])
+
+        self.assertTrue(result['changed'])
+        self.assertEqual([(b['name'], b['revoked'], b.get('skipped_in_use', False)) for b in result['initbundles']],
+                         [("expired-1", False, True), ("expired-2", False, True), ("expired-3", True, False)])
+        self.service.initbundles.revoke_initbundles.assert_called_once_with(bundle_ids=["id-expired-3"],
+                                                                            impacted_cluster_ids=[])
+
+        # only bundles in use are left, so there's nothing to do
+        result = self.__run(kinds=["initbundles"], dry_run=True, names=["expired-1", "expired-2"])
+        self.assertFalse(result['changed'])
+
+    def test_unusable_cache_dir_fails_the_task(self):
+        gc.Service.side_effect = PermissionError("Refusing to use cache directory /tmp/shared")
+
+        result = self.__run(cache_dir="/tmp/shared")
+
+        self.assertTrue(result['failed'])
+        self.assertIn("Refusing to use cache directory /tmp/shared", result['msg'])
+
+    def test_requires_a_selection(self):
+        result = self.__run(expired=False)
+        self.assertTrue(result['failed'])
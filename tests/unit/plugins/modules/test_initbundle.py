@@ -1,10 +1,9 @@
-from ansible_collections.adamgoossens.stackrox.plugins.modules import initbundle
-from ansible_collections.adamgoossens.stackrox.plugins.module_utils.services.clusterinit import ClusterInitService
+from ansible_collections.community.stackrox.plugins.modules import initbundle
 
-from ansible_collections.adamgoossens.stackrox.tests.unit.plugins.modules import utils
-import json
-
-from unittest.mock import Mock
+from ansible_collections.community.stackrox.tests.unit.plugins.modules import utils
+import tempfile
+import stat
+import os
 
 class TestInitBundleModule(utils.ModuleTestCase):
 
@@ -12,12 +11,12 @@ class TestInitBundleModule(utils.ModuleTestCase):
         with self.assertRaises(utils.AnsibleFailJson):
             initbundle.main()
 
-    @utils.patch('ansible_collections.adamgoossens.stackrox.plugins.modules.initbundle.ClusterInitService', autospec=True)
+    @utils.patch('ansible_collections.community.stackrox.plugins.modules.initbundle.Service', autospec=True)
     def test_module_state_present_with_new_initbundle(self, cis_mock_class):
         #
         # We expect the module to:
         #
-        # - attempt to fetch a matching initbundle by name, using ClusterInitService.get
+        # - attempt to fetch a matching initbundle by name, using Service.get_initbundle
         # - when no match is found, call create_initbundle with the correct name.
         # - return the resulting bundle to the caller
         #
@@ -40,10 +39,40 @@ class TestInitBundleModule(utils.ModuleTestCase):
 
         self.assertTrue(result.exception.args[0]['changed'])
         self.assertEqual(result.exception.args[0]['initbundle'], bundle)
-        cis_mock.get_initbundle.assert_called_with(name=bundle['meta']['name'])
-        cis_mock.create_initbundle.assert_called_with(name=bundle['meta']['name'])   
+        cis_mock.get_initbundle.assert_called_with(bundle['meta']['name'])
+        cis_mock.create_initbundle.assert_called_with(name=bundle['meta']['name'], dest_dir=None)
+
+    @utils.patch('ansible_collections.community.stackrox.plugins.modules.initbundle.Service', autospec=True)
+    def test_module_state_present_with_dest_dir(self, cis_mock_class):
+        #
+        # We expect the module to create dest_dir, readable only by its
+        # owner, and have the new bundle written there.
+        #
+        cis_mock = cis_mock_class.return_value
 
-    @utils.patch('ansible_collections.adamgoossens.stackrox.plugins.modules.initbundle.ClusterInitService', autospec=True)
+        bundle = utils.create_fake_initbundle(is_new=True)
+
+        cis_mock.get_initbundle.return_value = None
+        cis_mock.create_initbundle.return_value = bundle
+
+        with tempfile.TemporaryDirectory() as tmp:
+            dest_dir = os.path.join(tmp, "bundles")
+
+            utils.set_module_args({
+                **self.default_args,
+                "name": bundle['meta']['name'],
+                "dest_dir": dest_dir
+            })
+
+            with self.assertRaises(utils.AnsibleExitJson) as result:
+                initbundle.main()
+
+            self.assertEqual(stat.S_IMODE(os.stat(dest_dir).st_mode), 0o700)
+
+        self.assertTrue(result.exception.args[0]['changed'])
+        cis_mock.create_initbundle.assert_called_with(name=bundle['meta']['name'], dest_dir=dest_dir)
+
+    @utils.patch('ansible_collections.community.stackrox.plugins.modules.initbundle.Service', autospec=True)
     def test_module_state_present_with_existing_initbundle(self, cis_mock_class):
         #
         # We expect the module to check for an existing bundle and, when found,
@@ -68,7 +97,7 @@ class TestInitBundleModule(utils.ModuleTestCase):
         self.assertFalse(result.exception.args[0]['changed'])
         self.assertEqual(result.exception.args[0]['initbundle'], bundle)
 
-    @utils.patch('ansible_collections.adamgoossens.stackrox.plugins.modules.initbundle.ClusterInitService', autospec=True)
+    @utils.patch('ansible_collections.community.stackrox.plugins.modules.initbundle.Service', autospec=True)
     def test_module_state_absent(self, cis_mock_class):
         # 
         # We expect the module to check if the bundle exists,
@@ -107,6 +136,6 @@ class TestInitBundleModule(utils.ModuleTestCase):
         with self.assertRaises(utils.AnsibleExitJson) as result:
             initbundle.main()
 
-        cis_mock.get_initbundle.assert_called_with(name=bundle['name'])
+        cis_mock.get_initbundle.assert_called_with(bundle['name'])
         cis_mock.revoke_initbundles.assert_not_called()
         self.assertFalse(result.exception.args[0]['changed'])
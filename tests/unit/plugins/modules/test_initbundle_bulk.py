@@ -0,0 +1,86 @@
+from ansible_collections.community.stackrox.plugins.modules import initbundle
+from ansible_collections.community.stackrox.plugins.module_utils.services import clusterinit
+from ansible_collections.community.stackrox.plugins.module_utils import exceptions
+
+from ansible_collections.community.stackrox.tests.unit.plugins.modules import utils
+from functools import partial
+
+class TestInitBundleModuleBulk(utils.ModuleTestCase):
+
+    @utils.patch('ansible_collections.community.stackrox.plugins.modules.initbundle.Service', autospec=True)
+    def test_module_bundles_single_list_and_single_revoke(self, service_class):
+        #
+        # We expect the module to:
+        #
+        # - fetch the bundle list exactly once
+        # - revoke every absent bundle in one call with the combined cluster IDs
+        # - create every missing bundle
+        #
+        service = service_class.return_value
+        service.apply.side_effect = partial(clusterinit.Service.apply, service)
+
+        keep = utils.create_fake_initbundle(name="keep")
+        gone1 = utils.create_fake_initbundle(name="gone1")
+        gone2 = utils.create_fake_initbundle(name="gone2")
+        new = utils.create_fake_initbundle(name="new", is_new=True)
+
+        service.index_initbundles.return_value = {b['name']: b for b in [keep, gone1, gone2]}
+        service.revoke_initbundles.return_value = [gone1['id'], gone2['id']]
+        service.create_initbundle.return_value = new
+
+        utils.set_module_args({
+            **self.default_args,
+            "bundles": [
+                {"name": "keep"},
+                {"name": "new"},
+                {"name": "gone1", "state": "absent"},
+                {"name": "gone2", "state": "absent"},
+                {"name": "never-existed", "state": "absent"}
+            ]
+        })
+
+        with self.assertRaises(utils.AnsibleExitJson) as result:
+            initbundle.main()
+
+        results = result.exception.args[0]['results']
+
+        service.index_initbundles.assert_called_once_with()
+        service.get_initbundle.assert_not_called()
+        service.create_initbundle.assert_called_once_with(name="new", dest_dir=None)
+        service.revoke_initbundles.assert_called_once_with(
+                    bundle_ids=[gone1['id'], gone2['id']],
+                    impacted_cluster_ids=[c['id'] for c in gone1['impactedClusters'] + gone2['impactedClusters']])
+
+        self.assertTrue(result.exception.args[0]['changed'])
+        self.assertEqual([r['changed'] for r in results], [False, True, True, True, False])
+        self.assertEqual(results[0]['initbundle'], keep)
+        self.assertEqual(results[1]['initbundle'], new)
+
+    @utils.patch('ansible_collections.community.stackrox.plugins.modules.initbundle.Service', autospec=True)
+    def test_module_bundles_reports_partial_revoke_failure(self, service_class):
+        service = service_class.return_value
+        service.apply.side_effect = partial(clusterinit.Service.apply, service)
+
+        gone1 = utils.create_fake_initbundle(name="gone1")
+        gone2 = utils.create_fake_initbundle(name="gone2")
+
+        service.index_initbundles.return_value = {b['name']: b for b in [gone1, gone2]}
+        service.revoke_initbundles.side_effect = exceptions.BundleRevokeFailedException(
+                    [{"id": gone2['id'], "error": "boom", "impactedClusters": []}],
+                    revoked_ids=[gone1['id']])
+
+        utils.set_module_args({
+            **self.default_args,
+            "bundles": [
+                {"name": "gone1", "state": "absent"},
+                {"name": "gone2", "state": "absent"}
+            ]
+        })
+
+        with self.assertRaises(utils.AnsibleFailJson) as result:
+            initbundle.main()
+
+        results = result.exception.args[0]['results']
+        self.assertTrue(results[0]['changed'])
+        self.assertTrue(results[1]['failed'])
+        self.assertEqual(results[1]['msg'], "boom")
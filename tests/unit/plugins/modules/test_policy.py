@@ -0,0 +1,132 @@
+from ansible_collections.community.stackrox.plugins.modules import policy
+from ansible_collections.community.stackrox.plugins.module_utils.records import Policy
+
+from ansible_collections.community.stackrox.tests.unit.plugins.modules import utils
+
+import tempfile
+import json
+import os
+
+def central_policy(name, id, severity="HIGH_SEVERITY", **fields):
+    # a policy as Central exports it, with its own fields and defaults filled in
+    return {"id": id, "name": name, "severity": severity, "disabled": False, "isDefault": False,
+            "lastUpdated": "2024-05-01T00:00:00Z", "SORTName": name, "notifiers": [], "exclusions": [],
+            "policySections": [{"sectionName": "", "policyGroups": [{"fieldName": "Image Tag", "values": [{"value": "latest"}]}]}],
+            **fields}
+
+def local_policy(name, severity="HIGH_SEVERITY"):
+    # the same policy as kept in a policy-as-code repository
+    return {"name": name, "severity": severity,
+            "policySections": [{"policyGroups": [{"fieldName": "Image Tag", "values": [{"value": "latest"}]}]}]}
+
+class TestPolicyModule(utils.ModuleTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        patcher = utils.patch('ansible_collections.community.stackrox.plugins.modules.policy.Service')
+        self.service = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+        self.central = [central_policy("same", "p1"), central_policy("changed", "p2")]
+        self.service.list.return_value = [Policy(p) for p in self.central]
+        self.service.index.return_value = { p['name']: Policy(p) for p in self.central }
+        self.service.export_policies.side_effect = lambda ids, batch_size: [p for p in self.central if p['id'] in ids]
+
+    def __run(self, **args):
+        utils.set_module_args({**self.default_args, **args})
+
+        with self.assertRaises((utils.AnsibleExitJson, utils.AnsibleFailJson)) as result:
+            policy.main()
+
+        return result.exception.args[0]
+
+    def __write(self, name, content):
+        with open(os.path.join(self.dir, name), 'w') as f:
+            json.dump(content, f)
+
+    def test_import_only_sends_new_and_changed_policies(self):
+        self.__write("same.json", local_policy("same"))
+        self.__write("more.json", {"policies": [local_policy("changed", severity="LOW_SEVERITY"), local_policy("new")]})
+        self.service.import_policies.return_value = [
+            {"succeeded": True, "policy": {"id": "p2"}},
+            {"succeeded": False, "errors": [{"message": "invalid policy", "type": "invalid_policy"}]}
+        ]
+
+        result = self.__run(src=self.dir)
+
+        self.assertTrue(result['failed'])
+        self.assertEqual([(p['name'], p['status']) for p in result['policies']],
+                         [("changed", "updated"), ("new", "failed"), ("same", "unchanged")])
+        self.assertEqual(result['policies'][1]['msg'], "invalid policy")
+
+        self.service.export_policies.assert_called_once_with(["p2", "p1"], batch_size=100)
+        sent = self.service.import_policies.call_args[0][0]
+        self.assertEqual([(p['name'], p.get('id')) for p in sent], [("changed", "p2"), ("new", None)])
+
+    def test_import_matches_renamed_policies_by_id(self):
+        #
+        # A file whose name is new but whose ID is a Central policy's
+        # updates that policy; an ID already matched by name is dropped.
+        #
+        self.__write("renamed.json", {**local_policy("renamed"), "id": "p1"})
+        self.__write("taken.json", {**local_policy("taken"), "id": "p2"})
+        self.__write("changed.json", local_policy("changed", severity="LOW_SEVERITY"))
+        self.service.import_policies.return_value = [
+            {"succeeded": True, "policy": {"id": "p2"}},
+            {"succeeded": True, "policy": {"id": "p1"}},
+            {"succeeded": True, "policy": {"id": "p3"}}
+        ]
+
+        result = self.__run(src=self.dir)
+
+        self.assertEqual([(p['name'], p['status'], p['id']) for p in result['policies']],
+                         [("changed", "updated", "p2"), ("renamed", "updated", "p1"), ("taken", "created", "p3")])
+
+        sent = self.service.import_policies.call_args[0][0]
+        self.assertEqual([(p['name'], p.get('id')) for p in sent], [("changed", "p2"), ("renamed", "p1"), ("taken", None)])
+
+    def test_import_dry_run_and_no_overwrite(self):
+        self.__write("changed.json", local_policy("changed", severity="LOW_SEVERITY"))
+        self.__write("new.json", local_policy("new"))
+
+        result = self.__run(src=self.dir, dry_run=True)
+        self.assertTrue(result['changed'])
+        self.assertEqual([p['status'] for p in result['policies']], ["updated", "created"])
+
+        result = self.__run(src=os.path.join(self.dir, "changed.json"), overwrite=False)
+        self.assertFalse(result['changed'])
+        self.assertEqual([p['status'] for p in result['policies']], ["skipped"])
+
+        self.service.import_policies.assert_not_called()
+
+    def test_export_writes_only_changed_files(self):
+        dest = os.path.join(self.dir, "policies")
+        self.central.append(central_policy("Default One", "p3", isDefault=True))
+
+        result = self.__run(dest=dest)
+        self.assertTrue(result['changed'])
+        self.assertEqual(sorted(os.listdir(dest)), ["changed.json", "same.json"])
+
+        with open(os.path.join(dest, "same.json")) as f:
+            self.assertNotIn('lastUpdated', json.load(f))
+
+        # Central touching a policy without changing it leaves the files alone
+        self.central[0]['lastUpdated'] = "2024-06-01T00:00:00Z"
+        self.central[1]['severity'] = "LOW_SEVERITY"
+
+        result = self.__run(dest=dest, names=["*"])
+        self.assertEqual([(p['name'], p['status']) for p in result['policies']],
+                         [("changed", "written"), ("same", "unchanged")])
+
+        result = self.__run(dest=dest)
+        self.assertFalse(result['changed'])
+
+    def test_policy_filename(self):
+        taken = set()
+        self.assertEqual(policy.policy_filename("Latest tag: no!", taken), "Latest-tag-no.json")
+        self.assertEqual(policy.policy_filename("Latest tag/ no", taken), "Latest-tag-no-2.json")
@@ -0,0 +1,49 @@
+from ansible.plugins.loader import init_plugin_loader
+from ansible.utils.collection_loader import AnsibleCollectionConfig
+
+import ansible_collections
+import unittest
+import sys
+import os
+
+def _collection_modules():
+    return { name: module for name, module in sys.modules.items()
+             if name == 'ansible_collections' or name.startswith('ansible_collections.') }
+
+class PluginLoaderTestCase(unittest.TestCase):
+    #
+    # Installs Ansible's collection loader, which the plugin loaders need,
+    # for the tests of the class, and puts back whatever was there before
+    # once they are done.
+    #
+    # The collection is imported afresh through the loader, since a copy
+    # imported as a plain package has no collection metadata, and the
+    # original modules are restored afterwards so later tests, and their
+    # patches, keep seeing the same ones.
+    #
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls._saved_import_state = (list(sys.meta_path), list(sys.path_hooks),
+                                   AnsibleCollectionConfig._collection_finder, _collection_modules())
+
+        for name in cls._saved_import_state[3]:
+            del sys.modules[name]
+
+        init_plugin_loader([os.path.dirname(list(ansible_collections.__path__)[0])])
+
+    @classmethod
+    def tearDownClass(cls):
+        meta_path, path_hooks, finder, modules = cls._saved_import_state
+
+        sys.meta_path[:] = meta_path
+        sys.path_hooks[:] = path_hooks
+        sys.path_importer_cache.clear()
+        AnsibleCollectionConfig._collection_finder = finder
+
+        for name in _collection_modules():
+            del sys.modules[name]
+        sys.modules.update(modules)
+
+        super().tearDownClass()